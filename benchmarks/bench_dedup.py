@@ -0,0 +1,76 @@
+"""
+Benchmarks transform._deduplicate_rows' merge step: the old groupby().agg(merge_logic)
+(tests/reference_transform.py) against the vectorized _vectorized_merge, on synthetic quant level rows.
+
+Usage (from the repo root):
+    PYTHONPATH=src python benchmarks/bench_dedup.py
+    PYTHONPATH=src python benchmarks/bench_dedup.py --sizes 10000 100000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import transform
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tests"))
+import reference_transform  # noqa: E402
+
+PRIMARY_KEY = ["DATETIME", "TICKER", "START_LVL_PRICE"]
+
+
+def make_rows(num_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Roughly 2 rows per primary key, with the null/blank/padded values the real feed produces.
+    """
+    rng = np.random.default_rng(seed)
+    num_days = max(1, num_rows // 40)
+    comments = np.array([None, "", "pivot", " pivot ", "gamma flip", "21d EMA", "first resistance"], dtype=object)
+
+    return pd.DataFrame({
+        "DATETIME": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, num_days, num_rows), unit="D"),
+        "TICKER": "SPX",
+        "START_LVL_PRICE": rng.integers(6400, 6420, num_rows) * 1.0,
+        "END_LVL_PRICE": np.where(rng.random(num_rows) < 0.6, np.nan, rng.integers(6420, 6500, num_rows) * 1.0),
+        "COMMENTS": rng.choice(comments, num_rows),
+        "BUY_SELL_IND": rng.choice(np.array([None, "BUY", "SELL"], dtype=object), num_rows),
+        "WEB_LINK": rng.choice([f"https://tradingedge.club/posts/{i}" for i in range(4)], num_rows),
+    })
+
+
+def time_call(func, *args) -> (float, pd.DataFrame):
+    start_time = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start_time, result
+
+
+def merge_logic_agg(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby(PRIMARY_KEY, as_index=False, dropna=False).agg(reference_transform.merge_logic)
+
+
+def vectorized(df: pd.DataFrame) -> pd.DataFrame:
+    return transform._vectorized_merge(df, PRIMARY_KEY)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'groups':>10} {'merge_logic (s)':>16} {'vectorized (s)':>15} {'speedup':>8}")
+
+    for num_rows in args.sizes:
+        df = make_rows(num_rows)
+
+        old_time, old_df = time_call(merge_logic_agg, df)
+        new_time, new_df = time_call(vectorized, df)
+
+        pd.testing.assert_frame_equal(old_df, new_df)
+        print(f"{num_rows:>10} {len(new_df):>10} {old_time:>16.3f} {new_time:>15.3f} {old_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmarks the Oracle insert paths in rows/sec: the previous SQLAlchemy insert (one dict per row through
+sa.insert) against the array-bound oracle._bulk_insert, with and without direct path (APPEND_VALUES).
+Needs a reachable Oracle database, credentials are read from the .env file like the pipeline does.
+Every path loads into its own scratch table, which is dropped afterwards.
+
+Usage (from the repo root):
+    PYTHONPATH=src python benchmarks/bench_insert.py
+    PYTHONPATH=src python benchmarks/bench_insert.py --sizes 10000 100000 --batch-size 5000
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+import config
+from connectors import oracle
+
+PRIMARY_KEYS = ["DATETIME", "TICKER", "START_LVL_PRICE"]
+
+
+def make_rows(num_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Clean rows shaped like transform's output, unique on the primary key.
+    """
+    rng = np.random.default_rng(seed)
+    comments = np.array([None, "pivot", "gamma flip", "21d EMA", "first resistance"], dtype=object)
+    levels_per_day = 20
+
+    return pd.DataFrame({
+        "DATETIME": pd.Timestamp("2000-01-01") + pd.to_timedelta(np.arange(num_rows) // levels_per_day, unit="D"),
+        "TICKER": "SPX",
+        "START_LVL_PRICE": 6000.0 + np.arange(num_rows) % levels_per_day,
+        "END_LVL_PRICE": np.where(rng.random(num_rows) < 0.6, np.nan, rng.integers(6420, 6500, num_rows) * 1.0),
+        "COMMENTS": rng.choice(comments, num_rows),
+        "BUY_SELL_IND": rng.choice(np.array([None, "BUY", "SELL"], dtype=object), num_rows),
+        "WEB_LINK": rng.choice([f"https://tradingedge.club/posts/{i}" for i in range(4)], num_rows),
+    })
+
+
+def sqlalchemy_insert(engine: sa.Engine, df: pd.DataFrame, table_name: str, batch_size: int) -> None:
+    # The insert _df_to_oracle_overwrite used before the bulk path
+    tbl = sa.Table(table_name, sa.MetaData(), autoload_with=engine)
+    with engine.begin() as conn:
+        conn.execute(sa.insert(tbl), df.replace({float('nan'): None}).to_dict(orient='records'))
+
+
+def bulk_insert(engine: sa.Engine, df: pd.DataFrame, table_name: str, batch_size: int) -> None:
+    with engine.begin() as conn:
+        oracle._bulk_insert(conn, df, table_name, batch_size=batch_size)
+
+
+def direct_path_insert(engine: sa.Engine, df: pd.DataFrame, table_name: str, batch_size: int) -> None:
+    with engine.begin() as conn:
+        oracle._bulk_insert(conn, df, table_name, batch_size=batch_size, direct_path=True)
+
+
+def time_insert(engine: sa.Engine, insert_func, df: pd.DataFrame, table_name: str, batch_size: int) -> float:
+    """
+    Creates an empty scratch table, times only the insert, then drops the table.
+    """
+    df_clean = oracle._lowercase_col_df(df.copy())
+    oracle._df_to_oracle_overwrite(engine, df_clean.iloc[:0], table_name, PRIMARY_KEYS)
+    try:
+        start_time = time.perf_counter()
+        insert_func(engine, df_clean, table_name, batch_size)
+        return time.perf_counter() - start_time
+    finally:
+        oracle._drop_table_internal(engine, table_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    env_config = config.load_config()
+    engine = oracle._get_engine(env_config)
+
+    paths = [("sqlalchemy", sqlalchemy_insert), ("bulk", bulk_insert), ("direct path", direct_path_insert)]
+    print(f"{'rows':>10} " + " ".join(f"{name + ' (rows/s)':>22}" for name, _ in paths))
+
+    try:
+        for num_rows in args.sizes:
+            df = make_rows(num_rows)
+            rates = [num_rows / time_insert(engine, insert_func, df, f"BENCH_INSERT_{i}", args.batch_size)
+                     for i, (_, insert_func) in enumerate(paths)]
+            print(f"{num_rows:>10} " + " ".join(f"{rate:>22,.0f}" for rate in rates))
+    finally:
+        oracle.dispose_engines()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmarks transform's quant level line parser: the per-post/per-line loop
+(tests/reference_transform.parse_quant_levels_to_rows) against the vectorized parser
+(_parse_quant_levels_to_frame), on synthetic quant_lvl_text blobs.
+
+Usage (from the repo root):
+    PYTHONPATH=src python benchmarks/bench_parse.py
+    PYTHONPATH=src python benchmarks/bench_parse.py --posts 1000 10000
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import transform
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tests"))
+import reference_transform  # noqa: E402
+
+
+def make_posts(num_posts: int, seed: int = 0) -> list:
+    """
+    Posts shaped like the real feed: ~15 level lines, then a BUY and a SELL section.
+    """
+    rng = np.random.default_rng(seed)
+    comments = ["", " pivot", ": high likelihood of resistance", " - gamma flip", " 21d EMA"]
+
+    posts = []
+    for i in range(num_posts):
+        levels = sorted(rng.integers(6000, 7000, 18), reverse=True)
+        lines = [f"{lvl}{' - ' + str(lvl + 5) if j % 3 == 0 else ''}{comments[j % len(comments)]}"
+                 for j, lvl in enumerate(levels)]
+        text = "\n".join(lines[:14] + ["---"] + lines[14:16] + ["---"] + lines[16:])
+        posts.append({"date_posted": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T15:00:00Z", "title": f"post {i}",
+                      "link": f"https://tradingedge.club/posts/{i}", "quant_lvl_text": text})
+    return posts
+
+
+def time_call(func, *args) -> (float, pd.DataFrame):
+    start_time = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start_time, result
+
+
+def row_parser(posts: list) -> pd.DataFrame:
+    return transform._define_quant_dataframe(reference_transform.parse_quant_levels_to_rows(posts))
+
+
+def batch_parser(posts: list) -> pd.DataFrame:
+    return transform._define_quant_dataframe(transform._parse_quant_levels_to_frame(posts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    args = parser.parse_args()
+
+    # The row parser logs one line per post, keep that out of the timings
+    logging.disable(logging.INFO)
+
+    print(f"{'posts':>8} {'rows':>9} {'row loop (s)':>13} {'vector (s)':>10} {'speedup':>8}")
+
+    for num_posts in args.posts:
+        posts = make_posts(num_posts)
+
+        old_time, old_df = time_call(row_parser, posts)
+        new_time, new_df = time_call(batch_parser, posts)
+
+        pd.testing.assert_frame_equal(old_df, new_df)
+        print(f"{num_posts:>8} {len(new_df):>9} {old_time:>13.3f} {new_time:>10.3f} {old_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
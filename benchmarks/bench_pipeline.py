@@ -0,0 +1,213 @@
+"""
+End-to-end throughput benchmark: extract.run -> transform.run -> load.run against the local feed simulator
+(benchmarks/feed_simulator.py), so runs are reproducible and need neither tradingedge.club nor Oracle.
+Reports wall time, pages/s, posts/s, rows/s and peak RSS per stage, appends the result (with the git commit)
+to a JSON lines file and compares it with the previous result for the same parameters.
+
+Usage (from the repo root):
+    PYTHONPATH=src python benchmarks/bench_pipeline.py
+    PYTHONPATH=src python benchmarks/bench_pipeline.py --posts 10000 --latency-ms 20 --error-rate 0.01
+    PYTHONPATH=src python benchmarks/bench_pipeline.py --backend oracle   (loads into the .env's Oracle)
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import config
+import extract
+import load
+import transform
+from connectors import http, storage
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from feed_simulator import FeedSimulator  # noqa: E402
+
+DEFAULT_RESULTS_PATH = Path(__file__).resolve().parent / "results" / "bench_pipeline.jsonl"
+
+
+class PeakRssSampler:
+    """
+    Samples the process RSS from /proc every interval_sec while a stage runs and keeps the peak.
+    Falls back to the lifetime peak (getrusage) where /proc isn't available.
+    """
+
+    def __init__(self, interval_sec: float = 0.01):
+        self.interval_sec = interval_sec
+        self.peak_bytes = 0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "PeakRssSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop_event.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval_sec):
+            self._sample()
+
+    def _sample(self) -> None:
+        self.peak_bytes = max(self.peak_bytes, _current_rss_bytes())
+
+
+def _current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_stage(func, *args):
+    with PeakRssSampler() as sampler:
+        start_time = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start_time
+    return result, elapsed, sampler.peak_bytes
+
+
+def bench_config(args: argparse.Namespace, simulator: FeedSimulator, work_dir: str) -> config.Config:
+    update = {
+        "te_base_url": simulator.feed_url,
+        "te_rate_limit_per_sec": 1_000_000.0,
+        "http_cache_enabled": False,
+        "http_backoff_base": 0.01,
+        "raw_archive_enabled": args.archive,
+        "raw_archive_dir": str(Path(work_dir) / "raw"),
+        "storage_backend": args.backend,
+        "sqlite_path": str(Path(work_dir) / "bench.sqlite"),
+        "oracle_quant_table_name": args.table,
+        "oracle_watermark_table_name": args.table + "_WM",
+    }
+    if args.backend == "oracle":
+        return config.load_config().model_copy(update=update)
+
+    return config.Config(oracle_user="bench", oracle_pass="bench", oracle_host_ip="127.0.0.1",
+                         oracle_service="bench", te_cookie="bench", **update)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    with FeedSimulator(args.posts, args.posts_per_day, args.latency_ms / 1000, args.error_rate,
+                       args.attachment_ratio, args.seed) as simulator, \
+            tempfile.TemporaryDirectory(prefix="bench_pipeline_") as work_dir:
+        env_config = bench_config(args, simulator, work_dir)
+        backend = storage.get_backend(env_config)
+
+        try:
+            posts, extract_sec, extract_rss = run_stage(extract.run, env_config)
+            feed_stats = simulator.stats()
+
+            clean_df, transform_sec, transform_rss = run_stage(transform.run, env_config, posts)
+
+            load.migrate(env_config)
+            _, load_sec, load_rss = run_stage(load.run, env_config, "overwrite", clean_df)
+        finally:
+            backend.dispose_engines()
+            http.close_sessions()
+
+    num_posts, num_rows = len(posts), len(clean_df)
+    return {
+        "extract": {"seconds": extract_sec, "pages_per_sec": feed_stats["feed_requests"] / extract_sec,
+                    "posts_per_sec": num_posts / extract_sec, "peak_rss_mb": extract_rss / 2 ** 20,
+                    "pages": feed_stats["feed_requests"], "files": feed_stats["file_requests"],
+                    "errors": feed_stats["errors"], "bytes": feed_stats["bytes_sent"]},
+        "transform": {"seconds": transform_sec, "posts_per_sec": num_posts / transform_sec,
+                      "rows_per_sec": num_rows / transform_sec, "peak_rss_mb": transform_rss / 2 ** 20,
+                      "posts": num_posts, "rows": num_rows},
+        "load": {"seconds": load_sec, "rows_per_sec": num_rows / load_sec, "peak_rss_mb": load_rss / 2 ** 20,
+                 "rows": num_rows},
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def previous_result(results_path: Path, params: dict):
+    """
+    Last saved result with the same benchmark parameters, or None.
+    """
+    if not results_path.exists():
+        return None
+
+    previous = None
+    with open(results_path) as f:
+        for line in f:
+            result = json.loads(line)
+            if result.get("params") == params:
+                previous = result
+    return previous
+
+
+def print_report(stages: dict, previous) -> None:
+    print(f"{'stage':<10} {'seconds':>9} {'pages/s':>9} {'posts/s':>10} {'rows/s':>11} {'peak RSS MB':>12} "
+          f"{'vs prev':>9}")
+    for stage, metrics in stages.items():
+        change = ""
+        if previous is not None and stage in previous["stages"]:
+            change = f"{metrics['seconds'] / previous['stages'][stage]['seconds'] - 1:+.1%}"
+
+        def fmt(key, width, digits=0):
+            return f"{metrics[key]:>{width},.{digits}f}" if key in metrics else " " * width
+
+        print(f"{stage:<10} {metrics['seconds']:>9.3f} {fmt('pages_per_sec', 9, 1)} {fmt('posts_per_sec', 10)} "
+              f"{fmt('rows_per_sec', 11)} {metrics['peak_rss_mb']:>12.1f} {change:>9}")
+
+    if previous is not None:
+        print(f"(vs prev = change in seconds against commit {previous['commit']} at {previous['timestamp']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=2_000)
+    parser.add_argument("--posts-per-day", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--attachment-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=list(storage.BACKENDS), default="sqlite")
+    parser.add_argument("--table", default="BENCH_QUANT_LVL", help="table to load (overwritten!)")
+    parser.add_argument("--archive", action="store_true", help="also write the raw archive (to a temp dir)")
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS_PATH)
+    parser.add_argument("--no-save", action="store_true", help="only print, don't append to the results file")
+    args = parser.parse_args()
+
+    # The pipeline logs one line per post, keep that out of the timings
+    logging.disable(logging.WARNING)
+
+    params = {key: getattr(args, key) for key in
+              ("posts", "posts_per_day", "latency_ms", "error_rate", "attachment_ratio", "seed", "backend", "archive")}
+    stages = run_benchmark(args)
+    previous = previous_result(args.results, params)
+    print_report(stages, previous)
+
+    if not args.no_save:
+        result = {"commit": git_commit(), "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                  "params": params, "stages": stages}
+        args.results.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.results, "a") as f:
+            f.write(json.dumps(result) + "\n")
+        print(f"Saved to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Local stand-in for the TradingEdge feed API: serves paginated 'feed' JSON in the shape extract._parse_feed_data
+expects (post id/title/created_at/user/sharing_meta/description/assets) plus the attachment files, with a
+configurable number of synthetic posts, response latency and error rate (errors are 503s, which the http
+layer retries). Deterministic for a given seed.
+
+Usage (from the repo root):
+    PYTHONPATH=src python benchmarks/feed_simulator.py --posts 5000 --port 8765
+    (then point te_base_url at the printed feed url)
+
+Or from code:
+    with FeedSimulator(num_posts=2000, latency_sec=0.02) as simulator:
+        config = config.model_copy(update={"te_base_url": simulator.feed_url})
+"""
+import argparse
+import datetime
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+
+FEED_PATH = "/api/web/v1/spaces/1/feed"
+FILES_PATH = "/files/"
+NEWEST_POST_AT = datetime.datetime(2025, 9, 30, 15, 0, tzinfo=datetime.timezone.utc)
+COMMENTS = ["", " pivot", ": high likelihood of resistance", " - gamma flip", " 21d EMA", " first support"]
+
+
+class FeedSimulator:
+    """
+    Threaded HTTP server on 127.0.0.1. Post 0 is the newest, posts get older by 24h / posts_per_day each.
+    :param num_posts: posts in the whole feed
+    :param posts_per_day: posts per calendar day (several posts of one day get merged by transform)
+    :param latency_sec: delay before every response
+    :param error_rate: fraction of requests answered with a 503
+    :param attachment_ratio: fraction of posts whose levels come from an attached .txt file
+    """
+
+    def __init__(self, num_posts: int = 2_000, posts_per_day: int = 2, latency_sec: float = 0.0,
+                 error_rate: float = 0.0, attachment_ratio: float = 0.2, seed: int = 0, port: int = 0):
+        self.num_posts = num_posts
+        self.posts_per_day = max(1, posts_per_day)
+        self.latency_sec = latency_sec
+        self.error_rate = error_rate
+        self.attachment_ratio = attachment_ratio
+        self.seed = seed
+        self.port = port
+
+        self.feed_requests = 0
+        self.file_requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self._stats_lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server = None
+        self._thread = None
+
+    # --------------------------------------------------------------------------
+    # SERVER
+    # --------------------------------------------------------------------------
+
+    def start(self) -> "FeedSimulator":
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                simulator._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FeedSimulator":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def feed_url(self) -> str:
+        return self.base_url + FEED_PATH
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {"feed_requests": self.feed_requests, "file_requests": self.file_requests,
+                    "errors": self.errors, "bytes_sent": self.bytes_sent}
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        url = urlparse(request.path)
+
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+
+        with self._stats_lock:
+            is_feed = url.path == FEED_PATH
+            if is_feed:
+                self.feed_requests += 1
+            elif url.path.startswith(FILES_PATH):
+                self.file_requests += 1
+            fail = self._rng.random() < self.error_rate
+
+        if fail:
+            with self._stats_lock:
+                self.errors += 1
+            self._send(request, 503, b"simulated outage", "text/plain")
+            return
+
+        if is_feed:
+            query = parse_qs(url.query)
+            page = int(query.get("page", ["1"])[0])
+            per_page = int(query.get("per_page", ["20"])[0])
+            body = json.dumps({"collection": self.feed_page(page, per_page)}).encode("utf-8")
+            self._send(request, 200, body, "application/json")
+        elif url.path.startswith(FILES_PATH):
+            post_num = int(url.path[len(FILES_PATH):].split(".")[0])
+            self._send(request, 200, b"\xef\xbb\xbf" + self.level_text(post_num).encode("utf-8"), "text/plain")
+        else:
+            self._send(request, 404, b"not found", "text/plain")
+
+    def _send(self, request: BaseHTTPRequestHandler, status: int, body: bytes, content_type: str) -> None:
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+        with self._stats_lock:
+            self.bytes_sent += len(body)
+
+    # --------------------------------------------------------------------------
+    # SYNTHETIC FEED
+    # --------------------------------------------------------------------------
+
+    def feed_page(self, page: int, per_page: int) -> list:
+        first = (page - 1) * per_page
+        return [self.feed_item(post_num) for post_num in range(first, min(first + per_page, self.num_posts))]
+
+    def feed_item(self, post_num: int) -> dict:
+        created_at = NEWEST_POST_AT - datetime.timedelta(days=post_num / self.posts_per_day)
+        post_id = 10_000_000 + self.num_posts - post_num
+        has_file = random.Random(self.seed * 1_000_003 + post_num).random() < self.attachment_ratio
+
+        if has_file:
+            description = "<p>Levels for today are in the attached file.</p>"
+            assets = [{"is_file": True, "original_url": f"{self.base_url}{FILES_PATH}{post_num}.txt",
+                       "original_filename": f"levels-{post_num}.txt"}]
+        else:
+            lines = self.level_text(post_num).split("\n")
+            description = "<p>Levels for today</p><p>" + "<br>".join(lines) + "</p>"
+            assets = []
+
+        return {"post": {
+            "id": post_id,
+            "title": f"Quant levels {created_at:%Y-%m-%d} #{post_num}",
+            "created_at": created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "user": {"name": "Simulated Poster"},
+            "sharing_meta": {"url": f"https://tradingedge.club/posts/{post_id}"},
+            "description": description,
+            "assets": assets,
+        }}
+
+    def level_text(self, post_num: int) -> str:
+        """
+        ~15 level lines, then a BUY and a SELL section, like the real posts.
+        """
+        rng = random.Random(self.seed * 7_919 + post_num)
+        levels = sorted(rng.sample(range(6000, 7000), 18), reverse=True)
+        lines = [f"{lvl}{' - ' + str(lvl + 5) if i % 3 == 0 else ''}{COMMENTS[i % len(COMMENTS)]}"
+                 for i, lvl in enumerate(levels)]
+        return "\n".join(lines[:14] + ["---"] + lines[14:16] + ["---"] + lines[16:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=2_000)
+    parser.add_argument("--posts-per-day", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--attachment-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    simulator = FeedSimulator(args.posts, args.posts_per_day, args.latency_ms / 1000, args.error_rate,
+                              args.attachment_ratio, args.seed, args.port).start()
+    print(f"Serving {args.posts} posts at {simulator.feed_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import datetime
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, List, Set
+
+import pandas as pd
+
+import transform
+from config import Config
+
+
+class CheckpointStore:
+    """
+    SQLite journal for a resumable historical backfill. Records:
+      pages  -> every feed page that was fetched and processed
+      posts  -> every processed post (with its quant_lvl_text), so a resume skips the network for them
+      chunks -> every load chunk committed to the database, and the days it covered
+
+    Every write is its own transaction, so the journal never claims more than what actually happened.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._create_tables()
+
+    @classmethod
+    def open(cls, config: Config, resume: bool = False) -> "CheckpointStore":
+        """
+        Opens the journal at config.checkpoint_path.
+        :param resume: keep the previous journal. A fresh run (or resuming a finished run) starts empty.
+        """
+        store = cls(config.checkpoint_path)
+
+        if resume and store.is_complete():
+            logging.warning("Last backfill already finished. Nothing to resume, starting a fresh run.")
+            resume = False
+
+        if resume:
+            logging.info(f"Resuming backfill: {store.last_page()} pages processed, "
+                         f"{store.committed_chunks()} chunks committed.")
+        else:
+            store.reset()
+
+        return store
+
+    # --------------------------------------------------------------------------
+    # RUN STATE
+    # --------------------------------------------------------------------------
+
+    def reset(self) -> None:
+        with self._conn:
+            for table in ("pages", "posts", "chunks", "run_state"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._set_state("started_at", datetime.datetime.now(datetime.timezone.utc).isoformat())
+
+    def mark_complete(self) -> None:
+        with self._conn:
+            self._set_state("completed_at", datetime.datetime.now(datetime.timezone.utc).isoformat())
+
+    def is_complete(self) -> bool:
+        row = self._conn.execute("SELECT value FROM run_state WHERE key = 'completed_at'").fetchone()
+        return row is not None
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # --------------------------------------------------------------------------
+    # PAGES + POSTS
+    # --------------------------------------------------------------------------
+
+    def record_page(self, page: int, posts: List[dict]) -> None:
+        """
+        Journals a processed feed page together with its posts, in one transaction.
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (page, num_posts, fetched_at) VALUES (?, ?, ?)",
+                (page, len(posts), datetime.datetime.now(datetime.timezone.utc).isoformat())
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO posts (post_key, page, post_json) VALUES (?, ?, ?)",
+                [(post_key(post), page, json.dumps(post)) for post in posts]
+            )
+
+    def last_page(self) -> int:
+        row = self._conn.execute("SELECT MAX(page) FROM pages").fetchone()
+        return row[0] or 0
+
+    def processed_post_keys(self) -> Set[str]:
+        return {row[0] for row in self._conn.execute("SELECT post_key FROM posts")}
+
+    def replay_pages(self) -> Iterator[List[dict]]:
+        """
+        Yields the journaled posts page by page, in the order they were originally processed.
+        """
+        for (page,) in self._conn.execute("SELECT page FROM pages ORDER BY page").fetchall():
+            rows = self._conn.execute("SELECT post_json FROM posts WHERE page = ? ORDER BY rowid", (page,))
+            posts = [json.loads(post_json) for (post_json,) in rows]
+            if posts:
+                yield posts
+
+    # --------------------------------------------------------------------------
+    # LOAD CHUNKS
+    # --------------------------------------------------------------------------
+
+    def record_chunk(self, chunk_num: int, df: pd.DataFrame) -> None:
+        """
+        Journals a chunk that has been committed to the database.
+        """
+        days = sorted({str(day) for day in pd.to_datetime(df['DATETIME']).dt.date})
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chunks (chunk_num, num_rows, days_json, committed_at) VALUES (?, ?, ?, ?)",
+                (chunk_num, len(df), json.dumps(days), datetime.datetime.now(datetime.timezone.utc).isoformat())
+            )
+
+    def committed_chunks(self) -> int:
+        return self._conn.execute("SELECT COUNT(1) FROM chunks").fetchone()[0]
+
+    def committed_days(self) -> Set[datetime.date]:
+        days = set()
+        for (days_json,) in self._conn.execute("SELECT days_json FROM chunks"):
+            days.update(datetime.date.fromisoformat(day) for day in json.loads(days_json))
+        return days
+
+    def skip_committed_days(self, post_batches: Iterable[List[dict]]) -> Iterator[List[dict]]:
+        """
+        Drops posts whose day was already committed by an earlier chunk. Chunks always hold whole days
+        (see transform.stream), so what's left is exactly the work that still has to be loaded.
+        """
+        committed_days = self.committed_days()
+
+        for posts in post_batches:
+            if committed_days:
+                posts = [post for post in posts
+                         if not post.get('date_posted') or transform.post_day(post) not in committed_days]
+            if posts:
+                yield posts
+
+    # --------------------------------------------------------------------------
+    # PRIVATE
+    # --------------------------------------------------------------------------
+
+    def _create_tables(self) -> None:
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS run_state (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages (page INTEGER PRIMARY KEY, num_posts INTEGER, fetched_at TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts (post_key TEXT PRIMARY KEY, page INTEGER, post_json TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks "
+                "(chunk_num INTEGER PRIMARY KEY, num_rows INTEGER, days_json TEXT, committed_at TEXT)"
+            )
+
+    def _set_state(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO run_state (key, value) VALUES (?, ?)", (key, value))
+
+
+def post_key(post: dict) -> str:
+    """
+    Stable identity of a post: the feed's post id, falling back to its link + timestamp.
+    """
+    if post.get('post_id') is not None:
+        return str(post['post_id'])
+    return f"{post.get('link')}|{post.get('date_posted')}"
+
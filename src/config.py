@@ -32,6 +32,89 @@ class Config(BaseSettings):
     te_base_url: str = "https://tradingedge.club/api/web/v1/spaces/20140900/feed"
     te_user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36..."
 
+    # Feed Pagination (N pages in flight, throttled by a token bucket instead of a fixed sleep)
+    te_max_pages_in_flight: int = 4
+    te_rate_limit_per_sec: float = 2.0
+    te_rate_limit_burst: int = 2
+
+    # HTML Parsing ('html.parser' = stdlib; 'lxml' (opt-in, needs lxml) is faster; 'auto' = lxml if installed)
+    html_parser_backend: str = "html.parser"
+
+    # Attachment Downloads (worker threads for file bodies)
+    te_attachment_workers: int = 8
+
+    # HTTP Session (shared keep-alive pool, timeouts in seconds, retry/backoff on 429/5xx)
+    http_pool_size: int = 10
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 30.0
+    http_max_retries: int = 5
+    http_backoff_base: float = 0.5
+    http_backoff_max: float = 30.0
+
+    # HTTP Cache (on-disk, keyed per cookie; attachments never expire, feed pages are revalidated after the TTL; manual_historical turns it on)
+    http_cache_enabled: bool = False
+    http_cache_dir: str = str(project_root_path / ".cache" / "http")
+    http_cache_page_ttl_sec: int = 600
+    http_cache_max_bytes: int = 512 * 1024 * 1024
+
+    # Streaming Pipeline (rows per upsert chunk; whole days are never split across chunks)
+    stream_chunk_rows: int = 500
+
+    # Backfill Checkpoints (SQLite journal of fetched pages, processed posts and committed chunks)
+    checkpoint_path: str = str(project_root_path / ".checkpoints" / "manual_historical.sqlite")
+
+    # Raw Feed Archive (fetched feed items + attachments, compressed JSONL per post day; 'auto' = zstd if installed, else gzip; the fetching scripts turn it on)
+    raw_archive_enabled: bool = False
+    raw_archive_dir: str = str(project_root_path / ".archive" / "raw")
+    raw_archive_compression: str = "auto"
+    raw_archive_compression_level: int = 3
+
+    # Run Metrics (JSON report of per-function spans, counters and histograms; Prometheus textfile path, '' = off)
+    metrics_report_path: str = str(project_root_path / ".metrics" / "last_run.json")
+    metrics_prometheus_path: str = ""
+
+    # Profiling (off unless set: 'cprofile' or 'sample', also via scripts' --profile; per-stage output, see profiling.py)
+    profile_mode: str = ""
+    profile_dir: str = str(project_root_path / ".profiles")
+    profile_sample_interval_ms: float = 5.0
+    profile_tracemalloc: bool = True
+    profile_tracemalloc_frames: int = 1
+    profile_tracemalloc_top: int = 25
+
+    # Storage Backend ('oracle', or 'sqlite' = embedded file at sqlite_path for local backfills/benchmarks, see connectors.storage)
+    storage_backend: str = "oracle"
+    sqlite_path: str = str(project_root_path / ".local" / "quant_levels.sqlite")
+
+    # Oracle Connection Pool (one engine per DSN for the whole process, recycle/timeout in seconds)
+    oracle_pool_size: int = 2
+    oracle_pool_max_overflow: int = 2
+    oracle_pool_timeout: float = 30.0
+    oracle_pool_recycle_sec: int = 1800
+    oracle_pool_pre_ping: bool = True
+    oracle_stmt_cache_size: int = 50  # parsed statements the driver keeps per connection
+
+    # Oracle Bulk Insert (rows per executemany batch; direct path = APPEND_VALUES, committed per batch, only for overwrite loads)
+    oracle_insert_batch_size: int = 10_000
+    oracle_direct_path_load: bool = False
+
+    # Oracle Direct Merge (upserts of up to this many rows MERGE straight from binds, no staging table; 0 = off)
+    oracle_direct_merge_max_rows: int = 500
+
+    # Oracle Overwrite ('swap' = load a shadow table and repoint the table's synonym at it, also for streamed backfills;
+    # 'drop' = drop + recreate in place, the table is empty/partial until the load is done)
+    oracle_overwrite_strategy: str = "swap"
+
+    # Oracle Table Compression for the tables the loader creates ('' = off, 'basic', 'advanced' (needs the license))
+    oracle_table_compression: str = ""
+
+    # Oracle Streaming Reads (rows per yielded DataFrame, rows per fetch round trip, 'cursor' or 'arrow' (needs pyarrow))
+    oracle_fetch_chunk_rows: int = 50_000
+    oracle_fetch_arraysize: int = 5_000
+    oracle_fetch_backend: str = "cursor"
+
+    # Load Watermark (newest post loaded per table, read by incremental runs instead of scanning MAX(DATETIME))
+    oracle_watermark_table_name: str = "QUANT_LOAD_WATERMARK"
+
     oracle_quant_table_name: str = "QUANT_LVL_DATA_TE"
     oracle_quant_pks: [str] = ['DATETIME', 'TICKER', 'START_LVL_PRICE']
 
@@ -0,0 +1,192 @@
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from connectors import http_cache
+import metrics
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to throttle requests to the TradingEdge API.
+    Replaces the fixed time.sleep(1) between pages so several requests can be in flight
+    while still staying under a polite request rate.
+    :param rate: tokens refilled per second (i.e. sustained requests per second)
+    :param capacity: max tokens held at once (i.e. allowed burst size)
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be greater than 0")
+
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a token is available and then consumes it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_time = (1 - self._tokens) / self.rate
+
+            time.sleep(wait_time)
+
+
+# ==============================================================================
+# SHARED SESSION (keep-alive pool + retry/backoff for every extract request)
+# ==============================================================================
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_sessions: Dict[int, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(config: Config) -> requests.Session:
+    """
+    Returns the process-wide pooled session, creating it on first use.
+    Connections are kept alive and reused, so pages and attachments skip the TCP+TLS handshake.
+    """
+    pool_size = config.http_pool_size
+
+    with _sessions_lock:
+        session = _sessions.get(pool_size)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[pool_size] = session
+
+    return session
+
+
+def close_sessions() -> None:
+    """
+    Closes every pooled session (and their sockets).
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def get(config: Config, url: str, params: dict = None, headers: dict = None, timeout=None,
+        immutable: bool = False) -> requests.Response:
+    """
+    GET through the shared session and the on-disk cache (see connectors.http_cache).
+    :param immutable: the resource never changes (attachments), so a cached copy is always served
+    :return: successful response. Cache hits carry response.from_cache = True
+    """
+    cache = http_cache.get_cache(config)
+    if cache is None:
+        return _get_with_retries(config, url, params, headers, timeout)
+
+    key = cache.make_key(url, params, cookie=(headers or {}).get("Cookie"))
+    entry = cache.lookup(key)
+
+    if entry and cache.is_fresh(entry):
+        metrics.count("http_cache_hits")
+        return _cached_response(url, entry)
+
+    # Stale page: revalidate it instead of downloading the body again
+    request_headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = _get_with_retries(config, url, params, request_headers, timeout)
+
+    if response.status_code == 304 and entry:
+        cache.refresh(key)
+        metrics.count("http_cache_revalidated")
+        return _cached_response(url, entry)
+
+    if response.status_code == 200:
+        cache.store(key, url, response.content, response.headers, immutable=immutable)
+
+    response.from_cache = False
+    return response
+
+
+def _cached_response(url: str, entry: dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = entry["body"]
+    if entry.get("content_type"):
+        response.headers["Content-Type"] = entry["content_type"]
+    response.from_cache = True
+    return response
+
+
+def _get_with_retries(config: Config, url: str, params: dict = None, headers: dict = None,
+                      timeout=None) -> requests.Response:
+    """
+    GET through the shared session. Retries connection errors, timeouts, 429s and 5xx
+    with exponential backoff + jitter, and raises once config.http_max_retries is used up.
+    :param timeout: overrides the (connect, read) timeout from config
+    :return: successful response
+    """
+    if timeout is None:
+        timeout = (config.http_connect_timeout, config.http_read_timeout)
+
+    session = get_session(config)
+    max_retries = max(0, config.http_max_retries)
+
+    for attempt in range(max_retries + 1):
+        response = None
+        start_time = time.perf_counter()
+        try:
+            metrics.count("http_requests")
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+            metrics.observe("http_request_seconds", time.perf_counter() - start_time)
+            if response.status_code not in RETRY_STATUS_CODES:
+                response.raise_for_status()
+                metrics.count("http_bytes", len(response.content or b""))
+                return response
+            if attempt == max_retries:
+                response.raise_for_status()
+
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt == max_retries:
+                raise
+            logging.warning(f"Request to {url} failed ({e}).")
+
+        metrics.count("http_retries")
+        delay = _backoff_delay(config, attempt, response)
+        logging.warning(f"Retrying {url} in {delay:.2f}s (attempt {attempt + 1}/{max_retries})")
+        time.sleep(delay)
+
+
+def _backoff_delay(config: Config, attempt: int, response: Optional[requests.Response]) -> float:
+    """
+    Full-jitter exponential backoff. Honours a numeric Retry-After header when the server sends one.
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), config.http_backoff_max)
+
+    ceiling = min(config.http_backoff_max, config.http_backoff_base * (2 ** attempt))
+    return random.uniform(0, ceiling)
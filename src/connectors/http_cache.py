@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from config import Config
+
+
+class HttpCache:
+    """
+    On-disk HTTP response cache.
+
+    Layout under the cache directory:
+      entries/<key>.json -> metadata for one request (url, etag, last_modified, fetched_at, body hash)
+      blobs/<sha256>     -> response bodies, stored content-addressed so identical bodies are kept once
+
+    The key is sha256(url + sorted params + a hash of the Cookie header), so a response fetched in one
+    session is never served to another. Entries marked immutable (attachments) never expire,
+    everything else is fresh for config.http_cache_page_ttl_sec and then revalidated with
+    If-None-Match / If-Modified-Since. Total blob size is capped at config.http_cache_max_bytes
+    by evicting the least recently used entries.
+    """
+
+    def __init__(self, cache_dir: str, page_ttl_sec: float, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.entries_dir = self.cache_dir / "entries"
+        self.blobs_dir = self.cache_dir / "blobs"
+        self.page_ttl_sec = page_ttl_sec
+        self.max_bytes = max_bytes
+
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._blob_refs: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._load_index()
+
+    # --------------------------------------------------------------------------
+    # PUBLIC
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(url: str, params: dict = None, cookie: str = None) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        # Only a hash of the cookie goes into the key, entry files never hold the secret
+        identity = hashlib.sha256((cookie or "").encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{url}?{query}#{identity}".encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """
+        :return: the entry metadata (with its 'body' loaded), or None on a miss
+        """
+        entry_path = self.entries_dir / f"{key}.json"
+        with self._lock:
+            try:
+                entry = json.loads(entry_path.read_text(encoding="utf-8"))
+                entry["body"] = (self.blobs_dir / entry["body_hash"]).read_bytes()
+            except (FileNotFoundError, json.JSONDecodeError, KeyError):
+                return None
+
+            # Touching the entry is what makes eviction least-recently-used
+            os.utime(entry_path)
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        if entry.get("immutable"):
+            return True
+        return (time.time() - entry.get("fetched_at", 0)) < self.page_ttl_sec
+
+    def store(self, key: str, url: str, body: bytes, headers: dict, immutable: bool = False) -> None:
+        body_hash = hashlib.sha256(body).hexdigest()
+        entry = {
+            "url": url,
+            "body_hash": body_hash,
+            "content_type": headers.get("Content-Type"),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "immutable": immutable,
+        }
+
+        with self._lock:
+            old_entry = self._read_entry(key)
+
+            blob_path = self.blobs_dir / body_hash
+            if not blob_path.exists():
+                _atomic_write(blob_path, body)
+                self._total_bytes += len(body)
+            self._blob_refs[body_hash] = self._blob_refs.get(body_hash, 0) + 1
+
+            _atomic_write(self.entries_dir / f"{key}.json", json.dumps(entry).encode("utf-8"))
+
+            if old_entry:
+                self._release_blob(old_entry["body_hash"])
+
+            self._evict_if_needed()
+
+    def refresh(self, key: str) -> None:
+        """
+        Marks a revalidated (304) entry as freshly fetched.
+        """
+        with self._lock:
+            entry = self._read_entry(key)
+            if entry:
+                entry["fetched_at"] = time.time()
+                _atomic_write(self.entries_dir / f"{key}.json", json.dumps(entry).encode("utf-8"))
+
+    # --------------------------------------------------------------------------
+    # PRIVATE
+    # --------------------------------------------------------------------------
+
+    def _load_index(self) -> None:
+        for entry_path in self.entries_dir.glob("*.json"):
+            entry = self._read_entry(entry_path.stem)
+            if entry:
+                self._blob_refs[entry["body_hash"]] = self._blob_refs.get(entry["body_hash"], 0) + 1
+
+        for blob_path in self.blobs_dir.iterdir():
+            if blob_path.name in self._blob_refs:
+                self._total_bytes += blob_path.stat().st_size
+            else:
+                blob_path.unlink(missing_ok=True)  # orphan left over from an interrupted run
+
+    def _read_entry(self, key: str) -> Optional[dict]:
+        try:
+            return json.loads((self.entries_dir / f"{key}.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _release_blob(self, body_hash: str) -> None:
+        self._blob_refs[body_hash] = self._blob_refs.get(body_hash, 1) - 1
+        if self._blob_refs[body_hash] <= 0:
+            del self._blob_refs[body_hash]
+            blob_path = self.blobs_dir / body_hash
+            if blob_path.exists():
+                self._total_bytes -= blob_path.stat().st_size
+                blob_path.unlink()
+
+    def _evict_if_needed(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        entry_paths = sorted(self.entries_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for entry_path in entry_paths:
+            if self._total_bytes <= self.max_bytes:
+                break
+
+            entry = self._read_entry(entry_path.stem)
+            entry_path.unlink(missing_ok=True)
+            if entry:
+                self._release_blob(entry["body_hash"])
+
+        logging.info(f"HTTP cache evicted down to {self._total_bytes} bytes")
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+_caches: Dict[str, HttpCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(config: Config) -> Optional[HttpCache]:
+    """
+    Returns the process-wide cache for config.http_cache_dir, or None when caching is disabled.
+    """
+    if not config.http_cache_enabled:
+        return None
+
+    with _caches_lock:
+        cache = _caches.get(config.http_cache_dir)
+        if cache is None:
+            cache = HttpCache(config.http_cache_dir, config.http_cache_page_ttl_sec, config.http_cache_max_bytes)
+            _caches[config.http_cache_dir] = cache
+
+    return cache
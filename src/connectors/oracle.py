@@ -1,234 +1,1099 @@
+import contextlib
+import copy
 import logging
+import re
+import threading
 import time
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import oracledb
 import pandas as pd
 import sqlalchemy as sa
 from sqlalchemy.exc import NoSuchTableError
 from config import Config
 
 
+class BulkInsertError(Exception):
+    """Raised when rows of an array-bound insert were rejected by Oracle. Holds (row_offset, message) pairs."""
+
+    def __init__(self, table_name: str, errors: List[Tuple[int, str]]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} rows rejected by {table_name}, first: row {errors[0][0]}: {errors[0][1]}")
+
+
 # --- INTERNAL HELPER: CONNECTION FACTORY ---
+class ConnectionStats:
+    """
+    Per-engine counters: new Oracle logins (pool connects) and pool checkouts.
+    """
+
+    def __init__(self):
+        self.logins = 0
+        self.checkouts = 0
+        self._lock = threading.Lock()
+
+    def record_login(self, *_) -> None:
+        with self._lock:
+            self.logins += 1
+
+    def record_checkout(self, *_) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def summary(self) -> Dict[str, int]:
+        return {"logins": self.logins, "checkouts": self.checkouts}
+
+
+_engines: Dict[str, sa.Engine] = {}
+_engine_stats: Dict[str, ConnectionStats] = {}
+_engines_lock = threading.Lock()
+
+
+def _get_dsn(config: Config) -> str:
+    return f"oracle+oracledb://{config.oracle_user}:{config.oracle_pass.get_secret_value()}@{config.oracle_host_ip}:1521/?service_name={config.oracle_service}"
+
+
 def _get_engine(config: Config) -> sa.Engine:
     """
-    Creates a SQLAlchemy engine on demand using config credentials.
+    Returns the process-wide pooled engine for the config's DSN, creating it on first use.
+    Connections are kept in the pool between calls, so a pipeline run logs in to Oracle once per pooled
+    connection instead of once per query. pre_ping drops connections the server has closed and recycle
+    retires them before firewalls/idle timeouts do.
+    """
+    dsn = _get_dsn(config)
+
+    with _engines_lock:
+        engine = _engines.get(dsn)
+        if engine is None:
+            # python-oracledb reuses a parsed statement when the same SQL text runs again on the connection,
+            # which is why callers pass literals as bind values instead of formatting them into the SQL
+            connect_args = {}
+            if sa.engine.make_url(dsn).get_backend_name() == "oracle":
+                connect_args["stmtcachesize"] = config.oracle_stmt_cache_size
+
+            engine = sa.create_engine(
+                dsn,
+                pool_size=config.oracle_pool_size,
+                max_overflow=config.oracle_pool_max_overflow,
+                pool_timeout=config.oracle_pool_timeout,
+                pool_recycle=config.oracle_pool_recycle_sec,
+                pool_pre_ping=config.oracle_pool_pre_ping,
+                connect_args=connect_args,
+            )
+            stats = ConnectionStats()
+            sa.event.listen(engine, "connect", stats.record_login)
+            sa.event.listen(engine, "checkout", stats.record_checkout)
+
+            _engines[dsn] = engine
+            _engine_stats[dsn] = stats
+
+    return engine
+
+
+def connection_stats(config: Config) -> Dict[str, int]:
+    """
+    Logins and checkouts of the config's engine so far, e.g. to measure Oracle logins per pipeline run.
+    """
+    with _engines_lock:
+        stats = _engine_stats.get(_get_dsn(config))
+    return stats.summary() if stats else ConnectionStats().summary()
+
+
+def dispose_engines() -> None:
+    """
+    Closes every pooled engine (and its connections). Call once when the pipeline is done.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _engine_stats.clear()
+
+
+# --- TABLE SPECS (declarative DDL for tables the pipeline owns) ---
+class TableSpec:
+    """
+    Declarative DDL for a table the pipeline owns, instead of types inferred from the DataFrame.
+    Constraint and index names derive from the table name (<table>_PK, <table>_IX1, ...), so the same spec
+    can also create a shadow table next to the live one.
+
+    :param columns: column name -> Oracle type, e.g. {"TICKER": "VARCHAR2(16 CHAR)"}
+    :param partition_column: DATE column to interval range partition on (None = not partitioned)
+    :param partition_interval: interval of the automatically created partitions
+    :param indexes: column lists of secondary indexes (LOCAL when partitioned, prefix compressed)
+    :param compression: table compression clause, e.g. "ROW STORE COMPRESS BASIC" (None = off)
     """
-    dsn = f"oracle+oracledb://{config.oracle_user}:{config.oracle_pass.get_secret_value()}@{config.oracle_host_ip}:1521/?service_name={config.oracle_service}"
-    return sa.create_engine(dsn)
+
+    def __init__(self, columns: Dict[str, str], primary_keys: [str], partition_column: str = None,
+                 partition_interval: str = "NUMTOYMINTERVAL(1, 'MONTH')", partition_start: str = "DATE '2000-01-01'",
+                 indexes: List[List[str]] = None, compression: str = None):
+        self.columns = {col.upper(): col_type.upper() for col, col_type in columns.items()}
+        self.primary_keys = [col.upper() for col in primary_keys]
+        self.partition_column = partition_column.upper() if partition_column else None
+        self.partition_interval = partition_interval
+        self.partition_start = partition_start
+        self.indexes = [[col.upper() for col in index] for index in (indexes or [])]
+        self.compression = compression
+
+    def pk_name(self, table_name: str) -> str:
+        return f"{table_name.upper()}_PK"
+
+    def index_names(self, table_name: str) -> List[str]:
+        return [f"{table_name.upper()}_IX{i + 1}" for i in range(len(self.indexes))]
+
+    def partition_clause(self) -> str:
+        return (f"PARTITION BY RANGE ({self.partition_column}) INTERVAL ({self.partition_interval}) "
+                f"(PARTITION P_START VALUES LESS THAN ({self.partition_start}))")
+
+    def create_statements(self, table_name: str) -> List[str]:
+        """
+        CREATE TABLE (with its primary key) followed by one CREATE INDEX per secondary index.
+        """
+        table_name = table_name.upper()
+
+        column_defs = [f"{col} {col_type}" + (" NOT NULL" if col in self.primary_keys else "")
+                       for col, col_type in self.columns.items()]
+        # A local unique index needs the partition key in it
+        pk_index = " USING INDEX LOCAL" if self.partition_column in self.primary_keys else ""
+        column_defs.append(f"CONSTRAINT {self.pk_name(table_name)} PRIMARY KEY ({', '.join(self.primary_keys)}){pk_index}")
+
+        table_ddl = f"CREATE TABLE {table_name} ({', '.join(column_defs)})"
+        if self.compression:
+            table_ddl += f" {self.compression}"
+        if self.partition_column:
+            table_ddl += f" {self.partition_clause()}"
+
+        return [table_ddl] + [self.create_index_statement(table_name, i) for i in range(len(self.indexes))]
+
+    def create_index_statement(self, table_name: str, index_num: int) -> str:
+        columns = self.indexes[index_num]
+        local = " LOCAL" if self.partition_column else ""
+        compress = " COMPRESS 1" if len(columns) > 1 else ""
+        return (f"CREATE INDEX {self.index_names(table_name)[index_num]} ON {table_name.upper()} "
+                f"({', '.join(columns)}){local}{compress}")
 
 
 # ==============================================================================
 # PUBLIC API (These take 'config' as the entry point)
 # ==============================================================================
 
-def execute(config: Config, sql_statement: str) -> None:
+def execute(config: Config, sql_statement: str, params: Union[dict, List[dict]] = None) -> None:
     """
     Executes a SQL statement that does not return rows (DELETE, UPDATE, etc.)
     and automatically commits.
+    :param params: bind values for the statement's :name placeholders. A list of dicts runs it once per dict.
     """
     start_time = time.time()
 
     engine = _get_engine(config)
-    try:
-        # engine.begin() automatically starts a transaction and commits at the end
-        with engine.begin() as conn:
-            conn.execute(sa.text(sql_statement))
-    finally:
-        engine.dispose()
+    # engine.begin() automatically starts a transaction and commits at the end
+    with engine.begin() as conn:
+        conn.execute(sa.text(sql_statement), params)
 
     end_time = time.time()
     logging.info(f"Query time: {end_time - start_time:.4f} seconds")
 
 
 
-def sql(config: Config, sql_query: str) -> pd.DataFrame:
+def sql(config: Config, sql_query: str, params: dict = None) -> pd.DataFrame:
     """
     Executes a read-only SQL query and returns a DataFrame.
+    :param params: bind values for the query's :name placeholders (passed to the driver as is)
     """
     start_time = time.time()
 
     engine = _get_engine(config)
-    try:
-        # read_sql_query manages connection open/close automatically with an engine
-        df = pd.read_sql_query(sql_query, engine, parse_dates={"DATETIME": '%Y-%m-%d'})
-        df.columns = df.columns.str.upper()
-        return df
-    finally:
-        engine.dispose()
+    # read_sql_query checks a connection out of the pool and returns it when done
+    df = pd.read_sql_query(sql_query, engine, params=params, parse_dates={"DATETIME": '%Y-%m-%d'})
+    df.columns = df.columns.str.upper()
 
     end_time = time.time()
     logging.info(f"Execution time: {end_time - start_time:.4f} seconds")
+    return df
+
+
+class PreparedStatement:
+    """
+    One parameterized statement, parsed once on one pooled connection and then run many times with different
+    bind values. Created by prepare(), which commits when its block ends.
+    """
+
+    def __init__(self, cursor, statement: str):
+        self.statement = statement
+        self._cursor = cursor
+        self._cursor.prepare(statement)
+
+    def execute(self, params: dict = None) -> None:
+        self._cursor.execute(None, params or {})
+
+    def executemany(self, rows: List[dict]) -> None:
+        self._cursor.executemany(None, rows)
+
+    def fetch_df(self, params: dict = None) -> pd.DataFrame:
+        self._cursor.execute(None, params or {})
+        columns = [col[0] for col in self._cursor.description]
+        return _shape_read_df(pd.DataFrame.from_records(self._cursor.fetchall(), columns=columns))
+
+
+@contextlib.contextmanager
+def prepare(config: Config, statement: str) -> Iterator[PreparedStatement]:
+    """
+    Prepare-once / execute-many for repeated parameterized queries:
+
+        with oracle.prepare(config, "SELECT * FROM QUANT_LVL_DATA_TE WHERE TICKER = :ticker") as query:
+            for ticker in tickers:
+                df = query.fetch_df({"ticker": ticker})
+    """
+    engine = _get_engine(config)
+    with engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        try:
+            yield PreparedStatement(cursor, statement)
+        finally:
+            cursor.close()
+
+
+def sql_chunks(config: Config, sql_query: str, chunk_rows: int = None, params: dict = None) -> Iterator[pd.DataFrame]:
+    """
+    Streaming version of sql() for large results (full-table reads, exports): yields the result as DataFrames
+    of chunk_rows rows, so memory stays flat no matter how big the table is.
+    Rows come over in round trips of config.oracle_fetch_arraysize (prefetched with the execute).
+    With config.oracle_fetch_backend = 'arrow', batches are fetched as Arrow data by the driver instead.
+    :param chunk_rows: rows per DataFrame, default config.oracle_fetch_chunk_rows
+    :param params: bind values for the query's :name placeholders
+    """
+    chunk_rows = chunk_rows or config.oracle_fetch_chunk_rows
+    engine = _get_engine(config)
+
+    total_rows = 0
+    start_time = time.time()
+
+    # The pooled connection is held until the generator is exhausted or closed
+    with engine.connect() as conn:
+        if config.oracle_fetch_backend == "arrow":
+            batches = _fetch_arrow_batches(conn, sql_query, chunk_rows, params)
+        else:
+            batches = _fetch_cursor_batches(conn, sql_query, chunk_rows, config.oracle_fetch_arraysize, params)
+
+        for df in batches:
+            total_rows += len(df.index)
+            yield _shape_read_df(df)
+
+    end_time = time.time()
+    logging.info(f"Streamed {total_rows} rows in {end_time - start_time:.4f} seconds")
+
+
+# Advances the watermark row of a table, or sets it outright (see watermark_statement)
+WATERMARK_MERGE_SQL = """
+    MERGE INTO {watermark_table} w
+    USING (SELECT :target_table AS TARGET_TABLE FROM dual) s
+    ON (w.TARGET_TABLE = s.TARGET_TABLE)
+    WHEN MATCHED THEN
+        UPDATE SET w.LAST_POST_CREATED_AT = :created_at, w.LAST_POST_ID = :post_id,
+                   w.UPDATED_AT = SYS_EXTRACT_UTC(SYSTIMESTAMP)
+        {advance_only}
+    WHEN NOT MATCHED THEN
+        INSERT (TARGET_TABLE, LAST_POST_CREATED_AT, LAST_POST_ID, UPDATED_AT)
+        VALUES (s.TARGET_TABLE, :created_at, :post_id, SYS_EXTRACT_UTC(SYSTIMESTAMP))
+"""
+
+
+def watermark_statement(watermark_table: str, advance_only: bool) -> str:
+    """
+    MERGE of a watermark row (binds :target_table, :created_at, :post_id), see load._watermark_statements.
+    :param advance_only: only replace a row whose LAST_POST_CREATED_AT is not newer
+    """
+    return WATERMARK_MERGE_SQL.format(
+        watermark_table=watermark_table,
+        advance_only="WHERE w.LAST_POST_CREATED_AT <= :created_at" if advance_only else "",
+    )
 
 
 def drop_table_if_exists(config: Config, table_name: str) -> None:
     """
-    Public wrapper to drop a table using a fresh connection.
+    Public wrapper to drop a table using a pooled connection.
     """
     start_time = time.time()
 
     table_name = table_name.upper()
     engine = _get_engine(config)
+    _drop_table_internal(engine, table_name)
+
+
+def migrate_table(config: Config, table_name: str, table_spec: TableSpec) -> List[str]:
+    """
+    Idempotently brings table_name in line with table_spec: creates it if it's missing, otherwise adds missing
+    columns, resizes character columns, converts it online to the spec's partitioning and creates missing indexes.
+    Other type changes can't be done in place on a populated table (e.g. FLOAT -> NUMBER(12,4) is ORA-01440),
+    those rebuild the table instead: copied into a shadow table created from the spec, which is swapped in.
+    Running it again on a migrated table does nothing.
+    A failing step (e.g. shrinking a column that holds longer values) raises, it would only fail again on every
+    run. The steps before it stay applied.
+    :return: the DDL statements that were applied
+    """
+    table_name = table_name.upper()
+    engine = _get_engine(config)
+    # A swapped table's name is a synonym, its columns and indexes are the physical table's
+    physical_table = _synonym_target(engine, table_name) or table_name
+
+    if _get_table_metadata(engine, table_name) is None:
+        statements, rebuild_columns = table_spec.create_statements(table_name), None
+    else:
+        statements, rebuild_columns = _migration_statements(engine, physical_table, table_spec)
+
+    if rebuild_columns is not None:
+        return _rebuild_table(engine, table_name, table_spec, rebuild_columns)
+
+    applied = []
     try:
-        _drop_table_internal(engine, table_name)
+        for statement in statements:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(sa.text(statement))
+            except sa.exc.DatabaseError as e:
+                logging.error(f"Migration step failed on '{table_name}': {statement}: {e}")
+                raise
+            logging.info(f"Migrated '{table_name}': {statement}")
+            applied.append(statement)
     finally:
-        engine.dispose()
+        if applied:
+            _invalidate_table_metadata(engine, table_name)
+        # The staging table copies the target's columns, rebuild it only when those changed
+        # (not for a new index or the partitioning, "MODIFY PARTITION BY ...")
+        if any(statement.startswith((f"ALTER TABLE {physical_table} ADD ", f"ALTER TABLE {physical_table} MODIFY ("))
+               for statement in applied):
+            _drop_staging_table(engine, table_name)
+
+    if not statements:
+        logging.info(f"Table '{table_name}' already matches its spec.")
+    return applied
+
+
+def shadow_table_name(config: Config, table_name: str) -> str:
+    """
+    Name of the table a swap overwrite of table_name loads before it's swapped in (see swap_in): whichever of
+    table_name's two physical tables its synonym doesn't point to.
+    """
+    return _shadow_table(_get_engine(config), table_name.upper())
+
+
+def swap_in(config: Config, shadow_table: str, table_name: str, table_spec: TableSpec = None,
+            extra_statements: List[Tuple[str, dict]] = None) -> None:
+    """
+    Swaps an already loaded shadow table in as table_name, like the end of a 'swap' overwrite. For loads that
+    fill shadow_table_name(config, table_name) over several calls, e.g. a streamed backfill.
+    :param extra_statements: (sql, binds) pairs committed once the new table is live
+    :raises NoSuchTableError: if the shadow table doesn't exist (e.g. it was already swapped in)
+    """
+    engine = _get_engine(config)
+    shadow_table, table_name = shadow_table.upper(), table_name.upper()
+
+    if _get_table_metadata(engine, shadow_table) is None:
+        raise NoSuchTableError(f"Shadow table {shadow_table} does not exist, nothing to swap in.")
+    _swap_in(engine, shadow_table, table_name, table_spec, extra_statements)
 
 
 def insert_into_table(config: Config, df: pd.DataFrame, table_name: str, write_mode: str,
-                      primary_keys: [str]) -> None:
+                      primary_keys: [str], table_spec: TableSpec = None,
+                      extra_statements: List[Tuple[str, dict]] = None) -> None:
     """
     Main interface to insert df into oracle.
     :param df:
     :param table_name:
     :param primary_keys:
     :param write_mode: 'ignore', 'upsert', or 'overwrite'
+    :param table_spec: DDL to (re)create the table with on 'overwrite', default: types inferred from df
+    :param extra_statements: (sql, binds) pairs committed in the same transaction as the rows, e.g. a watermark
+     update. With 'overwrite' they run right after the table is created/swapped in (DDL commits on its own).
     """
     start_time = time.time()
     write_mode = write_mode.lower()
     table_name = table_name.upper()
     engine = _get_engine(config)
 
+    if write_mode == 'ignore':
+        _df_to_oracle_insert_ignore(engine, df, table_name, primary_keys, batch_size=config.oracle_insert_batch_size,
+                                    direct_merge_max_rows=config.oracle_direct_merge_max_rows,
+                                    extra_statements=extra_statements)
+    elif write_mode == 'upsert':
+        _df_to_oracle_upsert(engine, df, table_name, primary_keys, batch_size=config.oracle_insert_batch_size,
+                             direct_merge_max_rows=config.oracle_direct_merge_max_rows,
+                             extra_statements=extra_statements)
+    elif write_mode == 'overwrite' and config.oracle_overwrite_strategy.lower() == 'swap':
+        _df_to_oracle_swap(engine, df, table_name, primary_keys, batch_size=config.oracle_insert_batch_size,
+                           direct_path=config.oracle_direct_path_load, table_spec=table_spec,
+                           extra_statements=extra_statements)
+    elif write_mode == 'overwrite':
+        _df_to_oracle_overwrite(engine, df, table_name, primary_keys, batch_size=config.oracle_insert_batch_size,
+                                direct_path=config.oracle_direct_path_load, table_spec=table_spec,
+                                extra_statements=extra_statements)
+    else:
+        raise ValueError("Invalid write mode. Use: ignore, upsert, or overwrite")
 
-    try:
-        if write_mode == 'ignore':
-            _df_to_oracle_insert_ignore(engine, df, table_name, primary_keys)
-        elif write_mode == 'upsert':
-            _df_to_oracle_upsert(engine, df, table_name, primary_keys)
-        elif write_mode == 'overwrite':
-            _df_to_oracle_overwrite(engine, df, table_name, primary_keys)
-        else:
-            raise ValueError("Invalid write mode. Use: ignore, upsert, or overwrite")
-
-        end_time = time.time()
-        logging.info(f"Execution time for {table_name}: {end_time - start_time:.4f} seconds")
-
-    finally:
-        engine.dispose()
+    end_time = time.time()
+    logging.info(f"Execution time for {table_name}: {end_time - start_time:.4f} seconds")
 
 
 # ==============================================================================
 # PRIVATE IMPLEMENTATION (These take 'engine' to reuse connections)
 # ==============================================================================
 
+# Reflected table metadata and generated MERGE SQL, per database (see _get_table_metadata)
+_table_metadata: Dict[Tuple[str, str], dict] = {}
+_merge_statements: Dict[Tuple[str, str, str, str], str] = {}
+_metadata_lock = threading.Lock()
+
+# ORA-00955: name is already used by an existing object
+ORA_NAME_ALREADY_USED = 955
+
+# Longest string SQL takes as a VARCHAR2 bind (MAX_STRING_SIZE=STANDARD), longer ones go in as CLOBs
+MAX_VARCHAR2_BIND_BYTES = 4000
+
+
+def _db_key(engine: sa.Engine) -> str:
+    return engine.url.render_as_string(hide_password=True)
+
+
+def _get_table_metadata(engine: sa.Engine, table_name: str) -> Optional[dict]:
+    """
+    Columns and primary keys of table_name (upper case), or None if it doesn't exist.
+    Oracle's data dictionary is slow, so an existing table is reflected once and then served from the
+    cache until _invalidate_table_metadata is called for it (every DDL in this module does).
+    A missing table is never cached, so it's picked up as soon as something creates it.
+    :return: {"columns": [...], "primary_keys": [...]}
+    """
+    key = (_db_key(engine), table_name.upper())
+    with _metadata_lock:
+        if key in _table_metadata:
+            return _table_metadata[key]
+
+    # A swapped table's name is a synonym (see _swap_in), reflect the table behind it.
+    # Oracle names are upper case in the dictionary, SQLAlchemy spells case-insensitive names in lower case
+    physical_table = _synonym_target(engine, table_name) or table_name
+    reflect_name = engine.dialect.normalize_name(physical_table) if engine.dialect.requires_name_normalize else physical_table
+
+    inspector = sa.inspect(engine)
+    if not inspector.has_table(reflect_name):
+        return None
+
+    metadata = {
+        "columns": [col['name'].upper() for col in inspector.get_columns(reflect_name)],
+        "primary_keys": [col.upper() for col in inspector.get_pk_constraint(reflect_name)['constrained_columns']],
+    }
+    with _metadata_lock:
+        _table_metadata[key] = metadata
+    return metadata
+
+
+def _invalidate_table_metadata(engine: sa.Engine, table_name: str) -> None:
+    """
+    Forgets table_name's cached metadata and every MERGE statement built from or into it.
+    """
+    db_key, table_name = _db_key(engine), table_name.upper()
+    with _metadata_lock:
+        _table_metadata.pop((db_key, table_name), None)
+        for key in [key for key in _merge_statements if key[0] == db_key and table_name in key[1:3]]:
+            del _merge_statements[key]
+
+
+def clear_metadata_cache() -> None:
+    """
+    Forgets all cached table metadata, e.g. after tables were changed outside the pipeline.
+    """
+    with _metadata_lock:
+        _table_metadata.clear()
+        _merge_statements.clear()
+
+
+def _staging_table_name(table_name: str) -> str:
+    return "STG_" + table_name[:20]  # Shorten to ensure valid Oracle ID
+
+
+def _ensure_staging_table(engine: sa.Engine, table_name: str) -> str:
+    """
+    Returns the name of table_name's staging table: a GLOBAL TEMPORARY TABLE with the target's columns,
+    created the first time it's needed and reused by every load after that.
+    Its rows are private to the session and deleted on commit, so concurrent runs never see each
+    other's batch, and loads need no CREATE/DROP (and none of their implicit commits).
+    """
+    staging_table_name = _staging_table_name(table_name)
+    if _get_table_metadata(engine, staging_table_name) is not None:
+        return staging_table_name
+
+    if _get_table_metadata(engine, table_name) is None:
+        raise NoSuchTableError(f"Target table {table_name} does not exist for merge.")
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(sa.text(
+                f"CREATE GLOBAL TEMPORARY TABLE {staging_table_name} ON COMMIT DELETE ROWS "
+                f"AS SELECT * FROM {table_name} WHERE 1 = 0"
+            ))
+        logging.info(f"Staging table '{staging_table_name}' created.")
+    except sa.exc.DatabaseError as e:
+        # Another run created it in the meantime
+        if getattr(e.orig, "code", None) != ORA_NAME_ALREADY_USED:
+            raise
+
+    return staging_table_name
+
+
+def _drop_staging_table(engine: sa.Engine, table_name: str) -> None:
+    """
+    Drops table_name's staging table (if any), so it's rebuilt from the target's new columns on the next merge.
+    """
+    staging_table_name = _staging_table_name(table_name)
+    if _get_table_metadata(engine, staging_table_name) is not None:
+        _drop_table_internal(engine, staging_table_name)
+
+
 def _drop_table_internal(engine: sa.Engine, table_name: str) -> None:
     """
     Internal helper that uses an existing engine to drop a table.
     """
 
     try:
-        # Reflect table to see if it exists
-        meta = sa.MetaData()
-        tbl = sa.Table(table_name.lower(), meta, autoload_with=engine)
+        # Check the (cached) metadata to see if it exists
+        if _get_table_metadata(engine, table_name) is None:
+            logging.warning(f"Table '{table_name}' not found in schema. Skipping drop.")
+            return
 
         logging.info(f"Table '{table_name}' found. Dropping it now...")
+        physical_table = _synonym_target(engine, table_name)
         with engine.begin() as conn:  # 'begin' automatically commits
-            tbl.drop(conn)
+            if physical_table is not None:
+                # A swapped table: its name is a synonym of the table holding the rows
+                conn.execute(sa.text(f"DROP SYNONYM {table_name.upper()}"))
+                conn.execute(sa.text(f"DROP TABLE {physical_table}"))
+            else:
+                conn.execute(sa.text(f"DROP TABLE {table_name.upper()}"))
         logging.info(f"Table '{table_name}' successfully dropped.")
 
-    except NoSuchTableError:
-        logging.warning(f"Table '{table_name}' not found in schema. Skipping drop.")
     except Exception as e:
         logging.error(f"Error dropping table {table_name}: {e}")
+    finally:
+        _invalidate_table_metadata(engine, table_name)
 
 
-def _df_to_oracle_overwrite(engine: sa.Engine, df: pd.DataFrame, table_name: str, primary_keys: [str]) -> int:
+def _df_to_oracle_overwrite(engine: sa.Engine, df: pd.DataFrame, table_name: str, primary_keys: [str],
+                            batch_size: int = 10_000, direct_path: bool = False, table_spec: TableSpec = None,
+                            extra_statements: List[Tuple[str, dict]] = None) -> int:
     """
     Writes table to oracle / Will overwrite if there's anything of the same name.
+    :param batch_size: rows per executemany round trip
+    :param direct_path: load with APPEND_VALUES (see _bulk_insert), which commits every batch, so
+                        extra_statements are committed after the last one
+    :param table_spec: DDL to create the table with, default: Columns + PKs inferred from df
+    :param extra_statements: (sql, binds) pairs committed together with the inserted rows
     """
-    # 1. Drop table if exists
+    # 1. Drop table if exists (and its staging table, which copies its columns)
     _drop_table_internal(engine, table_name)
+    _drop_staging_table(engine, table_name)
 
     # 2. Prepare DataFrame
     df_clean = _lowercase_col_df(df.copy())
-    sa_type_dict = _df_to_sa_types(df_clean)
 
     # 3. Define Schema (Columns + PKs)
-    columns = []
-    for col_name, sql_type in sa_type_dict.items():
-        is_pk = (col_name.lower() in (s.lower() for s in primary_keys))
-        columns.append(sa.Column(col_name, sql_type, primary_key=is_pk))
+    if table_spec is not None:
+        create_statements = [sa.text(statement) for statement in table_spec.create_statements(table_name)]
+    else:
+        columns = []
+        for col_name, sql_type in _df_to_sa_types(df_clean).items():
+            is_pk = (col_name.lower() in (s.lower() for s in primary_keys))
+            columns.append(sa.Column(col_name, sql_type, primary_key=is_pk))
 
-    tbl = sa.Table(table_name, sa.MetaData(), *columns)
+        create_statements = [sa.schema.CreateTable(sa.Table(table_name, sa.MetaData(), *columns))]
 
     # 4. Create and Insert
     with engine.begin() as conn:
-        tbl.create(conn)
+        for statement in create_statements:
+            conn.execute(statement)
         logging.info(f"Table '{table_name}' structure created.")
+        _invalidate_table_metadata(engine, table_name)
 
-        #oracle doesnt accept nan, must convert to NONE
-        df_payload = df_clean.replace({float('nan'): None})
+        if not df_clean.empty:
+            _bulk_insert(conn, df_clean, table_name, batch_size=batch_size, direct_path=direct_path)
+        _execute_statements(conn, extra_statements)
 
-        data_to_insert = df_payload.to_dict(orient='records')
-        if data_to_insert:
-            conn.execute(sa.insert(tbl), data_to_insert)
+    return len(df.index)
 
+
+def _df_to_oracle_swap(engine: sa.Engine, df: pd.DataFrame, table_name: str, primary_keys: [str],
+                       batch_size: int = 10_000, direct_path: bool = False, table_spec: TableSpec = None,
+                       extra_statements: List[Tuple[str, dict]] = None) -> int:
+    """
+    Overwrite without a window where readers see an empty, half-filled or missing table: df is loaded into the
+    table's shadow table first, which is then swapped in (see _swap_in).
+    The shadow table has the primary key (and with a table_spec, its indexes) from the start.
+    extra_statements are committed right after the swap, so only once the new table is live.
+    """
+    shadow_table = _shadow_table(engine, table_name)
+
+    # 1. Load the shadow table (drops a leftover of an interrupted run first)
+    _df_to_oracle_overwrite(engine, df, shadow_table, primary_keys, batch_size=batch_size,
+                            direct_path=direct_path, table_spec=table_spec)
+
+    # 2. + 3. Swap it in, retire the old table
+    _swap_in(engine, shadow_table, table_name, table_spec, extra_statements)
     return len(df.index)
 
 
-def _df_to_oracle_upsert(engine: sa.Engine, df: pd.DataFrame, table_name: str, primary_keys: [str]) -> None:
+def _physical_table_names(table_name: str) -> Tuple[str, str]:
     """
-    Inserts and updates any records based off pk.
+    The two tables a swapped table_name alternates between, its synonym points to one of them.
     """
-    temp_table_name = "TEMP_" + table_name[:20]  # Shorten to ensure valid Oracle ID
+    return f"{table_name.upper()[:26]}_A", f"{table_name.upper()[:26]}_B"
 
-    # 1. Write to Temp Table
-    _df_to_oracle_overwrite(engine, df, temp_table_name, primary_keys)
-    # 2. Create Merge SQL
-    merge_sql = _create_merge_statement(engine, temp_table_name, table_name, "upsert")
-    logging.info(f"Executing MERGE (Upsert)")
 
-    # 3. Execute Merge
+def _synonym_target(engine: sa.Engine, table_name: str) -> Optional[str]:
+    """
+    Table the private synonym table_name points to, or None if table_name isn't a synonym (or not on Oracle).
+    Read from the dictionary every time, a swap in another session repoints it.
+    """
+    if engine.dialect.name != "oracle":
+        return None
+    with engine.connect() as conn:
+        return conn.execute(sa.text("SELECT table_name FROM user_synonyms WHERE synonym_name = :name"),
+                            {"name": table_name.upper()}).scalar()
+
+
+def _shadow_table(engine: sa.Engine, table_name: str) -> str:
+    """
+    The physical table of table_name that isn't live, see shadow_table_name.
+    """
+    table_a, table_b = _physical_table_names(table_name)
+    return table_b if _synonym_target(engine, table_name) == table_a else table_a
+
+
+def _swap_in(engine: sa.Engine, shadow_table: str, table_name: str, table_spec: TableSpec = None,
+             extra_statements: List[Tuple[str, dict]] = None) -> List[str]:
+    """
+    Makes the loaded shadow table live as table_name and drops the table it replaces.
+    table_name is a private synonym of one of two physical tables (see _physical_table_names), so the switch is
+    a single CREATE OR REPLACE SYNONYM: a query resolves table_name to the old or the new table, never to
+    nothing. The shadow table gets the old table's grants before the switch, secondary indexes that aren't in
+    table_spec are replayed on it once the old table is gone (their names are free then).
+    A table_name that is still a plain table (created before swaps used synonyms) is renamed out of the way
+    once and replaced by the synonym. Only that first swap has a moment where the name doesn't resolve.
+    extra_statements run right after the switch, so they're only committed once the new table is live.
+    :return: the swap statements
+    """
+    live_table = _synonym_target(engine, table_name)
+    if live_table is not None:
+        retired_table = live_table
+        swap_statements = [f"CREATE OR REPLACE SYNONYM {table_name} FOR {shadow_table}"]
+    elif _get_table_metadata(engine, table_name) is not None:
+        retired_table = next(name for name in _physical_table_names(table_name) if name != shadow_table)
+        _drop_table_internal(engine, retired_table)
+        swap_statements = [f"ALTER TABLE {table_name} RENAME TO {retired_table}",
+                           f"CREATE SYNONYM {table_name} FOR {shadow_table}"]
+    else:
+        retired_table = None
+        swap_statements = [f"CREATE SYNONYM {table_name} FOR {shadow_table}"]
+
+    if retired_table is not None:
+        # Read from the table as it's named now (a plain table_name is only renamed by the switch)
+        old_table = live_table or table_name
+        spec_indexes = table_spec.index_names(old_table) if table_spec is not None else []
+        index_ddl, grant_ddl = _dependent_ddl(engine, old_table, shadow_table, exclude_indexes=spec_indexes)
+    else:
+        index_ddl, grant_ddl = [], []
+
+    # 1. Grants first, so readers can use the new table from the moment it's live
+    _apply_dependent_ddl(engine, table_name, grant_ddl)
+
+    # 2. Switch
     try:
         with engine.begin() as conn:
-            conn.execute(sa.text(merge_sql))
-        logging.info("MERGE statement executed successfully.")
-    except Exception as e:
-        logging.error(f"Upsert failed: {e}")
+            for statement in swap_statements:
+                conn.execute(sa.text(statement))
+            _execute_statements(conn, extra_statements)
+    except sa.exc.DatabaseError:
+        # DDL commits on its own: if only the rename of a plain table went through, put it back
+        for name in (table_name, retired_table or table_name):
+            _invalidate_table_metadata(engine, name)
+        if len(swap_statements) > 1 and _get_table_metadata(engine, table_name) is None \
+                and _get_table_metadata(engine, retired_table):
+            with engine.begin() as conn:
+                conn.execute(sa.text(f"ALTER TABLE {retired_table} RENAME TO {table_name}"))
+            logging.error(f"Swap into '{table_name}' failed, old table restored.")
         raise
     finally:
-        _drop_table_internal(engine, temp_table_name)
+        for name in (table_name, shadow_table, retired_table or table_name):
+            _invalidate_table_metadata(engine, name)
+    logging.info(f"Table '{shadow_table}' swapped in as '{table_name}'.")
+
+    # 3. Retire the old table, replay its other indexes on the new one
+    if retired_table is not None:
+        _drop_table_internal(engine, retired_table)
+    _drop_staging_table(engine, table_name)
+    _apply_dependent_ddl(engine, table_name, index_ddl)
 
+    return swap_statements
 
-def _df_to_oracle_insert_ignore(engine: sa.Engine, df: pd.DataFrame, table_name: str, primary_keys: [str]) -> None:
+
+def _apply_dependent_ddl(engine: sa.Engine, table_name: str, statements: List[str]) -> None:
+    for statement in statements:
+        try:
+            with engine.begin() as conn:
+                conn.execute(sa.text(statement))
+        except sa.exc.DatabaseError as e:
+            logging.error(f"Could not recreate on '{table_name}': {statement.strip()}: {e}")
+
+
+def _dependent_ddl(engine: sa.Engine, table_name: str, new_table_name: str,
+                   exclude_indexes: [str] = ()) -> Tuple[List[str], List[str]]:
     """
-    Will not insert any records that violate primary_id constraints.
+    CREATE INDEX statements for the table's secondary indexes (all but the primary key's) and GRANT statements
+    for its object privileges, rewritten to replay on new_table_name, the table replacing it.
+    :param exclude_indexes: indexes the replacement table already has an equivalent of (e.g. from its TableSpec)
+    :return: (index DDL, grant DDL)
     """
-    temp_table_name = "TEMP_" + table_name[:20]
+    params = {"table_name": table_name.upper()}
+    with engine.connect() as conn:
+        index_ddl = conn.execute(sa.text(
+            "SELECT i.index_name, DBMS_METADATA.GET_DDL('INDEX', i.index_name) FROM user_indexes i "
+            "WHERE i.table_name = :table_name AND i.index_name NOT IN ("
+            "SELECT c.index_name FROM user_constraints c "
+            "WHERE c.table_name = :table_name AND c.constraint_type = 'P' AND c.index_name IS NOT NULL)"
+        ), params).all()
 
-    # 1. Write to Temp Table
-    _df_to_oracle_overwrite(engine, df, temp_table_name, primary_keys)
+        grants = conn.execute(sa.text(
+            "SELECT grantee, privilege, grantable FROM user_tab_privs_made WHERE table_name = :table_name"
+        ), params).all()
+
+    # GET_DDL spells the table '"OWNER"."TABLE"', point it at the new table
+    on_table = re.compile(rf'(\bON\s+(?:"[^"]+"\.)?)"{re.escape(table_name.upper())}"')
+    index_ddl = [on_table.sub(rf'\1"{new_table_name.upper()}"', str(ddl))
+                 for index_name, ddl in index_ddl if index_name not in exclude_indexes]
+    grant_ddl = [f"GRANT {privilege} ON {new_table_name.upper()} TO {grantee}"
+                 + (" WITH GRANT OPTION" if grantable == "YES" else "")
+                 for grantee, privilege, grantable in grants]
+
+    return index_ddl, grant_ddl
+
+
+def _migration_statements(engine: sa.Engine, table_name: str,
+                          table_spec: TableSpec) -> Tuple[List[str], Optional[Dict[str, str]]]:
+    """
+    DDL that takes an existing table to table_spec in place (see migrate_table). Empty if it already matches.
+    :return: the statements, and the columns (spec + ones only the table has, with their current types) to
+     rebuild the table with when a column can't be retyped in place, else None
+    """
+    params = {"table_name": table_name}
+    with engine.connect() as conn:
+        current_types = {row[0]: _dictionary_column_type(*row[1:]) for row in conn.execute(sa.text(
+            "SELECT column_name, data_type, data_precision, data_scale, char_length, char_used "
+            "FROM user_tab_columns WHERE table_name = :table_name"
+        ), params)}
+        partitioning = conn.execute(sa.text(
+            "SELECT partitioning_type FROM user_part_tables WHERE table_name = :table_name"
+        ), params).scalar()
+        indexes = set(conn.execute(sa.text(
+            "SELECT index_name FROM user_indexes WHERE table_name = :table_name"
+        ), params).scalars())
+
+    statements = []
+    for col, col_type in table_spec.columns.items():
+        if col not in current_types:
+            statements.append(f"ALTER TABLE {table_name} ADD ({col} {col_type})")
+        elif current_types[col] == _normalize_column_type(col_type):
+            continue
+        elif _retypes_in_place(current_types[col], _normalize_column_type(col_type)):
+            statements.append(f"ALTER TABLE {table_name} MODIFY ({col} {col_type})")
+        else:
+            rebuild_columns = dict(table_spec.columns)
+            rebuild_columns.update((name, current_type) for name, current_type in current_types.items()
+                                   if name not in table_spec.columns)
+            return [], rebuild_columns
+
+    if table_spec.partition_column and partitioning is None:
+        statements.append(f"ALTER TABLE {table_name} MODIFY {table_spec.partition_clause()} ONLINE UPDATE INDEXES")
+
+    for i, index_name in enumerate(table_spec.index_names(table_name)):
+        if index_name not in indexes:
+            statements.append(table_spec.create_index_statement(table_name, i))
+
+    return statements, None
+
+
+def _retypes_in_place(current_type: str, spec_type: str) -> bool:
+    """
+    Character columns resize in place (Oracle checks the data fits). Anything else, e.g. FLOAT -> NUMBER(p,s)
+    or VARCHAR2 -> CLOB, needs the column to be empty.
+    """
+    char_types = ("VARCHAR2(", "NVARCHAR2(", "CHAR(", "NCHAR(")
+    return current_type.startswith(char_types) and spec_type.startswith(char_types)
 
-    # 2. Create Merge SQL
-    merge_sql = _create_merge_statement(engine, temp_table_name, table_name, "ignore")
-    logging.info(f"Executing MERGE (Ignore Duplicates)")
 
-    # 3. Execute Merge
+def _rebuild_table(engine: sa.Engine, table_name: str, table_spec: TableSpec, columns: Dict[str, str]) -> List[str]:
+    """
+    Migrates table_name by copy and swap: a shadow table is created from table_spec (plus the extra columns),
+    filled with INSERT ... SELECT (Oracle converts the values to the new types) and swapped in.
+    Rows written to table_name while it's copied are lost, so no load may run concurrently.
+    :return: the DDL + DML that was applied
+    """
+    rebuild_spec = copy.copy(table_spec)
+    rebuild_spec.columns = columns
+    shadow_table = _shadow_table(engine, table_name)
+    copied_columns = ", ".join(col for col in columns if col in _get_table_metadata(engine, table_name)["columns"])
+
+    _drop_table_internal(engine, shadow_table)
+    statements = rebuild_spec.create_statements(shadow_table) + [
+        f"INSERT /*+ APPEND */ INTO {shadow_table} ({copied_columns}) SELECT {copied_columns} FROM {table_name}"]
+
+    logging.info(f"Rebuilding '{table_name}' to retype its columns.")
     try:
         with engine.begin() as conn:
-            conn.execute(sa.text(merge_sql))
+            for statement in statements:
+                conn.execute(sa.text(statement))
+    except sa.exc.DatabaseError as e:
+        logging.error(f"Rebuilding '{table_name}' failed, the table is unchanged: {e}")
+        _drop_table_internal(engine, shadow_table)
+        raise
+    finally:
+        _invalidate_table_metadata(engine, shadow_table)
+
+    statements += _swap_in(engine, shadow_table, table_name, rebuild_spec)
+    logging.info(f"Migrated '{table_name}' by rebuild: {statements}")
+    return statements
+
+
+def _df_to_oracle_upsert(engine: sa.Engine, df: pd.DataFrame, table_name: str, primary_keys: [str],
+                         batch_size: int = 10_000, direct_merge_max_rows: int = 0,
+                         extra_statements: List[Tuple[str, dict]] = None) -> None:
+    """
+    Inserts and updates any records based off pk.
+    :param direct_merge_max_rows: up to this many rows skip the staging table (see _merge_df)
+    :param extra_statements: (sql, binds) pairs committed together with the merge
+    """
+    logging.info(f"Executing MERGE (Upsert)")
+    try:
+        _merge_df(engine, df, table_name, "upsert", batch_size, direct_merge_max_rows, extra_statements)
+        logging.info("MERGE statement executed successfully.")
+    except Exception as e:
+        logging.error(f"Upsert failed: {e}")
+        raise
+
+
+def _df_to_oracle_insert_ignore(engine: sa.Engine, df: pd.DataFrame, table_name: str, primary_keys: [str],
+                                batch_size: int = 10_000, direct_merge_max_rows: int = 0,
+                                extra_statements: List[Tuple[str, dict]] = None) -> None:
+    """
+    Will not insert any records that violate primary_id constraints.
+    :param direct_merge_max_rows: up to this many rows skip the staging table (see _merge_df)
+    :param extra_statements: (sql, binds) pairs committed together with the merge
+    """
+    logging.info(f"Executing MERGE (Ignore Duplicates)")
+    try:
+        _merge_df(engine, df, table_name, "ignore", batch_size, direct_merge_max_rows, extra_statements)
         logging.info("MERGE statement executed successfully.")
     except Exception as e:
         logging.error(f"Insert Ignore failed: {e}")
         raise
-    finally:
-        _drop_table_internal(engine, temp_table_name)
+
+
+def _merge_df(engine: sa.Engine, df: pd.DataFrame, table_name: str, mode: str, batch_size: int,
+              direct_merge_max_rows: int, extra_statements: List[Tuple[str, dict]] = None) -> None:
+    """
+    MERGEs df into table_name. Small batches (a daily incremental is a few dozen rows) MERGE straight from
+    bind variables, bigger ones go through the staging table, where one set-based MERGE beats row-by-row.
+    """
+    if len(df.index) <= direct_merge_max_rows:
+        _merge_direct(engine, df, table_name, mode, batch_size, extra_statements)
+    else:
+        _merge_via_staging(engine, df, table_name, mode, batch_size, extra_statements)
+
+
+def _merge_direct(engine: sa.Engine, df: pd.DataFrame, table_name: str, mode: str, batch_size: int,
+                  extra_statements: List[Tuple[str, dict]] = None) -> None:
+    """
+    Array-DML MERGE: one 'MERGE ... USING (SELECT :1, :2 ... FROM dual)' executed for all rows with
+    executemany, in one transaction. No staging table, no second statement.
+    """
+    df_clean = _lowercase_col_df(df.copy())
+    merge_sql = _create_direct_merge_statement(engine, table_name, list(df_clean.columns), mode)
+
+    with engine.begin() as conn:
+        _execute_array_dml(conn, merge_sql, df_clean, table_name, batch_size)
+        _execute_statements(conn, extra_statements)
+    logging.info(f"Merged {len(df_clean.index)} rows into '{table_name}' directly from binds")
+
+
+def _merge_via_staging(engine: sa.Engine, df: pd.DataFrame, table_name: str, mode: str, batch_size: int,
+                       extra_statements: List[Tuple[str, dict]] = None) -> None:
+    """
+    Loads df into the target's staging table and MERGEs it into the target, in one transaction.
+    The staging table deletes its rows on commit, so there's nothing to clean up, and a failure rolls
+    back both the staged rows and the merge.
+    """
+    # 1. Staging table (only DDL the first time it's ever needed) + Merge SQL
+    staging_table_name = _ensure_staging_table(engine, table_name)
+    merge_sql = _create_merge_statement(engine, staging_table_name, table_name, mode)
+
+    # 2. Stage + Merge
+    df_clean = _lowercase_col_df(df.copy())
+    with engine.begin() as conn:
+        _bulk_insert(conn, df_clean, staging_table_name, batch_size=batch_size)
+        conn.execute(sa.text(merge_sql))
+        _execute_statements(conn, extra_statements)
 
 
 # ==============================================================================
 # HELPER FUNCTIONS (Stateless)
 # ==============================================================================
 
+def _bulk_insert(conn: sa.Connection, df: pd.DataFrame, table_name: str, batch_size: int = 10_000,
+                 direct_path: bool = False) -> int:
+    """
+    Array-binds df into an existing table through the driver's cursor.executemany, one round trip per batch.
+    Column arrays are bound positionally with fixed input sizes, so no per-row dicts are built and the
+    bind buffers are allocated once instead of being resized as longer strings / first non-nulls show up.
+    Rows Oracle rejects are collected with batcherrors and raised together as BulkInsertError.
+
+    :param conn: connection inside the caller's transaction (the insert is committed with it)
+    :param direct_path: INSERT /*+ APPEND_VALUES */, writing above the high water mark (for big backfills into
+                        an empty table). Oracle doesn't support batcherrors for direct path inserts, and the
+                        table can't be read or written again in the same transaction (ORA-12838), so each batch
+                        is committed on its own and the mode is only used for overwrite loads.
+    :return: rows inserted
+    """
+    preparer = conn.dialect.identifier_preparer
+    col_list = ", ".join(preparer.quote(col) for col in df.columns)
+    bind_list = ", ".join(f":{i + 1}" for i in range(len(df.columns)))
+    hint = "/*+ APPEND_VALUES */ " if direct_path else ""
+    insert_sql = f"INSERT {hint}INTO {preparer.quote(table_name)} ({col_list}) VALUES ({bind_list})"
+
+    if direct_path:
+        # A second direct path insert into the table before the commit raises ORA-12838
+        for start in range(0, len(df.index), batch_size):
+            _execute_array_dml(conn, insert_sql, df.iloc[start:start + batch_size], table_name, batch_size,
+                               batcherrors=False)
+            conn.connection.commit()
+    else:
+        _execute_array_dml(conn, insert_sql, df, table_name, batch_size)
+
+    logging.info(f"Inserted {len(df.index)} rows into '{table_name}' (batch_size={batch_size}, direct_path={direct_path})")
+    return len(df.index)
+
+
+def _execute_array_dml(conn: sa.Connection, statement: str, df: pd.DataFrame, table_name: str, batch_size: int,
+                       batcherrors: bool = True) -> None:
+    """
+    Runs a DML statement with positional binds (:1 = first column of df, ...) once per row of df,
+    via executemany in batches of batch_size.
+    :param batcherrors: collect rejected rows and raise them together as BulkInsertError
+    """
+    column_values = _bind_columns(df)
+    input_sizes = _bind_input_sizes(df)
+
+    cursor = conn.connection.cursor()
+    try:
+        for start in range(0, len(df.index), batch_size):
+            rows = list(zip(*(values[start:start + batch_size] for values in column_values)))
+
+            cursor.setinputsizes(*input_sizes)
+            cursor.executemany(statement, rows, batcherrors=batcherrors)
+
+            if batcherrors:
+                errors = [(start + error.offset, error.message) for error in cursor.getbatcherrors()]
+                if errors:
+                    for offset, message in errors[:10]:
+                        logging.error(f"Row {offset} rejected by {table_name}: {message} {rows[offset - start]}")
+                    raise BulkInsertError(table_name, errors)
+    finally:
+        cursor.close()
+
+
+def _execute_statements(conn: sa.Connection, statements: Optional[List[Tuple[str, dict]]]) -> None:
+    """
+    Runs (sql, binds) pairs on conn, inside whatever transaction it has open.
+    """
+    for statement, params in statements or []:
+        conn.execute(sa.text(statement), params)
+
+
+def _bind_columns(df: pd.DataFrame) -> List[list]:
+    """
+    One list of Python values per column. Oracle doesn't accept NaN/NaT, they become None.
+    """
+    return [series.astype(object).where(series.notna(), None).tolist() for _, series in df.items()]
+
+
+def _bind_input_sizes(df: pd.DataFrame) -> list:
+    """
+    Driver bind type per column: numbers, dates, and strings sized to the longest value in the frame in UTF-8
+    bytes, the unit Oracle checks a bind against a VARCHAR2(n BYTE) column in. Columns with values longer than
+    a VARCHAR2 bind holds in SQL are bound as CLOBs (e.g. the quant table's merged COMMENTS).
+    """
+    input_sizes = []
+    for _, series in df.items():
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            input_sizes.append(oracledb.DB_TYPE_NUMBER)
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            input_sizes.append(oracledb.DB_TYPE_DATE)
+        else:
+            lengths = series.dropna().astype(str).str.encode("utf-8").str.len()
+            max_bytes = max(1, int(lengths.max())) if not lengths.empty else 1
+            input_sizes.append(oracledb.DB_TYPE_CLOB if max_bytes > MAX_VARCHAR2_BIND_BYTES else max_bytes)
+    return input_sizes
+
+
 def _create_merge_statement(engine: sa.Engine, src_table: str, tgt_table: str, mode: str) -> str:
     """
     Reflects the Target Table to build a dynamic MERGE statement.
+    Memoized per (source, target, mode) until either table's metadata is invalidated.
     """
-    # Reflect target table to get columns
-    inspector = sa.inspect(engine)
-    if not inspector.has_table(tgt_table.lower()):
+    key = (_db_key(engine), src_table.upper(), tgt_table.upper(), mode.lower())
+    with _metadata_lock:
+        if key in _merge_statements:
+            return _merge_statements[key]
+
+    # Reflect target table (cached) to get columns and PKs
+    metadata = _get_table_metadata(engine, tgt_table)
+    if metadata is None:
         raise NoSuchTableError(f"Target table {tgt_table} does not exist for merge.")
 
-    # Get columns and PKs
-    col_list = [col['name'].upper() for col in inspector.get_columns(tgt_table.lower())]
-    pk_list = [col.upper() for col in inspector.get_pk_constraint(tgt_table.lower())['constrained_columns']]
+    sql = _build_merge_sql(src_table.upper(), tgt_table, metadata["columns"], metadata["primary_keys"], mode)
 
+    with _metadata_lock:
+        _merge_statements[key] = sql
+    return sql
+
+
+def _create_direct_merge_statement(engine: sa.Engine, tgt_table: str, columns: [str], mode: str) -> str:
+    """
+    MERGE whose source is one row of bind variables (:1 = first of columns, ...) selected from dual,
+    for executemany. Memoized like _create_merge_statement.
+    """
+    col_list = [col.upper() for col in columns]
+    source = "(SELECT " + ", ".join(f":{i + 1} AS {col}" for i, col in enumerate(col_list)) + " FROM dual)"
+
+    key = (_db_key(engine), source, tgt_table.upper(), mode.lower())
+    with _metadata_lock:
+        if key in _merge_statements:
+            return _merge_statements[key]
+
+    metadata = _get_table_metadata(engine, tgt_table)
+    if metadata is None:
+        raise NoSuchTableError(f"Target table {tgt_table} does not exist for merge.")
+
+    missing_pks = [pk for pk in metadata["primary_keys"] if pk not in col_list]
+    if missing_pks:
+        raise ValueError(f"DataFrame is missing primary key columns {missing_pks} of {tgt_table}.")
+
+    sql = _build_merge_sql(source, tgt_table, col_list, metadata["primary_keys"], mode)
+
+    with _metadata_lock:
+        _merge_statements[key] = sql
+    return sql
+
+
+def _build_merge_sql(source: str, tgt_table: str, col_list: [str], pk_list: [str], mode: str) -> str:
+    """
+    :param source: table name or subquery, aliased S
+    :param col_list: columns to insert / update (upper case)
+    """
     if not pk_list:
         raise ValueError(f"Table {tgt_table} has no primary keys defined in Oracle.")
 
@@ -250,16 +1115,76 @@ def _create_merge_statement(engine: sa.Engine, src_table: str, tgt_table: str, m
     else:
         raise ValueError(f"Invalid mode: {mode}")
 
-    sql = f"""
+    return f"""
     MERGE INTO {tgt_table.upper()} T
-    USING {src_table.upper()} S
+    USING {source} S
     ON ({on_clause_str})
     {update_part}
     WHEN NOT MATCHED THEN
         INSERT ({insert_cols_str})
         VALUES ({insert_values_str})
     """
-    return sql
+
+
+def _normalize_column_type(col_type: str) -> str:
+    return re.sub(r"\s*,\s*", ",", re.sub(r"\s+", " ", col_type.strip().upper()))
+
+
+def _dictionary_column_type(data_type: str, precision: Optional[int], scale: Optional[int],
+                            char_length: Optional[int], char_used: Optional[str]) -> str:
+    """
+    Spells a user_tab_columns row the way a TableSpec type is written, e.g. NUMBER(12,4) or VARCHAR2(16 CHAR).
+    """
+    if data_type in ("VARCHAR2", "NVARCHAR2", "CHAR", "NCHAR"):
+        return f"{data_type}({char_length} {'CHAR' if char_used == 'C' else 'BYTE'})"
+    if data_type == "NUMBER" and precision is not None:
+        return f"NUMBER({precision},{scale or 0})"
+    if data_type == "FLOAT" and precision is not None:
+        return f"FLOAT({precision})"
+    return data_type
+
+
+def _fetch_cursor_batches(conn: sa.Connection, sql_query: str, chunk_rows: int, arraysize: int,
+                          params: dict = None) -> Iterator[pd.DataFrame]:
+    cursor = conn.connection.cursor()
+    try:
+        cursor.arraysize = arraysize
+        cursor.prefetchrows = arraysize + 1  # +1 lets the driver see the end of a small result without another trip
+        cursor.execute(sql_query, params or {})
+        columns = [col[0] for col in cursor.description]
+
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        cursor.close()
+
+
+def _fetch_arrow_batches(conn: sa.Connection, sql_query: str, chunk_rows: int,
+                         params: dict = None) -> Iterator[pd.DataFrame]:
+    """
+    Driver-side Arrow fetch (python-oracledb fetch_df_batches), converted with pyarrow.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("oracle_fetch_backend='arrow' needs pyarrow. Install it or use 'cursor'.")
+
+    for odf in conn.connection.driver_connection.fetch_df_batches(statement=sql_query, parameters=params,
+                                                                  size=chunk_rows):
+        yield pyarrow.Table.from_arrays(odf.column_arrays(), names=odf.column_names()).to_pandas()
+
+
+def _shape_read_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Same shape sql() returns: upper case columns, DATETIME as datetime64.
+    """
+    df.columns = df.columns.str.upper()
+    if "DATETIME" in df.columns:
+        df["DATETIME"] = pd.to_datetime(df["DATETIME"])
+    return df
 
 
 def _lowercase_col_df(df: pd.DataFrame) -> pd.DataFrame:
@@ -0,0 +1,326 @@
+import datetime
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from sqlalchemy.exc import NoSuchTableError
+
+from config import Config
+from connectors.oracle import TableSpec
+
+# Embedded storage backend: the same public functions as connectors.oracle on a local SQLite file
+# (config.sqlite_path), for local backfills, benchmarks and tests without an Oracle instance.
+# Pick it with Config.storage_backend = 'sqlite' (see connectors.storage).
+#
+# Dates are stored as ISO text ('YYYY-MM-DD HH:MM:SS'), which sorts and compares like the dates themselves.
+# TableSpec's Oracle types are mapped to SQLite affinities, partitioning and compression don't apply.
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ConnectionStats:
+    """
+    Per-database counters, same shape as connectors.oracle's: connections opened and connection uses.
+    """
+
+    def __init__(self):
+        self.logins = 0
+        self.checkouts = 0
+
+    def summary(self) -> Dict[str, int]:
+        return {"logins": self.logins, "checkouts": self.checkouts}
+
+
+# One connection per database file for the whole process. sqlite3 connections aren't safe to share between
+# threads on their own, so every use holds the lock.
+_connections: Dict[str, sqlite3.Connection] = {}
+_connection_stats: Dict[str, ConnectionStats] = {}
+_connections_lock = threading.RLock()
+
+
+def _get_connection(config: Config) -> sqlite3.Connection:
+    path = config.sqlite_path
+    conn = _connections.get(path)
+    if conn is None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL + NORMAL sync: a commit is one sequential write, readers never block the loader
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        _connections[path] = conn
+        _connection_stats[path] = ConnectionStats()
+        _connection_stats[path].logins += 1
+
+    _connection_stats[path].checkouts += 1
+    return conn
+
+
+def connection_stats(config: Config) -> Dict[str, int]:
+    with _connections_lock:
+        stats = _connection_stats.get(config.sqlite_path)
+    return stats.summary() if stats else ConnectionStats().summary()
+
+
+def dispose_engines() -> None:
+    """
+    Closes every open database file. Call once when the pipeline is done.
+    """
+    with _connections_lock:
+        for conn in _connections.values():
+            conn.close()
+        _connections.clear()
+        _connection_stats.clear()
+
+
+# ==============================================================================
+# PUBLIC API (same signatures as connectors.oracle)
+# ==============================================================================
+
+def execute(config: Config, sql_statement: str, params: Union[dict, List[dict]] = None) -> None:
+    """
+    Executes a SQL statement that does not return rows (DELETE, UPDATE, etc.) and commits.
+    :param params: bind values for the statement's :name placeholders. A list of dicts runs it once per dict.
+    """
+    start_time = time.time()
+
+    with _connections_lock:
+        conn = _get_connection(config)
+        with conn:
+            if isinstance(params, list):
+                conn.executemany(sql_statement, [_adapt_params(row) for row in params])
+            else:
+                conn.execute(sql_statement, _adapt_params(params))
+
+    logging.info(f"Query time: {time.time() - start_time:.4f} seconds")
+
+
+def sql(config: Config, sql_query: str, params: dict = None) -> pd.DataFrame:
+    """
+    Executes a read-only SQL query and returns a DataFrame (DATETIME parsed, upper case columns).
+    """
+    start_time = time.time()
+
+    with _connections_lock:
+        df = pd.read_sql_query(sql_query, _get_connection(config), params=_adapt_params(params))
+    df.columns = df.columns.str.upper()
+    if "DATETIME" in df.columns:
+        df["DATETIME"] = pd.to_datetime(df["DATETIME"])
+
+    logging.info(f"Execution time: {time.time() - start_time:.4f} seconds")
+    return df
+
+
+def drop_table_if_exists(config: Config, table_name: str) -> None:
+    with _connections_lock:
+        conn = _get_connection(config)
+        with conn:
+            conn.execute(f"DROP TABLE IF EXISTS {table_name.upper()}")
+
+
+def migrate_table(config: Config, table_name: str, table_spec: TableSpec) -> List[str]:
+    """
+    Idempotently brings table_name in line with table_spec: creates it if it's missing, otherwise adds missing
+    columns and indexes (SQLite columns aren't strictly typed, so there's nothing to retype).
+    :return: the DDL statements that were run, [] if the table already matches table_spec
+    """
+    table_name = table_name.upper()
+
+    with _connections_lock:
+        conn = _get_connection(config)
+        current_columns = _table_columns(conn, table_name)
+
+        if not current_columns:
+            statements = _create_statements(table_name, table_spec)
+        else:
+            statements = [f"ALTER TABLE {table_name} ADD COLUMN {col} {_sqlite_type(col_type)}"
+                          for col, col_type in table_spec.columns.items() if col not in current_columns]
+            current_indexes = _table_indexes(conn, table_name)
+            statements += [statement for index_name, statement in
+                           zip(table_spec.index_names(table_name), _create_statements(table_name, table_spec)[1:])
+                           if index_name not in current_indexes]
+
+        with conn:
+            for statement in statements:
+                conn.execute(statement)
+
+    for statement in statements:
+        logging.info(f"Migrated '{table_name}': {statement}")
+    return statements
+
+
+def insert_into_table(config: Config, df: pd.DataFrame, table_name: str, write_mode: str,
+                      primary_keys: [str], table_spec: TableSpec = None,
+                      extra_statements: List[Tuple[str, dict]] = None) -> None:
+    """
+    Main interface to insert df, same contract as connectors.oracle.insert_into_table. Every mode is a single
+    transaction (SQLite DDL is transactional too, so 'overwrite' never shows a missing or half-filled table):
+      overwrite -> DROP + CREATE (from table_spec, else inferred from df) + executemany INSERT
+      upsert    -> executemany INSERT ... ON CONFLICT (pks) DO UPDATE
+      ignore    -> executemany INSERT ... ON CONFLICT (pks) DO NOTHING
+    A missing table is created first for 'upsert'/'ignore'.
+    :param extra_statements: (sql, binds) pairs committed in the same transaction as the rows
+    """
+    start_time = time.time()
+    write_mode = write_mode.lower()
+    table_name = table_name.upper()
+
+    if write_mode not in ('ignore', 'upsert', 'overwrite'):
+        raise ValueError("Invalid write mode. Use: ignore, upsert, or overwrite")
+
+    df_clean = df.copy()
+    df_clean.columns = df_clean.columns.str.upper()
+    primary_keys = [col.upper() for col in primary_keys]
+    table_spec = table_spec or _infer_table_spec(df_clean, primary_keys)
+
+    columns = list(df_clean.columns)
+    statement = (f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join('?' for _ in columns)})")
+    if write_mode == 'upsert':
+        updates = [f"{col} = excluded.{col}" for col in columns if col not in primary_keys]
+        statement += (f" ON CONFLICT ({', '.join(primary_keys)}) DO UPDATE SET {', '.join(updates)}" if updates
+                      else f" ON CONFLICT ({', '.join(primary_keys)}) DO NOTHING")
+    elif write_mode == 'ignore':
+        statement += f" ON CONFLICT ({', '.join(primary_keys)}) DO NOTHING"
+
+    with _connections_lock:
+        conn = _get_connection(config)
+        with conn:
+            if write_mode == 'overwrite':
+                conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+            if write_mode == 'overwrite' or not _table_columns(conn, table_name):
+                for ddl in _create_statements(table_name, table_spec):
+                    conn.execute(ddl)
+
+            conn.executemany(statement, _bind_rows(df_clean))
+
+            for extra_statement, params in extra_statements or []:
+                conn.execute(extra_statement, _adapt_params(params))
+
+    logging.info(f"Execution time for {table_name} ({write_mode}, {len(df_clean.index)} rows): "
+                 f"{time.time() - start_time:.4f} seconds")
+
+
+def shadow_table_name(config: Config, table_name: str) -> str:
+    """
+    Name of the table a streamed overwrite of table_name loads before it's swapped in (see swap_in).
+    """
+    return "SHD_" + table_name.upper()[:20]
+
+
+def swap_in(config: Config, shadow_table: str, table_name: str, table_spec: TableSpec = None,
+            extra_statements: List[Tuple[str, dict]] = None) -> None:
+    """
+    Replaces table_name with the loaded shadow table in one transaction (drop + rename), readers see either
+    the old or the new table. The shadow's indexes are recreated under table_name's index names.
+    :raises NoSuchTableError: if the shadow table doesn't exist (e.g. it was already swapped in)
+    """
+    shadow_table, table_name = shadow_table.upper(), table_name.upper()
+
+    with _connections_lock:
+        conn = _get_connection(config)
+        if not _table_columns(conn, shadow_table):
+            raise NoSuchTableError(f"Shadow table {shadow_table} does not exist, nothing to swap in.")
+
+        with conn:
+            conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+            conn.execute(f"ALTER TABLE {shadow_table} RENAME TO {table_name}")
+            if table_spec is not None:
+                for index_name in table_spec.index_names(shadow_table):
+                    conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+                for ddl in _create_statements(table_name, table_spec)[1:]:
+                    conn.execute(ddl)
+
+            for extra_statement, params in extra_statements or []:
+                conn.execute(extra_statement, _adapt_params(params))
+
+    logging.info(f"Table '{shadow_table}' swapped in as '{table_name}'.")
+
+
+def watermark_statement(watermark_table: str, advance_only: bool) -> str:
+    """
+    Upsert of a watermark row (binds :target_table, :created_at, :post_id), see load._watermark_statements.
+    """
+    return f"""
+    INSERT INTO {watermark_table} (TARGET_TABLE, LAST_POST_CREATED_AT, LAST_POST_ID, UPDATED_AT)
+    VALUES (:target_table, :created_at, :post_id, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+    ON CONFLICT (TARGET_TABLE) DO UPDATE SET
+        LAST_POST_CREATED_AT = excluded.LAST_POST_CREATED_AT, LAST_POST_ID = excluded.LAST_POST_ID,
+        UPDATED_AT = excluded.UPDATED_AT
+    {f"WHERE {watermark_table}.LAST_POST_CREATED_AT <= excluded.LAST_POST_CREATED_AT" if advance_only else ""}
+    """
+
+
+# ==============================================================================
+# HELPER FUNCTIONS
+# ==============================================================================
+
+def _table_columns(conn: sqlite3.Connection, table_name: str) -> List[str]:
+    return [row[1].upper() for row in conn.execute(f"PRAGMA table_info({table_name})")]
+
+
+def _table_indexes(conn: sqlite3.Connection, table_name: str) -> List[str]:
+    return [row[1].upper() for row in conn.execute(f"PRAGMA index_list({table_name})")]
+
+
+def _create_statements(table_name: str, table_spec: TableSpec) -> List[str]:
+    """
+    CREATE TABLE (with its primary key) + one CREATE INDEX per secondary index, all IF NOT EXISTS.
+    """
+    column_defs = [f"{col} {_sqlite_type(col_type)}" + (" NOT NULL" if col in table_spec.primary_keys else "")
+                   for col, col_type in table_spec.columns.items()]
+    column_defs.append(f"CONSTRAINT {table_spec.pk_name(table_name)} PRIMARY KEY ({', '.join(table_spec.primary_keys)})")
+
+    statements = [f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(column_defs)})"]
+    statements += [f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)})"
+                   for index_name, columns in zip(table_spec.index_names(table_name), table_spec.indexes)]
+    return statements
+
+
+def _sqlite_type(col_type: str) -> str:
+    """
+    SQLite affinity of an Oracle type, e.g. VARCHAR2(16 CHAR) -> TEXT, NUMBER(12,4) -> REAL, DATE -> TEXT.
+    """
+    col_type = col_type.upper()
+    if col_type.startswith(("NUMBER", "FLOAT", "BINARY_")):
+        return "INTEGER" if col_type.endswith(",0)") else "REAL"
+    return "TEXT"
+
+
+def _infer_table_spec(df: pd.DataFrame, primary_keys: [str]) -> TableSpec:
+    columns = {}
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_integer_dtype(dtype):
+            columns[col] = "NUMBER(19,0)"
+        elif pd.api.types.is_numeric_dtype(dtype):
+            columns[col] = "NUMBER"
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            columns[col] = "DATE"
+        else:
+            columns[col] = "VARCHAR2(4000 CHAR)"
+    return TableSpec(columns=columns, primary_keys=primary_keys)
+
+
+def _bind_rows(df: pd.DataFrame) -> List[tuple]:
+    """
+    Rows of df as plain tuples for executemany: dates as ISO text, NaN/NaT as NULL, numpy scalars as Python ones.
+    """
+    bind_df = df.astype(object)
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            bind_df[col] = df[col].dt.strftime(DATE_FORMAT).astype(object)
+    bind_df = bind_df.where(df.notna(), None)
+    return [tuple(value.item() if isinstance(value, np.generic) else value for value in row)
+            for row in bind_df.itertuples(index=False, name=None)]
+
+
+def _adapt_params(params: Optional[dict]) -> dict:
+    # sqlite3's own datetime adapter is deprecated, bind dates as the same ISO text _bind_rows writes
+    return {key: value.strftime(DATE_FORMAT) if isinstance(value, datetime.datetime) else value
+            for key, value in (params or {}).items()}
@@ -0,0 +1,26 @@
+import importlib
+from types import ModuleType
+
+from config import Config
+
+# Storage backends by Config.storage_backend. Every backend module exposes the same functions:
+#   insert_into_table(config, df, table_name, write_mode, primary_keys, table_spec=None, extra_statements=None)
+#   sql(config, sql_query, params=None) / execute(config, sql_statement, params=None)
+#   migrate_table(config, table_name, table_spec) / drop_table_if_exists(config, table_name)
+#   shadow_table_name(config, table_name) / swap_in(config, shadow_table, table_name, table_spec=None, extra_statements=None)
+#   watermark_statement(watermark_table, advance_only)
+#   connection_stats(config) / dispose_engines()
+BACKENDS = {
+    "oracle": "connectors.oracle",
+    "sqlite": "connectors.sqlite",
+}
+
+
+def get_backend(config: Config) -> ModuleType:
+    """
+    The storage backend module selected by config.storage_backend (imported on first use).
+    """
+    backend = config.storage_backend.lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{config.storage_backend}'. Use: {', '.join(BACKENDS)}")
+    return importlib.import_module(BACKENDS[backend])
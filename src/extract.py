@@ -1,9 +1,18 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator, List
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
+from connectors import http
+import raw_archive
+import metrics
+from checkpoint import post_key
+from watermark import FeedWatermark, parse_created_at
 import logging
 import requests
+import threading
 import time
-from datetime import datetime, timedelta
+import math
+from datetime import date, datetime, timedelta
 from dateutil import parser
 from bs4 import BeautifulSoup
 import re
@@ -15,99 +24,263 @@ class NoSuchElementException:
 # Configure logging
 logger = logging.getLogger(__name__)
 
-def run(config: Config, cutoff_date: datetime = None) -> [{}]:
+@metrics.timed
+def run(config: Config, cutoff_date: datetime = None, watermark: FeedWatermark = None) -> [{}]:
     """
     Queries the API for mighty and gets all the posts data we need from the feed and puts it in a json
     :param config:
     :param cutoff_date: will only grab posts from current date to this date
+    :param watermark: will only grab posts newer than this exact post (see load.get_watermark)
     :return: semi-structured json containing the following properties:
-     title, original_poster, date_posted, link, html_body, file_link, quant_lvl_txt
+     post_id, title, original_poster, date_posted, link, html_body, file_link, quant_lvl_txt
 
     """
 
-    raw_json_response = _fetch_raw_feed(config, cutoff_date)
+    raw_json_response = _fetch_raw_feed(config, cutoff_date, watermark)
     json_response_with_html = _parse_feed_data(raw_json_response)
-    json_response_with_raw_text = _extract_quant_levels_from_post_body(json_response_with_html)
-    json_response_with_file = _extract_file_link(json_response_with_raw_text)
+    json_response_with_content = _extract_post_content(json_response_with_html, config)
 
-    return json_response_with_file
+    metrics.count("posts_extracted", len(json_response_with_content))
+    return json_response_with_content
 
 
-def _fetch_raw_feed(config: Config, cutoff_date: datetime = None) -> []:
+def stream(config: Config, cutoff_date: datetime = None, checkpoint=None,
+           watermark: FeedWatermark = None) -> Iterator[List[dict]]:
+    """
+    Streaming version of run(). Yields the processed posts one feed page at a time, so memory stays
+    bounded by the pages in flight instead of the whole history.
+    :param config:
+    :param cutoff_date: will only grab posts from current date to this date
+    :param checkpoint: optional checkpoint.CheckpointStore. Pages it already holds are replayed from the
+     journal without touching the network, fetching resumes on the page after, and every newly
+     processed page is journaled.
+    :param watermark: will only grab posts newer than this exact post
+    :return: generator of post lists, in feed order (same fields as run())
+    """
+    start_page = 1
+    seen_post_keys = set()
+
+    if checkpoint is not None:
+        yield from checkpoint.replay_pages()
+        start_page = checkpoint.last_page() + 1
+        seen_post_keys = checkpoint.processed_post_keys()
+
+    for page, page_items in enumerate(_iter_feed_pages(config, cutoff_date, start_page, watermark), start=start_page):
+        if cutoff_date is not None:
+            page_items = _prune_old_posts(page_items, cutoff_date)
+
+        posts = _parse_feed_data(page_items)
+
+        # New posts push older ones down the feed, so a resumed page can repeat posts we already have
+        if seen_post_keys:
+            posts = [post for post in posts if post_key(post) not in seen_post_keys]
+
+        if posts:
+            posts = _extract_post_content(posts, config)
+            metrics.count("posts_extracted", len(posts))
+
+        if checkpoint is not None:
+            checkpoint.record_page(page, posts)
+
+        if posts:
+            yield posts
+
+
+@metrics.timed
+def replay(config: Config, start_date: date = None, end_date: date = None) -> [{}]:
+    """
+    Offline version of run(): rebuilds the posts from the raw archive (see raw_archive) instead of the API,
+    attachments included, so a parser change can be re-applied to the whole history without a re-scrape.
+    :param start_date: first post day to replay (inclusive), default: the whole archive
+    :param end_date: last post day to replay (inclusive), default: the whole archive
+    :return: same fields as run(), newest post first
+    """
+    raw_items, attachment_texts = raw_archive.read(config, start_date, end_date)
+    logger.info(f"Replaying {len(raw_items)} archived feed items and {len(attachment_texts)} attachments")
+
+    posts = _parse_feed_data(raw_items)
+    return _extract_post_content(posts, config, attachment_texts=attachment_texts)
+
+
+@metrics.timed
+def _fetch_raw_feed(config: Config, cutoff_date: datetime = None, watermark: FeedWatermark = None) -> []:
     """
     Grabs all the html related to the post from the hidden api
     :param config:
     :param cutoff_date: cutoff date to stop scrolling through infinite scroll
+    :param watermark: last loaded post, to stop scrolling right at it
     :return: list of all raw html
     """
-    base_url = config.te_base_url
+    all_raw_items = []
+
+    for page_items in _iter_feed_pages(config, cutoff_date, watermark=watermark):
+        all_raw_items.extend(page_items)
 
+    if cutoff_date is not None:
+        all_raw_items = _prune_old_posts(all_raw_items, cutoff_date)
+
+    return all_raw_items
+
+
+def _iter_feed_pages(config: Config, cutoff_date: datetime = None, start_page: int = 1,
+                     watermark: FeedWatermark = None) -> Iterator[list]:
+    """
+    Walks the feed and yields the raw items of each page, in page order.
+    Keeps up to config.te_max_pages_in_flight pages requested at once (throttled by a token bucket),
+    but consumes them strictly in page order so the result is identical to walking page by page.
+    With a watermark, pages are cut right before the last loaded post and nothing after it is yielded, so
+    no prune pass is needed. The window of pages in flight then starts at 1 and doubles per page, because a
+    daily run usually ends on page 1 and every prefetched page would be a wasted request.
+    :param config:
+    :param cutoff_date: cutoff date to stop scrolling through infinite scroll
+    :param start_page: first page to request
+    :param watermark: last loaded post, stops as soon as it shows up
+    :return: generator of raw page item lists
+    """
+    headers = _get_auth_headers(config)
+
+    rate_limiter = http.TokenBucket(config.te_rate_limit_per_sec, config.te_rate_limit_burst)
+    max_in_flight = max(1, config.te_max_pages_in_flight)
+    window = 1 if watermark is not None else max_in_flight
+    stop_event = threading.Event()
+
+    logger.info(f"Starting fetch. Cutoff date: {cutoff_date}. Pages in flight: {max_in_flight}")
+
+    executor = ThreadPoolExecutor(max_workers=max_in_flight)
+    in_flight = {}
+    next_page_to_submit = start_page
+    current_page = start_page
+
+    try:
+        while True:
+            # 1. Keep the window of in-flight pages topped up
+            while len(in_flight) < window:
+                in_flight[next_page_to_submit] = executor.submit(
+                    _fetch_feed_page, config, headers, next_page_to_submit, rate_limiter, stop_event
+                )
+                next_page_to_submit += 1
+
+            # 2. Consume pages strictly in order
+            # Transient errors are already retried by the session layer, so anything
+            # raised here is fatal: fail loudly rather than load a truncated feed
+            try:
+                page_items = in_flight.pop(current_page).result()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Network error on page {current_page}: {e}")
+                raise
+
+            if not page_items:
+                logger.info("No items returned. End of feed.")
+                break
+
+            raw_archive.record_page(config, page_items)
+            metrics.count("feed_pages")
+            metrics.observe("feed_page_items", len(page_items))
+
+            reached_watermark = False
+            if watermark is not None:
+                page_items, reached_watermark = _split_at_watermark(page_items, watermark)
+
+            # 3. Hand the page to the caller
+            if page_items or not reached_watermark:
+                yield page_items
+
+            # 4. DATE CHECK
+            if reached_watermark:
+                logger.info(f"Reached last loaded post ({watermark}) on page {current_page}. Stopping.")
+                break
+            if cutoff_date and _page_reached_cutoff(page_items, cutoff_date):
+                break
+
+            # 5. Prepare next page
+            current_page += 1
+            window = min(max_in_flight, window * 2)
+    finally:
+        # Anything past the stopping page is thrown away, same as if we never asked for it
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+@metrics.timed
+def _fetch_feed_page(config: Config, headers: Dict[str, str], page: int, rate_limiter: http.TokenBucket,
+                     stop_event: threading.Event) -> []:
+    """
+    Fetches a single page of the feed. Runs inside the page fetcher's thread pool.
+    :param page: page number to request
+    :param rate_limiter: shared token bucket, one token per request
+    :param stop_event: set once the consumer has stopped, so queued pages skip the request
+    :return: list of raw items on that page (empty list once past the end of the feed)
+    """
     params = {
         'per_page': 20,
         'prompt_types': 'advertisement,profile_builder',
         'sort': 'newest',
-        'page': 1
+        'page': page
     }
 
-    headers = _get_auth_headers(config)
+    rate_limiter.acquire()
+    if stop_event.is_set():
+        return []
 
-    all_raw_items = []
+    logger.info(f"Fetching Page {page}...")
 
-    logger.info(f"Starting fetch. Cutoff date: {cutoff_date}")
+    response = http.get(config, config.te_base_url, params=params, headers=headers)
+    data = response.json()
 
-    while True:
-        try:
-            logger.info(f"Fetching Page {params['page']}...")
+    # Extract list from response
+    if isinstance(data, list):
+        return data
 
-            response = requests.get(base_url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+    return data.get('collection') or data.get('posts') or []
 
-            # Extract list from response
-            if isinstance(data, list):
-                page_items = data
-            else:
-                page_items = data.get('collection') or data.get('posts') or []
 
-            if not page_items:
-                logger.info("No items returned. End of feed.")
-                break
+def _page_reached_cutoff(page_items: [], cutoff_date: datetime) -> bool:
+    """
+    Checks whether a page has scrolled past the cutoff date.
+    :param page_items: raw items of one page
+    :param cutoff_date:
+    :return: True if we should stop fetching further pages
+    """
+    # We check the LAST item in this batch (since it's sorted by newest)
+    last_item = page_items[-1]
 
-            # 1. Add items to our master list
-            all_raw_items.extend(page_items)
+    # Dig for the date string. Note: It's usually inside 'post' -> 'created_at'
+    raw_date_str = last_item.get('post', {}).get('created_at')
 
-            # 2. DATE CHECK (The Logic You Requested)
-            if cutoff_date:
-                # We check the LAST item in this batch (since it's sorted by newest)
-                last_item = page_items[-1]
+    if raw_date_str:
+        # Parse ISO string to datetime object
+        # We use dateutil for robustness, or datetime.fromisoformat()
+        item_date = parser.isoparse(raw_date_str)
 
-                # Dig for the date string. Note: It's usually inside 'post' -> 'created_at'
-                raw_date_str = last_item.get('post', {}).get('created_at')
+        # Ensure cutoff_date is comparable (timezone awareness)
+        if item_date <= cutoff_date:
+            logger.info(f"Reached cutoff date ({item_date} < {cutoff_date}). Stopping.")
+            return True
+    else:
+        logger.warning("Could not find date in last item. Continuing safely.")
 
-                if raw_date_str:
-                    # Parse ISO string to datetime object
-                    # We use dateutil for robustness, or datetime.fromisoformat()
-                    item_date = parser.isoparse(raw_date_str)
+    return False
 
-                    # Ensure cutoff_date is comparable (timezone awareness)
-                    if item_date <= cutoff_date:
-                        logger.info(f"Reached cutoff date ({item_date} < {cutoff_date}). Stopping.")
-                        break
-                else:
-                    logger.warning("Could not find date in last item. Continuing safely.")
+def _split_at_watermark(page_items: [], watermark: FeedWatermark) -> ([], bool):
+    """
+    Cuts a page (newest first) right before the first post the last run already loaded: the watermark post
+    itself (matched by id), or, if that post was deleted, the first one not newer than it.
+    :return: the new items, and whether the watermark was reached (nothing further down is new)
+    """
+    for i, item in enumerate(page_items):
+        post = item.get('post', {})
+        if not post:
+            continue
 
-            # 3. Prepare next page
-            params['page'] += 1
-            time.sleep(1)  # Be polite
+        if watermark.post_id is not None and str(post.get('id')) == watermark.post_id:
+            return page_items[:i], True
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error: {e}")
-            break
+        item_date = parse_created_at(post.get('created_at'))
+        if item_date is not None and not watermark.is_newer(item_date, post.get('id')):
+            return page_items[:i], True
 
-    if cutoff_date is not None:
-        all_raw_items = _prune_old_posts(all_raw_items, cutoff_date)
+    return page_items, False
 
-    return all_raw_items
 
 def _get_auth_headers(config: Config) -> Dict[str, str]:
     """
@@ -158,11 +331,12 @@ def _prune_old_posts(posts_list: [], cutoff_date: datetime) -> []:
     return keep_list
 
 
+@metrics.timed
 def _parse_feed_data(raw_data: []) -> []:
     """
     Parses the feed data to extract key info including the HTML body.
     :param raw_data: The JSON list from the 'feed' API response
-    :return: List of dicts containing: title, original_poster, date_posted, link, html_body
+    :return: List of dicts containing: post_id, title, original_poster, date_posted, link, html_body
     """
     # Handle list vs dictionary response structure
     if isinstance(raw_data, list):
@@ -214,6 +388,7 @@ def _parse_feed_data(raw_data: []) -> []:
                 html_body += injected_html
 
         entry = {
+            "post_id": post_content.get('id'),
             "title": post_content.get('title', 'No Title'),
             "original_poster": user_info.get('name', 'Unknown'),
             "date_posted": post_content.get('created_at'),
@@ -225,94 +400,219 @@ def _parse_feed_data(raw_data: []) -> []:
 
     return output_list
 
-def _extract_quant_levels_from_post_body(posts):
-    """
-    Extracts 'quant level' text by scanning the raw text content of the post.
-    Captures:
-    1. Lines starting with 3+ digits (e.g., "6500", "6400-6450")
-    2. Separator lines (e.g., "---", "----")
-    """
+# Regex 1: Quant Level (Starts with 3+ digits)
+LEVEL_PATTERN = re.compile(r"^\s*\d{3,}")
 
-    # Regex 1: Quant Level (Starts with 3+ digits)
-    level_pattern = re.compile(r"^\s*\d{3,}")
+# Regex 2: Separator (Starts with 3+ dashes)
+# This handles "---", "----", "------", and trailing spaces
+SEPARATOR_PATTERN = re.compile(r"^\s*-{3,}")
 
-    # Regex 2: Separator (Starts with 3+ dashes)
-    # This handles "---", "----", "------", and trailing spaces
-    separator_pattern = re.compile(r"^\s*-{3,}")
+FILE_LINK_SELECTOR = "a.mighty-file, a.mighty-file-attachment-link"
+
+
+@metrics.timed
+def _extract_post_content(posts, config: Config, attachment_texts: Dict[str, Optional[str]] = None):
+    """
+    Fused post-processing stage: parses each 'html_body' ONCE and pulls out both the quant-level
+    lines and the attachment link from that one tree. Output is identical to the two-pass
+    reference in tests/reference_extract.py.
+    :param attachment_texts: attachment bodies by url (e.g. from the raw archive), used instead of downloading
+    """
+    parser_backend = _html_parser_backend(config)
+    posts_with_files = []
 
     for post in posts:
         logging.info(f"Extracting post: {post.get('date_posted')}:{post.get('title')}")
         html_body = post.get('html_body')
 
         post['quant_lvl_text'] = None
+        post['file_link'] = None
 
         if not html_body:
             continue
 
-        soup = BeautifulSoup(html_body, "html.parser")
+        soup = BeautifulSoup(html_body, parser_backend)
+
+        post['quant_lvl_text'] = _quant_levels_from_soup(soup)
+
+        file_tag = soup.select_one(FILE_LINK_SELECTOR)
+        if file_tag:
+            post['file_link'] = file_tag.get("href")
+            posts_with_files.append(post)
+
+    _attach_file_contents(posts_with_files, config, attachment_texts)
+
+    return posts
 
-        # 1. Convert entire HTML to text, treating <br> and </p> as newlines
-        text_content = soup.get_text(separator="\n")
 
-        # 2. Split into raw lines
-        raw_lines = text_content.splitlines()
+def _html_parser_backend(config: Config) -> str:
+    """
+    Resolves config.html_parser_backend. The default is the stdlib 'html.parser'; 'lxml' is several times faster
+    (test_lxml_matches_html_parser checks both give the same levels and links), 'auto' picks it when installed.
+    """
+    backend = config.html_parser_backend
+    if backend == "auto":
+        return "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+    return backend
 
-        extracted_lines = []
 
-        for line in raw_lines:
-            clean_line = line.strip()
+def _quant_levels_from_soup(soup: BeautifulSoup) -> Optional[str]:
+    """
+    Scans the text content of a parsed post body for quant level and separator lines.
+    :return: matching lines joined by newlines, or None if nothing matched
+    """
+    # 1. Convert entire HTML to text, treating <br> and </p> as newlines
+    text_content = soup.get_text(separator="\n")
 
-            # 3. Check if line matches either pattern
-            if level_pattern.match(clean_line) or separator_pattern.match(clean_line):
-                extracted_lines.append(clean_line)
+    # 2. Split into raw lines
+    raw_lines = text_content.splitlines()
 
-        # 4. Save result
-        if extracted_lines:
-            post['quant_lvl_text'] = "\n".join(extracted_lines)
+    extracted_lines = []
 
-    return posts
+    for line in raw_lines:
+        clean_line = line.strip()
 
-def _extract_file_link(posts):
+        # 3. Check if line matches either pattern
+        if LEVEL_PATTERN.match(clean_line) or SEPARATOR_PATTERN.match(clean_line):
+            extracted_lines.append(clean_line)
+
+    # 4. Save result
+    if extracted_lines:
+        return "\n".join(extracted_lines)
+
+    return None
+
+
+def _attach_file_contents(posts_with_files, config: Config, attachment_texts: Dict[str, Optional[str]] = None) -> None:
     """
-    Iterates through a list of post objects, parses the 'html_body',
-    and adds a 'has_file' property based on the presence of 'a.mighty-file'.
+    Downloads the attachment of every post concurrently and overwrites its 'quant_lvl_text' with it.
+    Downloaded bodies are archived (see raw_archive).
+    :param attachment_texts: attachment bodies by url to use instead of downloading (a missing url gives None)
     """
-    for post in posts:
-        html_body = post.get("html_body", "")
+    if attachment_texts is not None:
+        for post in posts_with_files:
+            post["quant_lvl_text"] = attachment_texts.get(post["file_link"])
+        return
 
-        soup = BeautifulSoup(html_body, "html.parser")
+    file_contents, stats = _download_attachments([post["file_link"] for post in posts_with_files], config)
 
-        file_tag = soup.select_one("a.mighty-file, a.mighty-file-attachment-link")
+    for post, file_content in zip(posts_with_files, file_contents):
+        post["quant_lvl_text"] = file_content
 
-        if file_tag:
-            post["file_link"] = file_tag.get("href")
-            post["quant_lvl_text"] = _get_file_content(post["file_link"])
+    raw_archive.record_attachments(config, [(post.get("date_posted"), post["file_link"], file_content)
+                                            for post, file_content in zip(posts_with_files, file_contents)
+                                            if file_content is not None])
+
+    logger.info(f"Attachment stats: {stats.summary()}")
+
+
+class AttachmentStats:
+    """
+    Per-run counters for attachment downloads: files fetched, bytes, failures and latency percentiles.
+    """
+
+    def __init__(self):
+        self.files_fetched = 0
+        self.bytes_fetched = 0
+        self.failures = 0
+        self.latencies = []
+
+    def record(self, num_bytes: Optional[int], latency: float) -> None:
+        """
+        :param num_bytes: size of the downloaded body, None if the download failed
+        :param latency: wall clock seconds spent on the download (retries included)
+        """
+        self.latencies.append(latency)
+        if num_bytes is None:
+            self.failures += 1
         else:
-            post["file_link"] = None
+            self.files_fetched += 1
+            self.bytes_fetched += num_bytes
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "files_fetched": self.files_fetched,
+            "bytes": self.bytes_fetched,
+            "failures": self.failures,
+            "p50_latency_sec": round(_percentile(self.latencies, 50), 4),
+            "p95_latency_sec": round(_percentile(self.latencies, 95), 4),
+        }
 
-    return posts
 
+def _percentile(values: [float], pct: float) -> float:
+    """
+    Nearest-rank percentile. Returns 0.0 for an empty list.
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@metrics.timed
+def _download_attachments(file_links: [str], config: Config) -> ([Optional[str]], AttachmentStats):
+    """
+    Downloads every attachment with a pool of config.te_attachment_workers threads.
+    :param file_links: attachment urls, may contain None
+    :return: file contents in the same order as file_links (None on failure), and the run stats
+    """
+    stats = AttachmentStats()
+    links_to_fetch = [link for link in file_links if link]
+
+    if not links_to_fetch:
+        return [None] * len(file_links), stats
 
+    max_workers = max(1, min(config.te_attachment_workers, len(links_to_fetch)))
 
-def _get_file_content(file_link):
+    def timed_fetch(file_link):
+        start_time = time.perf_counter()
+        file_content, num_bytes = _fetch_file(file_link, config)
+        return file_content, num_bytes, time.perf_counter() - start_time
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # executor.map yields results in submission order, which keeps post order deterministic
+        results = iter(executor.map(timed_fetch, links_to_fetch))
+
+        file_contents = []
+        for file_link in file_links:
+            if not file_link:
+                file_contents.append(None)
+                continue
+
+            file_content, num_bytes, latency = next(results)
+            stats.record(num_bytes, latency)
+            file_contents.append(file_content)
+
+    return file_contents, stats
+
+
+def _get_file_content(file_link, config: Config):
     """
     Fetches the content of a file link and returns it as a string.
     Returns None or an empty string if the fetch fails.
+    :param config: supplies the session/timeout/retry settings
+    """
+    file_content, _ = _fetch_file(file_link, config)
+    return file_content
+
+
+@metrics.timed
+def _fetch_file(file_link, config: Config) -> (Optional[str], Optional[int]):
+    """
+    Downloads one attachment.
+    :return: (decoded text, size in bytes), or (None, None) if the fetch fails
     """
     if not file_link:
-        return None
+        return None, None
 
     try:
-        response = requests.get(file_link)
-        response.raise_for_status()  # Raises error for 4xx/5xx status codes
+        # Attachments never change, so the cache can serve them without asking the server again
+        response = http.get(config, file_link, immutable=True)
         response.encoding = 'utf-8-sig'
-        return response.text
+        return response.text, len(response.content)
 
     except requests.RequestException as e:
-        print(f"Error fetching {file_link}: {e}")
-        return None
-
-
-
-
-
+        logging.warning(f"Error fetching {file_link}: {e}")
+        return None, None
@@ -1,8 +1,12 @@
 import logging
 import pandas as pd
+from typing import Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime, timezone
-from connectors import oracle
+from connectors import oracle, storage
 from config import Config
+from sqlalchemy.exc import NoSuchTableError
+from watermark import FeedWatermark
+import metrics
 import sys
 
 class CutoffDateNotFoundError(Exception):
@@ -12,7 +16,12 @@ class CutoffDateNotFoundError(Exception):
 logger = logging.getLogger(__name__)
 
 
-def run(config: Config, write_mode: str, df: pd.DataFrame) -> None:
+@metrics.timed
+def run(config: Config, write_mode: str, df: pd.DataFrame, watermark: FeedWatermark = None) -> None:
+    """
+    Pushes df to the quant level table.
+    :param watermark: newest post df was built from. Saved to the watermark table in the same transaction as df.
+    """
     table_name = config.oracle_quant_table_name
     primary_keys = config.oracle_quant_pks
 
@@ -23,23 +32,239 @@ def run(config: Config, write_mode: str, df: pd.DataFrame) -> None:
     logging.info(f"Pushing {len(df)} rows to '{table_name}' with mode='{write_mode}'...")
 
     try:
-        oracle.insert_into_table(
+        storage.get_backend(config).insert_into_table(
             config=config,
             df=df,
             table_name=table_name,
             write_mode=write_mode,
-            primary_keys=primary_keys
+            primary_keys=primary_keys,
+            table_spec=quant_table_spec(config),
+            extra_statements=_watermark_statements(config, watermark, write_mode)
         )
 
         logging.info("Push successful.")
+        _count_loaded_rows(write_mode, len(df))
 
     except Exception as e:
-        logging.error(f"Failed to push to Oracle: {e}")
+        logging.error(f"Failed to push to {config.storage_backend}: {e}")
         raise e
 
 
+@metrics.timed
+def run_stream(config: Config, write_mode: str, df_chunks: Iterable[pd.DataFrame], checkpoint=None,
+               watermark: FeedWatermark = None) -> int:
+    """
+    Streaming version of run(). Pushes each chunk as soon as transform yields it, and every chunk is
+    committed on its own, so a crash late in a backfill keeps everything loaded so far.
+    'overwrite' only applies to the first chunk; later chunks are upserted into the fresh table. With the 'swap'
+    overwrite strategy the chunks go into the backend's shadow table, which is swapped in once after the last
+    chunk, so readers keep the old table until the backfill is done. A resumed run (checkpoint with committed
+    chunks) upserts into the table the crashed run was filling.
+    :param df_chunks: iterable of clean DataFrames (e.g. transform.stream)
+    :param checkpoint: optional checkpoint.CheckpointStore, every committed chunk is journaled in it
+    :param watermark: tracks the newest post of the stream (see FeedWatermark.track). It's saved with the
+     last chunk (or the swap) only, so a run that dies half way leaves the previous watermark and the next run
+     redoes it all.
+    :return: total rows pushed
+    """
+    table_name = config.oracle_quant_table_name
+    primary_keys = config.oracle_quant_pks
+    backend = storage.get_backend(config)
+
+    total_rows = 0
+    first_chunk_num = checkpoint.committed_chunks() + 1 if checkpoint is not None else 1
+    chunk_write_mode = 'upsert' if write_mode.lower() == 'overwrite' and first_chunk_num > 1 else write_mode
+
+    into_shadow = write_mode.lower() == 'overwrite' and config.oracle_overwrite_strategy.lower() == 'swap'
+    if into_shadow:
+        # The shadow table itself is simply recreated by the first chunk
+        load_table_name = backend.shadow_table_name(config, table_name)
+        chunk_config = config.model_copy(update={"oracle_overwrite_strategy": "drop"})
+    else:
+        load_table_name, chunk_config = table_name, config
+
+    if watermark is not None and not into_shadow:
+        df_chunks = _flag_last(df_chunks)
+    else:
+        df_chunks = ((df, False) for df in df_chunks)
+
+    for chunk_num, (df, is_last) in enumerate(df_chunks, start=first_chunk_num):
+        if df.empty:
+            continue
+
+        logging.info(f"Pushing chunk {chunk_num} ({len(df)} rows) to '{load_table_name}' with mode='{chunk_write_mode}'...")
+
+        try:
+            backend.insert_into_table(
+                config=chunk_config,
+                df=df,
+                table_name=load_table_name,
+                write_mode=chunk_write_mode,
+                primary_keys=primary_keys,
+                table_spec=quant_table_spec(config),
+                extra_statements=_watermark_statements(config, watermark, write_mode) if is_last else None
+            )
+
+        except Exception as e:
+            logging.error(f"Failed to push chunk {chunk_num} to {config.storage_backend} after {total_rows} committed rows: {e}")
+            raise e
+
+        _count_loaded_rows(chunk_write_mode, len(df))
+        if checkpoint is not None:
+            checkpoint.record_chunk(chunk_num, df)
+
+        total_rows += len(df)
+        if chunk_write_mode.lower() == 'overwrite':
+            chunk_write_mode = 'upsert'
+
+    if total_rows == 0 and first_chunk_num == 1:
+        logging.error("Stream produced no rows. Skipping DB push.")
+        sys.exit(1)
+
+    if into_shadow:
+        _swap_in_shadow(config, backend, load_table_name, watermark, resumed=first_chunk_num > 1)
+
+    if total_rows == 0:
+        logging.info("Nothing left to push, every chunk was already committed.")
+        return total_rows
+
+    logging.info(f"Push successful. {total_rows} rows in total.")
+    return total_rows
+
+
+def _swap_in_shadow(config: Config, backend, shadow_table: str, watermark: Optional[FeedWatermark],
+                    resumed: bool) -> None:
+    """
+    Swaps the streamed shadow table in as the quant table, together with the watermark.
+    A resumed run may find it already swapped in (the crash came after the swap), that's fine.
+    """
+    try:
+        backend.swap_in(config, shadow_table, config.oracle_quant_table_name, table_spec=quant_table_spec(config),
+                        extra_statements=_watermark_statements(config, watermark, 'overwrite'))
+    except NoSuchTableError:
+        if not resumed:
+            raise
+        logging.info(f"'{shadow_table}' was already swapped in by the interrupted run.")
+
+
+def _count_loaded_rows(write_mode: str, num_rows: int) -> None:
+    metrics.count("rows_inserted" if write_mode.lower() == 'overwrite' else "rows_merged", num_rows)
+
+
+def _flag_last(df_chunks: Iterable[pd.DataFrame]) -> Iterator[Tuple[pd.DataFrame, bool]]:
+    """
+    Yields (chunk, is_last) pairs, holding one chunk back to know which one is the last.
+    """
+    previous = None
+    for df in df_chunks:
+        if previous is not None:
+            yield previous, False
+        previous = df
+
+    if previous is not None:
+        yield previous, True
+
+
+
+
+def quant_table_spec(config: Config) -> oracle.TableSpec:
+    """
+    DDL the loader owns for the quant level table. Dashboards filter by DATETIME ranges and TICKER, so it's
+    interval partitioned by month on DATETIME with a local (TICKER, DATETIME) index, both prune partitions.
+    The text columns hold transform's merged values: BUY_SELL_IND can be 'BUY | SELL', COMMENTS and WEB_LINK
+    join every distinct value of a level with no upper bound, so they're CLOBs.
+    """
+    compression = config.oracle_table_compression.strip().upper()
+
+    return oracle.TableSpec(
+        columns={
+            "DATETIME": "DATE",
+            "TICKER": "VARCHAR2(16 CHAR)",
+            "START_LVL_PRICE": "NUMBER(12,4)",
+            "END_LVL_PRICE": "NUMBER(12,4)",
+            "COMMENTS": "CLOB",
+            "BUY_SELL_IND": "VARCHAR2(16 CHAR)",
+            "WEB_LINK": "CLOB",
+        },
+        primary_keys=config.oracle_quant_pks,
+        partition_column="DATETIME",
+        indexes=[["TICKER", "DATETIME"]],
+        compression=f"ROW STORE COMPRESS {compression}" if compression else None,
+    )
+
+
+def watermark_table_spec(config: Config) -> oracle.TableSpec:
+    """
+    One row per loaded table: the newest post (UTC created_at + post id) whose rows are committed in it.
+    """
+    return oracle.TableSpec(
+        columns={
+            "TARGET_TABLE": "VARCHAR2(128 CHAR)",
+            "LAST_POST_CREATED_AT": "TIMESTAMP(6)",
+            "LAST_POST_ID": "VARCHAR2(64 CHAR)",
+            "UPDATED_AT": "TIMESTAMP(6)",
+        },
+        primary_keys=["TARGET_TABLE"],
+    )
+
+
+@metrics.timed
+def migrate(config: Config) -> List[str]:
+    """
+    Brings the quant level and watermark tables in line with their specs (idempotent, see oracle.migrate_table).
+    May rebuild the quant table, so it's a separate step (scripts/migrate.py) that no load may run alongside.
+    :return: the DDL statements that were applied
+    """
+    backend = storage.get_backend(config)
+    statements = backend.migrate_table(config, config.oracle_quant_table_name, quant_table_spec(config))
+    statements += backend.migrate_table(config, config.oracle_watermark_table_name, watermark_table_spec(config))
+    return statements
+
+
+@metrics.timed
+def get_watermark(config: Config) -> Optional[FeedWatermark]:
+    """
+    Newest post loaded into the quant level table, read by primary key from the watermark table.
+    :return: None if no run has saved a watermark yet (or the table can't be read)
+    """
+    query = (f"SELECT LAST_POST_CREATED_AT, LAST_POST_ID FROM {config.oracle_watermark_table_name} "
+             f"WHERE TARGET_TABLE = :target_table")
+
+    try:
+        df = storage.get_backend(config).sql(config, query, params={"target_table": config.oracle_quant_table_name.upper()})
+    except Exception as e:
+        logger.warning(f"Could not read the watermark: {e}")
+        return None
+
+    if df.empty or pd.isna(df.iloc[0, 0]):
+        return None
+
+    watermark = FeedWatermark(pd.Timestamp(df.iloc[0, 0]).to_pydatetime(), df.iloc[0, 1])
+    logger.info(f"Last watermark found: {watermark}")
+    return watermark
+
+
+def _watermark_statements(config: Config, watermark: Optional[FeedWatermark],
+                          write_mode: str) -> Optional[List[Tuple[str, dict]]]:
+    """
+    The watermark update to commit along with a load, as insert_into_table extra_statements.
+    Upserts only ever move the watermark forward, an overwrite replaces the table and so sets it outright.
+    """
+    if watermark is None or watermark.is_empty():
+        return None
+
+    statement = storage.get_backend(config).watermark_statement(config.oracle_watermark_table_name,
+                                                                advance_only=write_mode.lower() != 'overwrite')
+    params = {
+        "target_table": config.oracle_quant_table_name.upper(),
+        # Stored as a plain TIMESTAMP in UTC
+        "created_at": watermark.created_at.astimezone(timezone.utc).replace(tzinfo=None),
+        "post_id": watermark.post_id,
+    }
+    return [(statement, params)]
 
 
+@metrics.timed
 def _get_latest_recorded_date(config: Config) -> datetime:
     """
     Gets the latest record records date of the quant_lvl_table  for cuttoff date
@@ -50,7 +275,7 @@ def _get_latest_recorded_date(config: Config) -> datetime:
 
     try:
         # 1. Run Query
-        df = oracle.sql(config, query)
+        df = storage.get_backend(config).sql(config, query)
 
         # 2. Check for Empty DataFrame (Rare for Aggregations)
         if df.empty:
@@ -62,8 +287,8 @@ def _get_latest_recorded_date(config: Config) -> datetime:
             raise CutoffDateNotFoundError(f"Table '{config.oracle_quant_table_name} is empty; no max date found.")
 
         # 4. Success Case: Process the date
-        if isinstance(last_date, pd.Timestamp):
-            last_date = last_date.to_pydatetime()
+        # Oracle returns a datetime, SQLite the ISO text it stores dates as
+        last_date = pd.Timestamp(last_date).to_pydatetime()
 
         if last_date.tzinfo is None:
             last_date = last_date.replace(tzinfo=timezone.utc)
@@ -0,0 +1,172 @@
+import contextlib
+import datetime
+import functools
+import json
+import logging
+import math
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from config import Config
+
+# Process-wide run metrics:
+#   spans      -> wall clock seconds of every timed call, by name (e.g. "extract.run", "transform._clean_df")
+#   counters   -> monotonically increasing totals (http_requests, rows_parsed, ...)
+#   histograms -> distributions of observed values (http_request_seconds, feed_page_posts, ...)
+# Cheap enough to stay on all the time: one perf_counter pair and a locked list append per observation.
+# export() writes the JSON run report and, if configured, a Prometheus textfile (node_exporter collector).
+
+PROMETHEUS_PREFIX = "quant_pipeline"
+QUANTILES = (50, 95, 99)
+
+_lock = threading.Lock()
+_started_at = datetime.datetime.now(datetime.timezone.utc)
+_spans: Dict[str, List[float]] = {}
+_counters: Dict[str, float] = {}
+_histograms: Dict[str, List[float]] = {}
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Times the block and records it under name (also when it raises).
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start_time
+        with _lock:
+            _spans.setdefault(name, []).append(elapsed)
+
+
+def timed(func):
+    """
+    Decorator: runs every call of func inside span("<module>.<function>").
+    """
+    name = f"{func.__module__}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def count(name: str, value: float = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, value: float) -> None:
+    with _lock:
+        _histograms.setdefault(name, []).append(value)
+
+
+def reset() -> None:
+    """
+    Starts a new run: forgets every span, counter and histogram.
+    """
+    global _started_at
+    with _lock:
+        _started_at = datetime.datetime.now(datetime.timezone.utc)
+        _spans.clear()
+        _counters.clear()
+        _histograms.clear()
+
+
+def report() -> Dict[str, Any]:
+    """
+    Snapshot of the run so far. Spans and histograms are summarized (count, sum, max, p50/p95/p99).
+    """
+    with _lock:
+        spans = {name: _summarize(values) for name, values in _spans.items()}
+        histograms = {name: _summarize(values) for name, values in _histograms.items()}
+        counters = dict(_counters)
+        started_at = _started_at
+
+    return {
+        "started_at": started_at.isoformat(),
+        "duration_sec": round((datetime.datetime.now(datetime.timezone.utc) - started_at).total_seconds(), 4),
+        "spans": dict(sorted(spans.items(), key=lambda item: -item[1]["sum"])),
+        "counters": dict(sorted(counters.items())),
+        "histograms": dict(sorted(histograms.items())),
+    }
+
+
+def export(config: Config) -> Dict[str, Any]:
+    """
+    Writes the run report to config.metrics_report_path (JSON) and config.metrics_prometheus_path
+    (Prometheus textfile), each skipped when its path is empty, and logs the slowest spans.
+    :return: the report
+    """
+    run_report = report()
+
+    if config.metrics_report_path:
+        _write_atomic(config.metrics_report_path, json.dumps(run_report, indent=2))
+    if config.metrics_prometheus_path:
+        _write_atomic(config.metrics_prometheus_path, to_prometheus(run_report))
+
+    slowest = ", ".join(f"{name} {summary['sum']:.2f}s" for name, summary in list(run_report["spans"].items())[:5])
+    logging.info(f"Run metrics: {run_report['duration_sec']:.2f}s total. Slowest spans: {slowest}. "
+                 f"Counters: {run_report['counters']}")
+    return run_report
+
+
+def to_prometheus(run_report: Dict[str, Any]) -> str:
+    """
+    Prometheus text exposition of a report: spans and histograms as summaries, counters as counters.
+    """
+    lines = []
+
+    span_metric = f"{PROMETHEUS_PREFIX}_span_seconds"
+    lines += [f"# HELP {span_metric} Wall clock seconds per call of a pipeline function.",
+              f"# TYPE {span_metric} summary"]
+    for name, summary in run_report["spans"].items():
+        lines += _summary_lines(span_metric, summary, f'span="{name}"')
+
+    for name, value in run_report["counters"].items():
+        metric = f"{PROMETHEUS_PREFIX}_{_metric_name(name)}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+
+    for name, summary in run_report["histograms"].items():
+        metric = f"{PROMETHEUS_PREFIX}_{_metric_name(name)}"
+        lines += [f"# TYPE {metric} summary"] + _summary_lines(metric, summary)
+
+    duration_metric = f"{PROMETHEUS_PREFIX}_run_duration_seconds"
+    lines += [f"# TYPE {duration_metric} gauge", f"{duration_metric} {run_report['duration_sec']}"]
+    return "\n".join(lines) + "\n"
+
+
+def _summary_lines(metric: str, summary: Dict[str, float], labels: str = "") -> List[str]:
+    separator = "," if labels else ""
+    lines = [f'{metric}{{{labels}{separator}quantile="{pct / 100}"}} {summary[f"p{pct}"]}' for pct in QUANTILES]
+    label_set = f"{{{labels}}}" if labels else ""
+    lines += [f"{metric}_sum{label_set} {summary['sum']}", f"{metric}_count{label_set} {summary['count']}"]
+    return lines
+
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    summary = {"count": len(ordered), "sum": round(sum(ordered), 6), "max": round(ordered[-1], 6)}
+    for pct in QUANTILES:
+        # Nearest-rank percentile, same as extract._percentile
+        summary[f"p{pct}"] = round(ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1], 6)
+    return summary
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _write_atomic(path: str, content: str) -> None:
+    # node_exporter may read the textfile at any moment, never let it see a half-written one
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(target.name + ".tmp")
+    tmp_path.write_text(content)
+    tmp_path.replace(target)
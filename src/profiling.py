@@ -0,0 +1,176 @@
+import contextlib
+import cProfile
+import datetime
+import io
+import json
+import logging
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from config import Config
+
+# Opt-in profiling of the pipeline entry points (scripts --profile, or PROFILE_MODE in the env/.env):
+#   cprofile -> deterministic, <stage>.pstats (open with `python -m pstats` / snakeviz) + <stage>.txt top functions.
+#               Only sees the thread that runs the stage, not the fetch/attachment workers.
+#   sample   -> low overhead stack sampler over all threads, <stage>.collapsed (flamegraph.pl / speedscope)
+#               + <stage>.speedscope.json (https://www.speedscope.app).
+# With profile_tracemalloc every stage also gets <stage>.tracemalloc.txt: the allocation diff from its start to its end.
+# Everything goes to <profile_dir>/<run start UTC>/.
+PROFILE_MODES = ("cprofile", "sample")
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+_run_dir: Optional[Path] = None
+_config: Optional[Config] = None
+
+
+@contextlib.contextmanager
+def session(config: Config) -> Iterator[None]:
+    """
+    Enables stage() for the duration of a run when config.profile_mode is set. Does nothing otherwise.
+    """
+    global _run_dir, _config
+    if not config.profile_mode:
+        yield
+        return
+    if config.profile_mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{config.profile_mode}'. Use: {', '.join(PROFILE_MODES)}")
+
+    started_at = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S")
+    _run_dir = Path(config.profile_dir) / started_at
+    _run_dir.mkdir(parents=True, exist_ok=True)
+    _config = config
+
+    started_tracemalloc = config.profile_tracemalloc and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(config.profile_tracemalloc_frames)
+
+    logging.info(f"Profiling ({config.profile_mode}) to {_run_dir}")
+    try:
+        yield
+    finally:
+        if started_tracemalloc:
+            tracemalloc.stop()
+        logging.info(f"Profiles written to {_run_dir}")
+        _run_dir, _config = None, None
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Profiles the block as one stage ('extract', 'transform', 'load', ...) of the current session.
+    A no-op outside an active session.
+    """
+    if _run_dir is None:
+        yield
+        return
+
+    config, run_dir = _config, _run_dir
+    before = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+    profiler = cProfile.Profile() if config.profile_mode == "cprofile" else \
+        StackSampler(config.profile_sample_interval_ms / 1000)
+
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        if config.profile_mode == "cprofile":
+            _write_cprofile(profiler, run_dir, name)
+        else:
+            profiler.write_collapsed(run_dir / f"{name}.collapsed")
+            profiler.write_speedscope(run_dir / f"{name}.speedscope.json", name)
+
+        if before is not None:
+            _write_tracemalloc_diff(before, tracemalloc.take_snapshot(), run_dir / f"{name}.tracemalloc.txt",
+                                    config.profile_tracemalloc_top)
+
+
+class StackSampler:
+    """
+    Samples the Python stack of every thread (but its own) every interval_sec from a daemon thread.
+    Same enable()/disable() interface as cProfile.Profile.
+    """
+
+    def __init__(self, interval_sec: float = 0.005):
+        self.interval_sec = interval_sec
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def enable(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def disable(self) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval_sec):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.stacks[(thread_names.get(thread_id, str(thread_id)),) + _stack(frame)] += 1
+
+    def write_collapsed(self, path: Path) -> None:
+        """
+        Brendan Gregg's folded format: 'thread;outer;...;inner <samples>' per line.
+        """
+        lines = [";".join(stack) + f" {samples}" for stack, samples in self.stacks.most_common()]
+        path.write_text("\n".join(lines) + "\n")
+
+    def write_speedscope(self, path: Path, name: str) -> None:
+        frame_index = {}
+        samples, weights = [], []
+        for stack, num_samples in self.stacks.most_common():
+            samples.append([frame_index.setdefault(frame, len(frame_index)) for frame in stack])
+            weights.append(num_samples * self.interval_sec)
+
+        profile = {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "quant_levels profiling.StackSampler",
+            "shared": {"frames": [{"name": frame} for frame in frame_index]},
+            "profiles": [{"type": "sampled", "name": name, "unit": "seconds", "startValue": 0,
+                          "endValue": round(sum(weights), 6), "samples": samples, "weights": weights}],
+        }
+        path.write_text(json.dumps(profile))
+
+
+def _stack(frame) -> Tuple[str, ...]:
+    """
+    Outermost first, one 'function (file:line)' per frame.
+    """
+    frames: List[str] = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+def _write_cprofile(profiler: cProfile.Profile, run_dir: Path, name: str) -> None:
+    profiler.dump_stats(str(run_dir / f"{name}.pstats"))
+
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(40)
+    (run_dir / f"{name}.txt").write_text(text.getvalue())
+
+
+def _write_tracemalloc_diff(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, path: Path,
+                            top: int) -> None:
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+    diff = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), "lineno")
+
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [f"Traced memory: {current / 2 ** 20:.1f} MiB now, {peak / 2 ** 20:.1f} MiB peak",
+             f"Top {top} allocation changes by line:"]
+    lines += [str(stat) for stat in diff[:top]]
+    path.write_text("\n".join(lines) + "\n")
@@ -0,0 +1,174 @@
+import datetime
+import gzip
+import importlib.util
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+from watermark import parse_created_at
+
+# Raw zone layout, append-only (a run only ever adds its own part files):
+#   <raw_archive_dir>/feed/date=YYYY-MM-DD/part-<run id>.jsonl.zst         raw feed items as the API returned them
+#   <raw_archive_dir>/attachments/date=YYYY-MM-DD/part-<run id>.jsonl.zst  {"url", "date_posted", "text"}
+# Partitions are the post's UTC day ('unknown' if it has none). Every write appends one compressed frame /
+# gzip member to the run's part file, so a crashed run still leaves readable files behind.
+FEED_ZONE = "feed"
+ATTACHMENT_ZONE = "attachments"
+UNKNOWN_DAY = "unknown"
+FILE_SUFFIXES = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz"}
+
+_run_id = None
+_write_lock = threading.Lock()
+
+
+def record_page(config: Config, page_items: List[dict]) -> None:
+    """
+    Archives the raw items of one fetched feed page. Does nothing unless config.raw_archive_enabled.
+    """
+    if not config.raw_archive_enabled or not page_items:
+        return
+
+    items_by_day = {}
+    for item in page_items:
+        items_by_day.setdefault(_item_day(item), []).append(item)
+
+    for day, items in items_by_day.items():
+        _append(config, FEED_ZONE, day, items)
+
+
+def record_attachments(config: Config, attachments: List[Tuple[Optional[str], str, str]]) -> None:
+    """
+    Archives downloaded attachment bodies. Does nothing unless config.raw_archive_enabled.
+    :param attachments: (date_posted of the post, attachment url, text) per downloaded file
+    """
+    if not config.raw_archive_enabled or not attachments:
+        return
+
+    records_by_day = {}
+    for date_posted, url, text in attachments:
+        records_by_day.setdefault(_day(date_posted), []).append({"url": url, "date_posted": date_posted, "text": text})
+
+    for day, records in records_by_day.items():
+        _append(config, ATTACHMENT_ZONE, day, records)
+
+
+def read(config: Config, start_date: datetime.date = None,
+         end_date: datetime.date = None) -> Tuple[List[dict], Dict[str, str]]:
+    """
+    Reads the archive back for a replay.
+    :param start_date: first post day to read (inclusive), default: everything
+    :param end_date: last post day to read (inclusive), default: everything
+    :return: raw feed items newest first like the feed serves them, one per post (its most recently archived
+     copy), and the archived attachment texts by url
+    """
+    root = Path(config.raw_archive_dir)
+
+    items_by_key = {}
+    for path in _partition_files(root / FEED_ZONE, start_date, end_date):
+        for item in _read_records(path):
+            items_by_key[_item_key(item)] = item
+
+    attachment_texts = {}
+    for path in _partition_files(root / ATTACHMENT_ZONE, start_date, end_date):
+        for record in _read_records(path):
+            attachment_texts[record["url"]] = record["text"]
+
+    # Undated items (no post) sort last
+    oldest = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+    items = sorted(items_by_key.values(),
+                   key=lambda item: parse_created_at(item.get('post', {}).get('created_at')) or oldest, reverse=True)
+    return items, attachment_texts
+
+
+def compression_codec(config: Config) -> str:
+    """
+    Resolves config.raw_archive_compression. 'auto' uses zstd when zstandard is installed and falls back to
+    the stdlib's gzip.
+    """
+    codec = config.raw_archive_compression
+    if codec == "auto":
+        return "zstd" if importlib.util.find_spec("zstandard") else "gzip"
+    if codec not in FILE_SUFFIXES:
+        raise ValueError(f"Unknown raw archive compression '{codec}'. Use: auto, zstd or gzip")
+    return codec
+
+
+def _append(config: Config, zone: str, day: str, records: List[dict]) -> None:
+    codec = compression_codec(config)
+    payload = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records)
+
+    path = Path(config.raw_archive_dir) / zone / f"date={day}" / f"part-{_get_run_id()}{FILE_SUFFIXES[codec]}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with _write_lock, open(path, "ab") as f:
+        f.write(_compress(codec, payload.encode("utf-8"), config.raw_archive_compression_level))
+
+
+def _compress(codec: str, data: bytes, level: int) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=min(max(level, 1), 9))
+
+
+def _read_records(path: Path) -> Iterator[dict]:
+    with open(path, "rb") as f:
+        if path.name.endswith(FILE_SUFFIXES["zstd"]):
+            import zstandard
+            data = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True).read()
+        else:
+            # gzip reads concatenated members as one stream
+            data = gzip.decompress(f.read())
+
+    for line in data.decode("utf-8").splitlines():
+        if line:
+            yield json.loads(line)
+
+
+def _partition_files(zone_dir: Path, start_date: datetime.date = None, end_date: datetime.date = None) -> List[Path]:
+    """
+    Part files of a zone in (partition, write) order, limited to the partitions between the dates.
+    Run ids start with their UTC start time, so file names sort in the order they were written.
+    """
+    if not zone_dir.is_dir():
+        return []
+
+    files = []
+    for partition in sorted(zone_dir.iterdir()):
+        day = partition.name.partition("=")[2]
+        if day == UNKNOWN_DAY:
+            if start_date is not None or end_date is not None:
+                continue
+        elif (start_date is not None and day < start_date.isoformat()) or \
+                (end_date is not None and day > end_date.isoformat()):
+            continue
+        files.extend(sorted(path for path in partition.iterdir() if path.name.startswith("part-")))
+    return files
+
+
+def _get_run_id() -> str:
+    global _run_id
+    with _write_lock:
+        if _run_id is None:
+            started_at = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+            _run_id = f"{started_at}-{os.getpid()}"
+    return _run_id
+
+
+def _item_day(item: dict) -> str:
+    return _day(item.get('post', {}).get('created_at'))
+
+
+def _day(raw_date_str: Optional[str]) -> str:
+    created_at = parse_created_at(raw_date_str)
+    return created_at.date().isoformat() if created_at is not None else UNKNOWN_DAY
+
+
+def _item_key(item: dict) -> str:
+    post = item.get('post', {})
+    if post.get('id') is not None:
+        return str(post['id'])
+    return json.dumps(item, sort_keys=True)
@@ -1,28 +1,58 @@
 import extract, transform, load, config
+import argparse
+import profiling
+from scripts import runner
+from watermark import FeedWatermark
 import logging
 logger = logging.getLogger(__name__)
 import sys
 
 
-def main():
-    env_config = config.load_config()
+def main(argv: [str] = None):
+    # What the run fetches is archived for scripts/replay.py
+    runner.main(_run, _build_parser(), argv, config_update={"raw_archive_enabled": True})
 
-    cutoff_date = load._get_latest_recorded_date(env_config)
+
+def _run(env_config: config.Config, args: argparse.Namespace) -> None:
+    # Stop paging at the exact post the last run loaded. Before any run has saved a watermark,
+    # fall back once to the day of the newest row in the table.
+    watermark = load.get_watermark(env_config)
+    cutoff_date = load._get_latest_recorded_date(env_config) if watermark is None else None
+
+    if args.stream:
+        # Pages flow through extract -> transform -> load in chunks of env_config.stream_chunk_rows
+        new_watermark = FeedWatermark()
+        post_batches = new_watermark.track(extract.stream(env_config, cutoff_date=cutoff_date, watermark=watermark))
+        df_chunks = transform.stream(env_config, post_batches)
+        # The stages interleave chunk by chunk, so they're profiled as one
+        with profiling.stage("stream"):
+            load.run_stream(env_config, "upsert", df_chunks, watermark=new_watermark)
+        return
 
     # 1. Fetch raw data from site (cutoff_date=None)
-    raw_post_json = extract.run(env_config, cutoff_date=cutoff_date)
+    with profiling.stage("extract"):
+        raw_post_json = extract.run(env_config, cutoff_date=cutoff_date, watermark=watermark)
 
     if len(raw_post_json) == 0:
-        logging.error(f"ERROR: No post found after cuttoff_date:{cutoff_date}")
+        logging.error(f"ERROR: No post found after cuttoff_date:{cutoff_date} / watermark:{watermark}")
         sys.exit(1)
 
 
     # 2. Transform unstructured data to structured df
-    clean_df = transform.run(env_config,raw_post_json)
+    with profiling.stage("transform"):
+        clean_df = transform.run(env_config,raw_post_json)
+
+    # 3. Load df to oracle, together with the newest post as the next run's watermark
+    with profiling.stage("load"):
+        load.run(env_config, "upsert", clean_df, watermark=FeedWatermark.from_posts(raw_post_json))
+
 
-    # 3. Load df to oracle
-    load.run(env_config, "upsert", clean_df)
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Loads new quant levels since the latest recorded date.")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream pages through the pipeline and upsert in chunks instead of all at once")
+    return parser
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
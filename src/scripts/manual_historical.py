@@ -1,25 +1,64 @@
-import extract, transform, load, config
+import extract, transform, load, config, checkpoint
+import argparse
+import profiling
+from scripts import runner
+from watermark import FeedWatermark
 import logging
 logger = logging.getLogger(__name__)
 import sys
 
-def main():
-    env_config = config.load_config()
+def main(argv: [str] = None):
+    # A backfill re-reads the same pages and attachments when it's rerun, so it goes through the HTTP cache.
+    # What it fetches is archived for scripts/replay.py
+    runner.main(_run, _build_parser(), argv, config_update={"http_cache_enabled": True, "raw_archive_enabled": True})
+
+
+def _run(env_config: config.Config, args: argparse.Namespace) -> None:
+    # The load commits the watermark together with the rows, so run scripts/migrate.py once before the first load
+    if args.stream or args.resume:
+        # Pages flow through extract -> transform -> load in chunks of env_config.stream_chunk_rows.
+        # Pages, posts and committed chunks are journaled so --resume can pick up after a crash.
+        store = checkpoint.CheckpointStore.open(env_config, resume=args.resume)
+        try:
+            new_watermark = FeedWatermark()
+            post_batches = new_watermark.track(extract.stream(env_config, cutoff_date=None, checkpoint=store))
+            post_batches = store.skip_committed_days(post_batches)
+            df_chunks = transform.stream(env_config, post_batches)
+
+            # A resumed run keeps upserting into the table the crashed run recreated (see load.run_stream)
+            # The stages interleave chunk by chunk, so they're profiled as one
+            with profiling.stage("stream"):
+                load.run_stream(env_config, "overwrite", df_chunks, checkpoint=store, watermark=new_watermark)
+            store.mark_complete()
+        finally:
+            store.close()
+        return
 
     # 1. Fetch raw data from site (cutoff_date=None)
-    raw_post_json = extract.run(env_config, cutoff_date=None)
+    with profiling.stage("extract"):
+        raw_post_json = extract.run(env_config, cutoff_date=None)
 
     if len(raw_post_json) == 0:
         logging.error(f"ERROR: No post found for historical load. Please check if website it up")
         sys.exit(1)
 
     # 2. Transform unstructured data to structured df
-    clean_df = transform.run(env_config, raw_post_json)
+    with profiling.stage("transform"):
+        clean_df = transform.run(env_config, raw_post_json)
 
     # 3. Load df to oracle
-    load.run(env_config, "overwrite",clean_df)
+    with profiling.stage("load"):
+        load.run(env_config, "overwrite",clean_df, watermark=FeedWatermark.from_posts(raw_post_json))
+
 
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Reloads the full quant level history.")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream pages through the pipeline and load in chunks instead of all at once")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the last streamed backfill from its checkpoint (implies --stream)")
+    return parser
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
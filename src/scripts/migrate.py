@@ -0,0 +1,26 @@
+import load, config
+import argparse
+from scripts import runner
+import logging
+logger = logging.getLogger(__name__)
+
+
+def main(argv: [str] = None):
+    runner.main(_run, _build_parser(), argv)
+
+
+def _run(env_config: config.Config, args: argparse.Namespace) -> None:
+    statements = load.migrate(env_config)
+    logging.info(f"Applied {len(statements)} migration statements." if statements else "Schema is up to date.")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Creates the quant level and watermark tables, or migrates them to their current spec. "
+                    "Run it once before the first load and after a spec change, while no load is running: "
+                    "a column that can't be retyped in place makes it copy and swap the whole table.")
+    return parser
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import extract, transform, load, config
+import argparse
+import datetime
+import profiling
+from scripts import runner
+from watermark import FeedWatermark
+import logging
+logger = logging.getLogger(__name__)
+import sys
+
+
+def main(argv: [str] = None):
+    runner.main(_run, _build_parser(), argv)
+
+
+def _run(env_config: config.Config, args: argparse.Namespace) -> None:
+    # A full replay rebuilds the table, a date range is merged into it
+    write_mode = args.write_mode or ("overwrite" if args.since is None and args.until is None else "upsert")
+
+    # 1. Rebuild the posts from the raw archive (no network)
+    with profiling.stage("extract"):
+        raw_post_json = extract.replay(env_config, start_date=args.since, end_date=args.until)
+
+    if len(raw_post_json) == 0:
+        logging.error(f"ERROR: No archived posts found in {env_config.raw_archive_dir} (since={args.since}, until={args.until})")
+        sys.exit(1)
+
+    # 2. Transform unstructured data to structured df
+    with profiling.stage("transform"):
+        clean_df = transform.run(env_config, raw_post_json)
+
+    # 3. Load df to oracle
+    with profiling.stage("load"):
+        load.run(env_config, write_mode, clean_df, watermark=FeedWatermark.from_posts(raw_post_json))
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Re-runs transform and load from the raw feed archive, without touching the network. "
+                    "The archive only holds what daily_incremental and manual_historical fetched, so run "
+                    "manual_historical once before relying on a full replay.")
+    parser.add_argument("--since", type=datetime.date.fromisoformat, default=None,
+                        help="first post day to replay (YYYY-MM-DD), default: the whole archive")
+    parser.add_argument("--until", type=datetime.date.fromisoformat, default=None,
+                        help="last post day to replay (YYYY-MM-DD), default: the whole archive")
+    parser.add_argument("--write-mode", choices=["overwrite", "upsert", "ignore"], default=None,
+                        help="default: overwrite for a full replay, upsert for a date range")
+    return parser
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import config
+import argparse
+from typing import Callable
+from connectors import storage
+import metrics
+import profiling
+import logging
+logger = logging.getLogger(__name__)
+
+
+def main(run: Callable[[config.Config, argparse.Namespace], None], parser: argparse.ArgumentParser,
+         argv: [str] = None, config_update: dict = None) -> None:
+    """
+    Shared entry point of the scripts: adds --profile to parser, parses argv, loads the config and calls
+    run(env_config, args) inside a profiling session. The storage connections and run metrics are reported
+    and closed however run ends.
+    :param config_update: settings the script always overrides, e.g. {"raw_archive_enabled": True}
+    """
+    parser.add_argument("--profile", choices=profiling.PROFILE_MODES, default=None,
+                        help="write per-stage profiles and allocation diffs to profile_dir (default: PROFILE_MODE)")
+    args = parser.parse_args(argv)
+
+    update = dict(config_update or {})
+    if args.profile:
+        update["profile_mode"] = args.profile
+    env_config = config.load_config().model_copy(update=update)
+
+    try:
+        with profiling.session(env_config):
+            run(env_config, args)
+    finally:
+        # One pooled engine served the whole run, report its logins and close it
+        backend = storage.get_backend(env_config)
+        logging.info(f"{env_config.storage_backend} connections: {backend.connection_stats(env_config)}")
+        backend.dispose_engines()
+        metrics.export(env_config)
@@ -1,13 +1,15 @@
 import logging
 import sys
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 import datetime
 import re
 
+import numpy as np
 import pandas as pd
 from pandas.core.interchange.dataframe_protocol import DataFrame
 
 from config import Config
+import metrics
 
 # Assuming your function is in a file named 'quant_logic.py' or similar.
 # If it's in this file, you can paste it above.
@@ -16,6 +18,7 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+@metrics.timed
 def run(config:Config, raw_posts_json: []) -> pd.DataFrame:
     """
     Take the unstructured json data from extract and normalizes it here into a structured df
@@ -23,91 +26,168 @@ def run(config:Config, raw_posts_json: []) -> pd.DataFrame:
     :return:
     """
     quant_df_with_dupes = _parse_quant_levels_to_data(raw_posts_json)
-    deduplicated_days_df = _deduplicate_days(quant_df_with_dupes)
-    deduplicated_rows_df = _deduplicate_rows(config, deduplicated_days_df)
-    return _clean_df(config, deduplicated_rows_df)
+    return _deduplicate_and_clean(config, quant_df_with_dupes)
 
-def _parse_quant_levels_to_data(posts: []) -> pd.DataFrame:
+
+def stream(config: Config, post_batches: Iterable[List[dict]]) -> Iterator[pd.DataFrame]:
     """
-    Parses 'quant_lvl_text' from a list of posts into a structured list of dictionaries
-    ready for a Pandas DataFrame.
+    Streaming version of run(). Consumes post batches (e.g. extract.stream) and yields clean DataFrames
+    of at least config.stream_chunk_rows rows (the last one may be smaller).
+
+    All posts of one calendar day are always transformed together, so _deduplicate_days and
+    _deduplicate_rows see exactly the same groups as a full run. This relies on the feed being
+    sorted newest first, which keeps each day's posts contiguous.
+    :param post_batches: iterable of post lists in feed order
+    :return: generator of DataFrames with the same schema as run()
     """
+    chunk_rows = max(1, config.stream_chunk_rows)
+    pending_dfs = []
+    pending_rows = 0
+    day_posts = []
+    current_day = None
+    finished_days = set()
+
+    for posts in post_batches:
+        for post in posts:
+            if not post.get('quant_lvl_text'):
+                continue
+
+            day = post_day(post)
+            if current_day is not None and day != current_day:
+                day_df = _transform_day(config, day_posts)
+                if day_df is not None:
+                    pending_dfs.append(day_df)
+                    pending_rows += len(day_df)
+
+                finished_days.add(current_day)
+                day_posts = []
+
+                if pending_rows >= chunk_rows:
+                    yield pd.concat(pending_dfs, ignore_index=True)
+                    pending_dfs, pending_rows = [], 0
+
+            if day in finished_days:
+                logging.warning(f"Posts for {day} arrived out of order; that day will be loaded in two chunks.")
+
+            current_day = day
+            day_posts.append(post)
 
-    parsed_rows = []
+    if day_posts:
+        day_df = _transform_day(config, day_posts)
+        if day_df is not None:
+            pending_dfs.append(day_df)
 
-    # Regex 1: Split sections by "---" (handling variation in dash count/spacing)
-    section_split_pattern = re.compile(r'\n\s*-{3,}\s*\n?')
+    if pending_dfs:
+        yield pd.concat(pending_dfs, ignore_index=True)
 
-    # Regex 2: Line Parser
-    # Group 1: Start Price /Group 2: End Price /Group 3: Comment (Optional)
-    line_pattern = re.compile(r'^\s*(\d{4}(?:\.\d+)?)(?:\s*-\s*(\d{4}(?:\.\d+)?))?\s*(.*)')
 
-    all_posts_with_quant_lvl = [post for post in posts if post.get('quant_lvl_text')]
+def post_day(post: dict) -> datetime.date:
+    """
+    Calendar day (UTC) a post falls on, matching the grouping used by _deduplicate_days and stream().
+    """
+    date_val = datetime.datetime.fromisoformat(post.get('date_posted').replace("Z", "+00:00"))
+    if date_val.tzinfo is not None:
+        date_val = date_val.astimezone(datetime.timezone.utc)
+    return date_val.date()
 
-    for post in all_posts_with_quant_lvl:
-        date_of_post = post.get('date_posted')
 
-        logging.info(f"Parsing post: {date_of_post}:{post.get('title')}")
-        # DATETIME COL
-        date_of_post = post.get('date_posted')
-        date_val = datetime.datetime.fromisoformat(date_of_post.replace("Z", "+00:00"))
+@metrics.timed
+def _transform_day(config: Config, day_posts: []) -> Optional[pd.DataFrame]:
+    """
+    Runs the full transform over the posts of one day.
+    :return: clean DataFrame, or None if none of the posts had parseable levels
+    """
+    parsed_df = _parse_quant_levels_to_frame(day_posts)
+    if parsed_df.empty:
+        return None
+    return _deduplicate_and_clean(config, _define_quant_dataframe(parsed_df))
 
-        # 1. Split text into sections based on '---'
-        raw_text = post.get('quant_lvl_text')
-        sections = section_split_pattern.split(raw_text)
 
-        # 2. Iterate through sections and assign Buy/Sell indicator
-        for i, section_content in enumerate(sections):
+def _deduplicate_and_clean(config: Config, quant_df_with_dupes: pd.DataFrame) -> pd.DataFrame:
+    deduplicated_days_df = _deduplicate_days(quant_df_with_dupes)
+    deduplicated_rows_df = _deduplicate_rows(config, deduplicated_days_df)
 
-            # Section 0 = First block /  Section 1 = Second block / Section 2 = Third block
-            if i == 0:
-                buy_sell_ind = None
-            elif i == 1:
-                buy_sell_ind = "BUY"
-            elif i == 2:
-                buy_sell_ind = "SELL"
-            else:
-                buy_sell_ind = None  # Fallback for unexpected extra sections
+    metrics.count("rows_parsed", len(quant_df_with_dupes.index))
+    metrics.count("rows_deduped", len(quant_df_with_dupes.index) - len(deduplicated_rows_df.index))
+    return _clean_df(config, deduplicated_rows_df)
 
-            # 3. Process lines within this section
-            lines = section_content.strip().split('\n')
 
-            for line in lines:
-                clean_line = line.strip()
-                if not clean_line:
-                    continue
+QUANT_COLUMNS = ["DATETIME", "TICKER", "START_LVL_PRICE", "END_LVL_PRICE", "COMMENTS", "BUY_SELL_IND", "WEB_LINK"]
 
-                match = line_pattern.match(clean_line)    # Match the line against the price regex
+# Split sections by "---" (handling variation in dash count/spacing)
+SECTION_SPLIT_PATTERN = re.compile(r'\n\s*-{3,}\s*\n?')
 
-                if match:
-                    #FIRST_PRICE_LVL COL
-                    price_start = float(match.group(1))
-                    #SECOND_PRICE_LVL COL (OPTIONAL)
-                    price_end = float(match.group(2)) if match.group(2) else None
+# Line Parser, run on single lines
+# Group 1: Start Price /Group 2: End Price /Group 3: Comment (Optional)
+LINE_PATTERN = re.compile(r'^\s*(\d{4}(?:\.\d+)?)(?:\s*-\s*(\d{4}(?:\.\d+)?))?\s*(.*)')
 
-                    # COMMENT COL (OPTIONAL)
-                    comment = match.group(3).strip()
-                    if comment:
-                        # Remove leading separators like ": " or "- " from the comment
-                        comment = re.sub(r'^[:\-\s]+', '', comment)
-                    else: # Store None if comment is empty string
-                        comment = None
+# Leading separators like ": " or "- " in front of a comment
+COMMENT_PREFIX_PATTERN = re.compile(r'^[:\-\s]+')
 
-                    # Build the row
-                    row = {
-                        "DATETIME": date_val,
-                        "TICKER": "SPX",  # Defaulting to SPX as context implies index levels
-                        "START_LVL_PRICE": price_start,
-                        "END_LVL_PRICE": price_end,
-                        "COMMENTS": comment,
-                        "BUY_SELL_IND": buy_sell_ind,
-                        "WEB_LINK": post.get('link')
-                    }
 
-                    parsed_rows.append(row)
+def _parse_quant_levels_to_data(posts: []) -> pd.DataFrame:
+    """
+    Parses 'quant_lvl_text' from a list of posts into a structured DataFrame.
+    """
+    return _define_quant_dataframe(_parse_quant_levels_to_frame(posts))
 
-    return _define_quant_dataframe(parsed_rows)
 
+@metrics.timed
+def _parse_quant_levels_to_frame(posts: []) -> pd.DataFrame:
+    """
+    Parses 'quant_lvl_text' of every post at once with pandas string methods: the texts are split into
+    sections and lines (one row each, keeping post + section number), then one str.extract runs the line
+    parser over all lines. Dates and links are looked up per post, never per row.
+    :return: DataFrame with QUANT_COLUMNS (not yet type-enforced, see _define_quant_dataframe)
+    """
+    posts_with_quant_lvl = [post for post in posts if post.get('quant_lvl_text')]
+    if not posts_with_quant_lvl:
+        return pd.DataFrame(columns=QUANT_COLUMNS)
+
+    logging.info(f"Parsing {len(posts_with_quant_lvl)} posts...")
+
+    # 1. One row per section, then one row per line. The index is the post's position.
+    sections = pd.Series([post['quant_lvl_text'] for post in posts_with_quant_lvl], dtype=object) \
+        .str.split(SECTION_SPLIT_PATTERN).explode()
+    lines = pd.DataFrame({"section": sections.groupby(level=0).cumcount().to_numpy(),
+                          "line": sections.str.split("\n").to_numpy()},
+                         index=sections.index).explode("line")
+
+    # 2. Parse every line at once, keep the ones that start with a price
+    matches = lines["line"].str.extract(LINE_PATTERN)
+    is_level = matches[0].notna().to_numpy()
+    if not is_level.any():
+        return pd.DataFrame(columns=QUANT_COLUMNS)
+    matches, lines = matches[is_level], lines[is_level]
+    row_posts = lines.index.to_numpy()
+
+    # 3. Columns
+    # DATETIME COL, parsed once per post
+    post_dates = pd.to_datetime([datetime.datetime.fromisoformat(post.get('date_posted').replace("Z", "+00:00"))
+                                 for post in posts_with_quant_lvl])
+    web_links = np.array([post.get('link') for post in posts_with_quant_lvl], dtype=object)
+
+    # COMMENT COL (OPTIONAL): remove leading separators like ": " or "- ". Empty -> None
+    comments = matches[2].str.strip()
+    comments = np.where(comments != "", comments.str.replace(COMMENT_PREFIX_PATTERN, '', regex=True), None)
+
+    # BUY_SELL_IND COL: Section 0 = First block / Section 1 = Second block (BUY) / Section 2 = Third block (SELL),
+    # None for unexpected extra sections
+    section_nums = lines["section"].to_numpy()
+    buy_sell_inds = np.array([None, "BUY", "SELL"], dtype=object)[np.where(section_nums < 3, section_nums, 0)]
+
+    return pd.DataFrame({
+        "DATETIME": post_dates[row_posts].array,
+        "TICKER": "SPX",  # Defaulting to SPX as context implies index levels
+        "START_LVL_PRICE": matches[0].astype(float).to_numpy(),
+        "END_LVL_PRICE": matches[1].astype(float).to_numpy(),
+        "COMMENTS": comments.astype(object),
+        "BUY_SELL_IND": buy_sell_inds,
+        "WEB_LINK": web_links[row_posts],
+    })
+
+
+@metrics.timed
 def _define_quant_dataframe(parsed_data: []) -> pd.DataFrame:
     """
     Converts a list of parsed quant level dictionaries into a pandas DataFrame.
@@ -141,6 +221,7 @@ def _define_quant_dataframe(parsed_data: []) -> pd.DataFrame:
     return df
 
 
+@metrics.timed
 def _deduplicate_days(df: pd.DataFrame) -> pd.DataFrame:
     """
     Filters the DataFrame to keep only the records associated with the
@@ -167,6 +248,7 @@ def _deduplicate_days(df: pd.DataFrame) -> pd.DataFrame:
     return deduped_df
 
 
+@metrics.timed
 def _deduplicate_rows(config:Config, df: pd.DataFrame) -> pd.DataFrame:
     """
     Deduplicates a DataFrame based on a primary key of (DATETIME, TICKER, START_LVL_PRICE).
@@ -190,36 +272,84 @@ def _deduplicate_rows(config:Config, df: pd.DataFrame) -> pd.DataFrame:
     df['TICKER'] = df['TICKER'].astype(str).str.strip()
 
     primary_key = config.oracle_quant_pks
-    deduped_df = df.groupby(primary_key, as_index=False, dropna=False).agg(merge_logic)
+    deduped_df = _vectorized_merge(df, primary_key)
 
     return deduped_df
 
-# Define the custom aggregation function
-def merge_logic(series):
-    # 1. Drop NA values
-    valid_values = series.dropna()
 
-    # 2. If no valid values, return None (or NaN)
-    if valid_values.empty:
-        return None
+def _vectorized_merge(df: pd.DataFrame, primary_key: [str]) -> pd.DataFrame:
+    """
+    Column-at-a-time equivalent of df.groupby(primary_key, as_index=False, dropna=False).agg(merge_logic)
+    (merge_logic: see tests/reference_transform.py).
+    Each row gets an integer group code once, then:
+    - numeric columns: groupby(codes).first(), which already skips nulls
+    - string columns: strip / drop empties, then de-duplicate and sort the (code, value) pairs on
+      categorical codes. Groups left with a single value take it as is; only the rest are joined.
+    """
+    grouped = df.groupby(primary_key, sort=True, dropna=False)
+    codes = grouped.ngroup().to_numpy()
+    num_groups = grouped.ngroups
+
+    # Keys, one row per group, in sorted group order
+    _, first_row_of_group = np.unique(codes, return_index=True)
+    deduped_df = df[primary_key].iloc[first_row_of_group].reset_index(drop=True)
 
-    # 3. Handle Numeric Columns (e.g. END_LVL_PRICE)
-    # We take the first valid value found (max() or min() also works if preference exists)
-    if pd.api.types.is_numeric_dtype(series):
-        return valid_values.iloc[0]
+    for col in df.columns:
+        if col in primary_key:
+            continue
 
-    # 4. Handle String/Object Columns
-    else:
-        # Convert to string, strip whitespace, and get unique values
-        unique_vals = sorted(set(str(v).strip() for v in valid_values if str(v).strip()))
+        if pd.api.types.is_numeric_dtype(df[col]):
+            merged = df[col].groupby(codes).first()
+            deduped_df[col] = merged.reindex(range(num_groups)).to_numpy()
+        else:
+            deduped_df[col] = _merge_string_column(df[col], codes, num_groups)
 
-        # If nothing remains after stripping, return None
-        if not unique_vals:
-            return None
+    return deduped_df
+
+
+def _merge_string_column(series: pd.Series, codes: np.ndarray, num_groups: int) -> np.ndarray:
+    """
+    Sorted distinct non-empty values per group joined with ' | ', None when a group has none.
+    Values are factorized into sorted categorical codes, so stripping touches each distinct string once
+    and de-duplicating + ordering the (group, value) pairs is a single np.unique over int64 keys.
+    """
+    merged = np.full(num_groups, None, dtype=object)
 
-        # Concatenate unique strings
-        return " | ".join(unique_vals)
+    not_null = series.notna().to_numpy()
+    if not not_null.any():
+        return merged
 
+    # Only the distinct raw values get stringified + stripped, rows just carry integer codes.
+    # value_codes follow the sorted order of the stripped strings, same as sorted(set(...))
+    raw_codes, raw_values = pd.factorize(series[not_null])
+    stripped_codes, distinct_values = pd.factorize(pd.Index(raw_values).astype(str).str.strip(), sort=True)
+    value_codes = stripped_codes[raw_codes]
+    distinct_values = np.asarray(distinct_values, dtype=object)
+    num_values = len(distinct_values)
+
+    non_empty = distinct_values[value_codes] != ""
+    if not non_empty.any():
+        return merged
+
+    pair_keys = np.unique(codes[not_null][non_empty].astype(np.int64) * num_values + value_codes[non_empty])
+    pair_groups = pair_keys // num_values
+    pair_values = distinct_values[pair_keys % num_values]
+
+    # pair_keys are sorted, so every group's values sit in one contiguous, already sorted run
+    starts = np.flatnonzero(np.r_[True, pair_groups[1:] != pair_groups[:-1]])
+    ends = np.r_[starts[1:], len(pair_groups)]
+    is_single = (ends - starts) == 1
+
+    merged[pair_groups[starts[is_single]]] = pair_values[starts[is_single]]
+
+    multi_starts, multi_ends = starts[~is_single], ends[~is_single]
+    merged[pair_groups[multi_starts]] = [" | ".join(pair_values[start:end])
+                                         for start, end in zip(multi_starts, multi_ends)]
+
+    return merged
+
+
+@metrics.timed
 def _clean_df(config:Config, df: pd.DataFrame) -> DataFrame:
     """
     :param df:
@@ -240,5 +370,16 @@ def _clean_df(config:Config, df: pd.DataFrame) -> DataFrame:
 
     return df
 
+    # A character is at most 4 bytes, shorter values can't be too long
+    values = values[values.str.len() > max_bytes // 4]
+    too_long = values[values.map(lambda value: len(value.encode("utf-8")) > max_bytes)]
+    if too_long.empty:
+        return series
+
+    logging.warning(f"{len(too_long)} merged '{series.name}' values are longer than {max_bytes} bytes, cutting them.")
+    series = series.copy()
+    series.loc[too_long.index] = too_long.map(lambda value: value.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore"))
+    return series
+
 
 
@@ -0,0 +1,76 @@
+import datetime
+from typing import Iterable, Iterator, List, Optional
+
+
+class FeedWatermark:
+    """
+    The newest post the pipeline has loaded: its created_at (UTC) and post id.
+    Stored in the watermark table by load (see load.get_watermark), and used by extract to page the feed
+    only down to that exact post instead of re-reading whole days.
+    """
+
+    def __init__(self, created_at: datetime.datetime = None, post_id: str = None):
+        self.created_at = _to_utc(created_at) if created_at is not None else None
+        self.post_id = str(post_id) if post_id is not None else None
+
+    @classmethod
+    def from_posts(cls, posts: Iterable[dict]) -> "FeedWatermark":
+        """
+        Watermark of the newest post in posts (extract's post dicts, with 'date_posted' and 'post_id').
+        """
+        watermark = cls()
+        watermark.observe(posts)
+        return watermark
+
+    def is_empty(self) -> bool:
+        return self.created_at is None
+
+    def is_newer(self, created_at: datetime.datetime, post_id) -> bool:
+        """
+        True if a post with this created_at/post id comes after the watermark. Posts created in the same
+        second as the watermark post are told apart by their id.
+        """
+        if self.created_at is None:
+            return True
+
+        created_at = _to_utc(created_at)
+        if created_at != self.created_at:
+            return created_at > self.created_at
+        return post_id is None or str(post_id) != self.post_id
+
+    def observe(self, posts: Iterable[dict]) -> None:
+        """
+        Advances the watermark to the newest of posts, if it is newer.
+        """
+        for post in posts:
+            created_at = parse_created_at(post.get('date_posted'))
+            if created_at is not None and (self.created_at is None or created_at > self.created_at):
+                self.created_at = created_at
+                self.post_id = str(post['post_id']) if post.get('post_id') is not None else None
+
+    def track(self, post_batches: Iterable[List[dict]]) -> Iterator[List[dict]]:
+        """
+        Passes post batches through unchanged (e.g. extract.stream), observing every post on the way.
+        """
+        for posts in post_batches:
+            self.observe(posts)
+            yield posts
+
+    def __repr__(self) -> str:
+        return f"FeedWatermark(created_at={self.created_at}, post_id={self.post_id})"
+
+
+def parse_created_at(raw_date_str: Optional[str]) -> Optional[datetime.datetime]:
+    """
+    Parses the feed's ISO 'created_at' string into an aware UTC datetime (None if missing).
+    """
+    if not raw_date_str:
+        return None
+    return _to_utc(datetime.datetime.fromisoformat(raw_date_str.replace("Z", "+00:00")))
+
+
+def _to_utc(date_val: datetime.datetime) -> datetime.datetime:
+    # Naive values are UTC already: that's how the watermark table stores them
+    if date_val.tzinfo is None:
+        return date_val.replace(tzinfo=datetime.timezone.utc)
+    return date_val.astimezone(datetime.timezone.utc)
@@ -1,5 +1,10 @@
 # tests/conftest.py
+import json
+import time
+
 import pytest
+import requests
+
 import extract, transform, config
 
 
@@ -9,6 +14,74 @@ def env_config():
     return config.load_config()
 
 
+@pytest.fixture(scope="session")
+def offline_config():
+    """Config with dummy credentials, for tests that never touch the network or Oracle."""
+    return config.Config(
+        oracle_user="test_user",
+        oracle_pass="test_pass",
+        oracle_host_ip="127.0.0.1",
+        oracle_service="test_service",
+        te_cookie="test_cookie",
+        te_rate_limit_per_sec=1000.0,
+        http_cache_enabled=False,
+        raw_archive_enabled=False,
+    )
+
+
+class FakeFeed:
+    """
+    Fake feed served through extract.http.get: num_pages pages of per_page posts, newest first, one post a day
+    counting down from 2025-08-28 (post id = day). Every post has levels in its body. With attachments, posts on
+    odd days also attach a file, whose content is '6600 from <file name>'.
+    """
+
+    def __init__(self, num_pages=4, per_page=3, attachments=False, page_delay=None):
+        self.num_pages = num_pages
+        self.per_page = per_page
+        self.attachments = attachments
+        self.page_delay = page_delay  # page -> seconds to wait before answering it
+        self.requested_pages = []
+
+    def page(self, page):
+        if page > self.num_pages:
+            return {"collection": []}
+
+        items = []
+        for i in range(self.per_page):
+            day = 28 - ((page - 1) * self.per_page + i)
+            post = {"id": day, "title": f"Levels {day}", "created_at": f"2025-08-{day:02d}T12:00:00Z",
+                    "sharing_meta": {"url": f"https://tradingedge.club/posts/{day}"},
+                    "description": f"<p>65{day:02d} pivot</p><p>---</p><p>6400 buy</p>"}
+            if self.attachments and day % 2:
+                post["assets"] = [{"is_file": True, "original_url": f"https://files.example.com/{day}.txt"}]
+            items.append({"post": post})
+        return {"collection": items}
+
+    def get(self, config, url, params=None, headers=None, timeout=None, immutable=False):
+        response = requests.Response()
+        response.status_code = 200
+        if params is not None:
+            self.requested_pages.append(params["page"])
+            if self.page_delay is not None:
+                time.sleep(self.page_delay(params["page"]))
+            response._content = json.dumps(self.page(params["page"])).encode("utf-8")
+        else:
+            response._content = f"6600 from {url.rsplit('/', 1)[1]}".encode("utf-8")
+        return response
+
+
+@pytest.fixture
+def fake_feed(monkeypatch):
+    """Factory: fake_feed(num_pages=..., ...) puts a FakeFeed behind extract.http.get and returns it."""
+    def install(**kwargs):
+        feed = FakeFeed(**kwargs)
+        monkeypatch.setattr(extract.http, "get", feed.get)
+        return feed
+
+    return install
+
+
 @pytest.fixture(scope="session")
 def pipeline_data(env_config):
     """
@@ -0,0 +1,59 @@
+"""
+Reference two-pass implementation the fused extract._extract_post_content is checked against (tests).
+Not used by the pipeline.
+"""
+import logging
+
+from bs4 import BeautifulSoup
+
+from config import Config
+from extract import FILE_LINK_SELECTOR, _attach_file_contents, _quant_levels_from_soup
+
+
+def extract_quant_levels_from_post_body(posts):
+    """
+    Extracts 'quant level' text by scanning the raw text content of the post.
+    Captures:
+    1. Lines starting with 3+ digits (e.g., "6500", "6400-6450")
+    2. Separator lines (e.g., "---", "----")
+    """
+    for post in posts:
+        logging.info(f"Extracting post: {post.get('date_posted')}:{post.get('title')}")
+        html_body = post.get('html_body')
+
+        post['quant_lvl_text'] = None
+
+        if not html_body:
+            continue
+
+        soup = BeautifulSoup(html_body, "html.parser")
+        post['quant_lvl_text'] = _quant_levels_from_soup(soup)
+
+    return posts
+
+
+def extract_file_link(posts, config: Config):
+    """
+    Iterates through a list of post objects, parses the 'html_body',
+    and adds a 'has_file' property based on the presence of 'a.mighty-file'.
+    Attachment bodies are then downloaded concurrently (config.te_attachment_workers)
+    and written back to each post's 'quant_lvl_text' in the original post order.
+    """
+    posts_with_files = []
+
+    for post in posts:
+        html_body = post.get("html_body", "")
+
+        soup = BeautifulSoup(html_body, "html.parser")
+
+        file_tag = soup.select_one(FILE_LINK_SELECTOR)
+
+        if file_tag:
+            post["file_link"] = file_tag.get("href")
+            posts_with_files.append(post)
+        else:
+            post["file_link"] = None
+
+    _attach_file_contents(posts_with_files, config)
+
+    return posts
@@ -0,0 +1,118 @@
+"""
+Reference implementations the optimized transform code is checked (tests) and timed (benchmarks) against.
+Not used by the pipeline.
+"""
+import datetime
+import logging
+import re
+
+import pandas as pd
+
+
+def parse_quant_levels_to_rows(posts: []) -> []:
+    """
+    Parses 'quant_lvl_text' from a list of posts into a structured list of dictionaries
+    ready for a Pandas DataFrame.
+    """
+
+    parsed_rows = []
+
+    # Regex 1: Split sections by "---" (handling variation in dash count/spacing)
+    section_split_pattern = re.compile(r'\n\s*-{3,}\s*\n?')
+
+    # Regex 2: Line Parser
+    # Group 1: Start Price /Group 2: End Price /Group 3: Comment (Optional)
+    line_pattern = re.compile(r'^\s*(\d{4}(?:\.\d+)?)(?:\s*-\s*(\d{4}(?:\.\d+)?))?\s*(.*)')
+
+    all_posts_with_quant_lvl = [post for post in posts if post.get('quant_lvl_text')]
+
+    for post in all_posts_with_quant_lvl:
+        date_of_post = post.get('date_posted')
+
+        logging.info(f"Parsing post: {date_of_post}:{post.get('title')}")
+        # DATETIME COL
+        date_of_post = post.get('date_posted')
+        date_val = datetime.datetime.fromisoformat(date_of_post.replace("Z", "+00:00"))
+
+        # 1. Split text into sections based on '---'
+        raw_text = post.get('quant_lvl_text')
+        sections = section_split_pattern.split(raw_text)
+
+        # 2. Iterate through sections and assign Buy/Sell indicator
+        for i, section_content in enumerate(sections):
+
+            # Section 0 = First block /  Section 1 = Second block / Section 2 = Third block
+            if i == 0:
+                buy_sell_ind = None
+            elif i == 1:
+                buy_sell_ind = "BUY"
+            elif i == 2:
+                buy_sell_ind = "SELL"
+            else:
+                buy_sell_ind = None  # Fallback for unexpected extra sections
+
+            # 3. Process lines within this section
+            lines = section_content.strip().split('\n')
+
+            for line in lines:
+                clean_line = line.strip()
+                if not clean_line:
+                    continue
+
+                match = line_pattern.match(clean_line)    # Match the line against the price regex
+
+                if match:
+                    #FIRST_PRICE_LVL COL
+                    price_start = float(match.group(1))
+                    #SECOND_PRICE_LVL COL (OPTIONAL)
+                    price_end = float(match.group(2)) if match.group(2) else None
+
+                    # COMMENT COL (OPTIONAL)
+                    comment = match.group(3).strip()
+                    if comment:
+                        # Remove leading separators like ": " or "- " from the comment
+                        comment = re.sub(r'^[:\-\s]+', '', comment)
+                    else: # Store None if comment is empty string
+                        comment = None
+
+                    # Build the row
+                    row = {
+                        "DATETIME": date_val,
+                        "TICKER": "SPX",  # Defaulting to SPX as context implies index levels
+                        "START_LVL_PRICE": price_start,
+                        "END_LVL_PRICE": price_end,
+                        "COMMENTS": comment,
+                        "BUY_SELL_IND": buy_sell_ind,
+                        "WEB_LINK": post.get('link')
+                    }
+
+                    parsed_rows.append(row)
+
+    return parsed_rows
+
+
+# groupby().agg() function the quant level merge was defined with; transform._vectorized_merge matches it
+def merge_logic(series):
+    # 1. Drop NA values
+    valid_values = series.dropna()
+
+    # 2. If no valid values, return None (or NaN)
+    if valid_values.empty:
+        return None
+
+    # 3. Handle Numeric Columns (e.g. END_LVL_PRICE)
+    # We take the first valid value found (max() or min() also works if preference exists)
+    if pd.api.types.is_numeric_dtype(series):
+        return valid_values.iloc[0]
+
+    # 4. Handle String/Object Columns
+    else:
+        # Convert to string, strip whitespace, and get unique values
+        unique_vals = sorted(set(str(v).strip() for v in valid_values if str(v).strip()))
+
+        # If nothing remains after stripping, return None
+        if not unique_vals:
+            return None
+
+        # Concatenate unique strings
+        return " | ".join(unique_vals)
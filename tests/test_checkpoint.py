@@ -0,0 +1,77 @@
+import pytest
+
+import checkpoint
+import extract
+import load
+import transform
+
+
+@pytest.fixture
+def backfill(offline_config, fake_feed, tmp_path, monkeypatch):
+    """Fake feed + fake Oracle. Returns the requested pages, the pushed chunks and the swapped in tables."""
+    config = offline_config.model_copy(update={
+        "checkpoint_path": str(tmp_path / "checkpoint.sqlite"),
+        "stream_chunk_rows": 8,
+        "te_max_pages_in_flight": 1,
+    })
+    feed = fake_feed(num_pages=4)
+    pushed_chunks, swaps = [], []
+
+    def fake_insert(config, df, table_name, write_mode, primary_keys, table_spec=None, extra_statements=None):
+        assert table_name == "QUANT_LVL_DATA_TE_B"
+        pushed_chunks.append((write_mode, sorted(int(day) for day in df["DATETIME"].dt.day.unique())))
+
+    def fake_swap_in(config, shadow_table, table_name, table_spec=None, extra_statements=None):
+        swaps.append((shadow_table, table_name))
+
+    # The live table is slot A, so the backfill fills slot B
+    monkeypatch.setattr(load.oracle, "shadow_table_name", lambda config, table_name: f"{table_name}_B")
+    monkeypatch.setattr(load.oracle, "insert_into_table", fake_insert)
+    monkeypatch.setattr(load.oracle, "swap_in", fake_swap_in)
+    return config, feed.requested_pages, pushed_chunks, swaps
+
+
+def _run_backfill(config, resume):
+    store = checkpoint.CheckpointStore.open(config, resume=resume)
+    try:
+        post_batches = store.skip_committed_days(extract.stream(config, checkpoint=store))
+        load.run_stream(config, "overwrite", transform.stream(config, post_batches), checkpoint=store)
+        store.mark_complete()
+    finally:
+        store.close()
+
+
+def test_resume_skips_committed_pages_and_chunks(backfill, monkeypatch):
+    config, requested_pages, pushed_chunks, swaps = backfill
+
+    # 1. Crash while pushing the second chunk
+    real_insert = load.oracle.insert_into_table
+
+    def crashing_insert(*args, **kwargs):
+        if len(pushed_chunks) == 1:
+            raise RuntimeError("ORA-03113: end-of-file on communication channel")
+        real_insert(*args, **kwargs)
+
+    monkeypatch.setattr(load.oracle, "insert_into_table", crashing_insert)
+    with pytest.raises(RuntimeError):
+        _run_backfill(config, resume=False)
+
+    assert pushed_chunks == [("overwrite", [25, 26, 27, 28])]
+    assert requested_pages == [1, 2, 3]
+    assert swaps == []
+
+    # 2. Resume: journaled pages are replayed, committed days are never pushed again
+    monkeypatch.setattr(load.oracle, "insert_into_table", real_insert)
+    _run_backfill(config, resume=True)
+
+    assert requested_pages[3:] == [4, 5]
+    assert pushed_chunks[1:] == [("upsert", [21, 22, 23, 24]), ("upsert", [17, 18, 19, 20])]
+    pushed_days = [day for _, days in pushed_chunks for day in days]
+    assert sorted(pushed_days) == list(range(17, 29))
+    # The shadow table the backfill filled is swapped in once, after its last chunk
+    assert swaps == [("QUANT_LVL_DATA_TE_B", "QUANT_LVL_DATA_TE")]
+
+    # 3. Resuming a finished run starts over
+    store = checkpoint.CheckpointStore.open(config, resume=True)
+    assert store.last_page() == 0 and store.committed_chunks() == 0
+    store.close()
@@ -1,11 +1,14 @@
 from datetime import datetime, timezone
+import time
 
 import pytest
 
+import extract
 from config import load_config
-from extract import _fetch_raw_feed, _extract_file_link, _parse_feed_data, _get_file_content, \
-    _extract_quant_levels_from_post_body
+from extract import _fetch_raw_feed, _parse_feed_data, _get_file_content
+import reference_extract
 import json
+from watermark import FeedWatermark
 
 def test_extract_has_file_property(env_config, pipeline_data):
     """
@@ -42,9 +45,9 @@ def test_extract_has_file_property(env_config, pipeline_data):
         f"Expected {target_link_no_file} to not have file, but got {target_post_no_file['file_link']}"
     )
 
-def test_get_file_content():
+def test_get_file_content(offline_config):
     file_url = "https://media2-production.mightynetworks.com/asset/ec06ea6e-f031-41dd-a77a-29b40f43e2f9/Untitled_document-5.txt"
-    file_content=_get_file_content(file_url)
+    file_content=_get_file_content(file_url, offline_config)
     assert file_content is not None
 
 def test_extract_quant_levels_from_post_body(env_config, pipeline_data):
@@ -58,4 +61,150 @@ def test_extract_quant_levels_from_post_body(env_config, pipeline_data):
     assert all(not post['quant_lvl_text'] for post in non_matches), "Found a post in non-matches with non-empty text"
 
 
+def test_fetch_raw_feed_keeps_page_order(offline_config, fake_feed):
+    # later pages answer first to prove results are re-ordered by page
+    feed = fake_feed(num_pages=5, page_delay=lambda page: 0.01 * (6 - page) if page <= 5 else 0)
 
+    items = _fetch_raw_feed(offline_config, cutoff_date=None)
+
+    expected = [item for page in range(1, 6) for item in feed.page(page)["collection"]]
+    assert items == expected
+
+
+def test_fetch_raw_feed_stops_at_cutoff(offline_config, fake_feed):
+    feed = fake_feed(num_pages=5)
+
+    cutoff_date = datetime(2025, 8, 22, tzinfo=timezone.utc)
+    items = _fetch_raw_feed(offline_config, cutoff_date=cutoff_date)
+
+    # page 3 is the first page whose last item is <= cutoff, posts on/before the cutoff day get pruned
+    assert [item["post"]["created_at"][:10] for item in items] == [f"2025-08-{d}" for d in range(28, 22, -1)]
+    assert len(feed.requested_pages) <= 3 + offline_config.te_max_pages_in_flight
+
+
+def test_fetch_raw_feed_stops_at_watermark_post(offline_config, fake_feed):
+    feed = fake_feed(num_pages=5)
+
+    # Post 22 (2025-08-22 12:00) was the newest one loaded last run
+    items = _fetch_raw_feed(offline_config, watermark=FeedWatermark(datetime(2025, 8, 22, 12, tzinfo=timezone.utc), 22))
+
+    assert [item["post"]["id"] for item in items] == [28, 27, 26, 25, 24, 23]
+    assert len(feed.requested_pages) <= 3 + offline_config.te_max_pages_in_flight
+
+    # Another post created in the same second is not the loaded one, so it's kept
+    items = _fetch_raw_feed(offline_config, watermark=FeedWatermark(datetime(2025, 8, 22, 12, tzinfo=timezone.utc), 999))
+    assert [item["post"]["id"] for item in items][-1] == 22
+
+
+def test_incremental_fetch_stops_at_known_post_with_one_request(offline_config, fake_feed, monkeypatch):
+    feed = fake_feed(num_pages=5)
+    monkeypatch.setattr(extract, "_prune_old_posts", lambda *args: pytest.fail("no prune pass expected"))
+    config = offline_config.model_copy(update={"te_max_pages_in_flight": 4})
+
+    # Post 26 (last item of page 1) was loaded last run, so page 1 is the only request despite 4 in flight
+    items = _fetch_raw_feed(config, watermark=FeedWatermark(datetime(2025, 8, 26, 12, tzinfo=timezone.utc), 26))
+
+    assert [item["post"]["id"] for item in items] == [28, 27]
+    assert feed.requested_pages == [1]
+
+
+def test_extract_file_link_downloads_in_post_order(offline_config, monkeypatch):
+    def fake_get(config, url, params=None, headers=None, timeout=None, immutable=False):
+        if url.endswith("broken.txt"):
+            raise extract.requests.exceptions.HTTPError("404 Not Found")
+
+        # earlier attachments finish last to prove the output keeps post order
+        index = int(url.rsplit("-", 1)[1].split(".")[0])
+        time.sleep(0.01 * (5 - index))
+
+        response = extract.requests.Response()
+        response.status_code = 200
+        response._content = f"64{index}0 level {index}".encode("utf-8")
+        return response
+
+    monkeypatch.setattr(extract.http, "get", fake_get)
+
+    posts = []
+    for i in range(5):
+        link = f"https://files.example.com/doc-{i}.txt"
+        posts.append({"html_body": f'<p>text</p><a class="mighty-file-attachment-link" href="{link}">f</a>',
+                      "quant_lvl_text": None})
+    posts.insert(2, {"html_body": "<p>6400 no attachment</p>", "quant_lvl_text": "6400"})
+    posts.append({"html_body": '<a class="mighty-file" href="https://files.example.com/broken.txt">f</a>',
+                  "quant_lvl_text": "stale"})
+
+    result = reference_extract.extract_file_link(posts, offline_config)
+
+    assert [p["file_link"] for p in result] == [
+        "https://files.example.com/doc-0.txt", "https://files.example.com/doc-1.txt", None,
+        "https://files.example.com/doc-2.txt", "https://files.example.com/doc-3.txt",
+        "https://files.example.com/doc-4.txt", "https://files.example.com/broken.txt"
+    ]
+    assert [p["quant_lvl_text"] for p in result] == [
+        "6400 level 0", "6410 level 1", "6400", "6420 level 2", "6430 level 3", "6440 level 4", None
+    ]
+
+    _, stats = extract._download_attachments([p["file_link"] for p in result], offline_config)
+    summary = stats.summary()
+    assert summary["files_fetched"] == 5
+    assert summary["failures"] == 1
+    assert summary["bytes"] == sum(len(f"64{i}0 level {i}") for i in range(5))
+    assert 0 < summary["p50_latency_sec"] <= summary["p95_latency_sec"]
+
+
+@pytest.mark.parametrize("parser_backend", ["html.parser", "auto"])
+def test_extract_post_content_matches_two_pass(offline_config, monkeypatch, parser_backend):
+    def fake_get(config, url, params=None, headers=None, timeout=None, immutable=False):
+        response = extract.requests.Response()
+        response.status_code = 200
+        response._content = b"\xef\xbb\xbf6500 from file\n---\n6400"
+        return response
+
+    monkeypatch.setattr(extract.http, "get", fake_get)
+    config = offline_config.model_copy(update={"html_parser_backend": parser_backend})
+
+    raw_feed = [
+        {"post": {"title": "Levels", "created_at": "2025-08-18T12:00:00Z", "sharing_meta": {"url": "p/1"},
+                  "description": "<p>Levels</p><p>6500 - resistance<br>6450&nbsp;pivot</p><p>---</p>"
+                                 "<p>6400-6403 buy</p>"}},
+        {"post": {"title": "File", "created_at": "2025-08-17T12:00:00Z", "sharing_meta": {"url": "p/2"},
+                  "description": "<p>see file 6300</p>",
+                  "assets": [{"is_file": True, "original_url": "https://files.example.com/a.txt"}]}},
+        {"post": {"title": "Chatter", "created_at": "2025-08-16T12:00:00Z", "description": "<p>no levels</p>"}},
+        {"post": {"title": "Empty", "created_at": "2025-08-15T12:00:00Z", "description": ""}},
+    ]
+
+    two_pass = reference_extract.extract_file_link(
+        reference_extract.extract_quant_levels_from_post_body(_parse_feed_data(raw_feed)), config)
+    fused = extract._extract_post_content(_parse_feed_data(raw_feed), config)
+
+    assert fused == two_pass
+    assert [p["quant_lvl_text"] for p in fused] == [
+        "6500 - resistance\n6450\xa0pivot\n---\n6400-6403 buy", "6500 from file\n---\n6400", None, None
+    ]
+
+
+def test_lxml_matches_html_parser(offline_config, monkeypatch):
+    pytest.importorskip("lxml")
+    monkeypatch.setattr(extract, "_attach_file_contents", lambda posts, config, attachment_texts=None: None)
+
+    # Shapes seen in real post bodies: nested inline tags, entities, lists, stray/unclosed tags, file links
+    raw_feed = [
+        {"post": {"title": "Levels", "created_at": "2025-08-18T12:00:00Z", "sharing_meta": {"url": "p/1"},
+                  "description": "<div><p>SPX levels</p><p><strong>6500</strong> - 6505 <em>resistance</em><br>"
+                                 "6450&nbsp;pivot<br/>6440 &amp; 6435</p><ul><li>6420 21d EMA</li><li>6410</li></ul>"
+                                 "<p>---</p><p>6400-6403 buy zone<p>6390 first support</div></p>"
+                                 "<hr><p>-----</p><p>6480 - 6500 sell</p>"}},
+        {"post": {"title": "File", "created_at": "2025-08-17T12:00:00Z", "sharing_meta": {"url": "p/2"},
+                  "description": "<p>Levels in the file 6300</p><p><a class=\"mighty-file\" "
+                                 "href=\"https://files.example.com/a.txt?x=1&amp;y=2\">levels.txt</a></p>"}},
+    ]
+
+    parsed = {}
+    for backend in ("html.parser", "lxml"):
+        config = offline_config.model_copy(update={"html_parser_backend": backend})
+        posts = extract._extract_post_content(_parse_feed_data(raw_feed), config)
+        parsed[backend] = [(post["quant_lvl_text"], post["file_link"]) for post in posts]
+
+    assert parsed["lxml"] == parsed["html.parser"]
+    assert parsed["html.parser"][1][1] == "https://files.example.com/a.txt?x=1&y=2"
@@ -0,0 +1,155 @@
+import time
+
+import pytest
+import requests
+
+from connectors import http, http_cache
+
+
+class _FakeSession:
+    """Returns the queued status codes in order, one per request."""
+
+    def __init__(self, status_codes):
+        self.status_codes = list(status_codes)
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls += 1
+        status_code = self.status_codes.pop(0)
+        if status_code is None:
+            raise requests.exceptions.ConnectionError("connection reset")
+
+        response = requests.Response()
+        response.status_code = status_code
+        response.url = url
+        return response
+
+
+@pytest.fixture
+def retry_config(offline_config):
+    return offline_config.model_copy(update={"http_max_retries": 3, "http_backoff_base": 0.001})
+
+
+def test_get_retries_transient_errors(retry_config, monkeypatch):
+    session = _FakeSession([503, None, 429, 200])
+    monkeypatch.setattr(http, "get_session", lambda config: session)
+
+    response = http.get(retry_config, "https://example.com/feed")
+
+    assert response.status_code == 200
+    assert session.calls == 4
+
+
+def test_get_raises_once_retries_are_used_up(retry_config, monkeypatch):
+    session = _FakeSession([502, 502, 502, 502])
+    monkeypatch.setattr(http, "get_session", lambda config: session)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        http.get(retry_config, "https://example.com/feed")
+
+    assert session.calls == 4
+
+
+def test_get_does_not_retry_client_errors(retry_config, monkeypatch):
+    session = _FakeSession([404])
+    monkeypatch.setattr(http, "get_session", lambda config: session)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        http.get(retry_config, "https://example.com/feed")
+
+    assert session.calls == 1
+
+
+def test_get_session_is_shared(offline_config):
+    assert http.get_session(offline_config) is http.get_session(offline_config)
+    http.close_sessions()
+
+
+class _ConditionalSession:
+    """Serves one body with an ETag and answers 304 when the client already has it."""
+
+    def __init__(self, body=b'{"collection": []}', etag='"v1"'):
+        self.body = body
+        self.etag = etag
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append(dict(headers or {}))
+        response = requests.Response()
+        response.url = url
+        if (headers or {}).get("If-None-Match") == self.etag:
+            response.status_code = 304
+            response._content = b""
+        else:
+            response.status_code = 200
+            response._content = self.body
+            response.headers["ETag"] = self.etag
+        return response
+
+
+@pytest.fixture
+def cache_config(offline_config, tmp_path):
+    return offline_config.model_copy(update={"http_cache_enabled": True, "http_cache_dir": str(tmp_path)})
+
+
+def test_cache_serves_fresh_pages_without_network(cache_config, monkeypatch):
+    session = _ConditionalSession()
+    monkeypatch.setattr(http, "get_session", lambda config: session)
+
+    first = http.get(cache_config, "https://example.com/feed", params={"page": 1})
+    second = http.get(cache_config, "https://example.com/feed", params={"page": 1})
+    other_page = http.get(cache_config, "https://example.com/feed", params={"page": 2})
+
+    assert first.from_cache is False and second.from_cache is True and other_page.from_cache is False
+    assert second.json() == {"collection": []}
+    assert len(session.calls) == 2
+
+
+def test_cache_is_keyed_per_cookie(cache_config, monkeypatch):
+    session = _ConditionalSession()
+    monkeypatch.setattr(http, "get_session", lambda config: session)
+
+    http.get(cache_config, "https://example.com/feed", headers={"Cookie": "session=a"})
+    same_cookie = http.get(cache_config, "https://example.com/feed", headers={"Cookie": "session=a"})
+    other_cookie = http.get(cache_config, "https://example.com/feed", headers={"Cookie": "session=b"})
+
+    assert same_cookie.from_cache is True and other_cookie.from_cache is False
+    assert len(session.calls) == 2
+
+
+def test_cache_revalidates_stale_pages_with_etag(cache_config, monkeypatch):
+    session = _ConditionalSession()
+    monkeypatch.setattr(http, "get_session", lambda config: session)
+    stale_config = cache_config.model_copy(update={"http_cache_page_ttl_sec": 0})
+
+    http.get(stale_config, "https://example.com/feed")
+    response = http.get(stale_config, "https://example.com/feed")
+
+    assert session.calls[1]["If-None-Match"] == '"v1"'
+    assert response.from_cache is True
+    assert response.content == session.body
+
+
+def test_cache_stores_immutable_attachments_by_content(cache_config, monkeypatch):
+    session = _ConditionalSession(body=b"6500\n---\n6400")
+    monkeypatch.setattr(http, "get_session", lambda config: session)
+    stale_config = cache_config.model_copy(update={"http_cache_page_ttl_sec": 0})
+
+    http.get(stale_config, "https://files.example.com/a.txt", immutable=True)
+    http.get(stale_config, "https://files.example.com/copy-of-a.txt", immutable=True)
+    cached = http.get(stale_config, "https://files.example.com/a.txt", immutable=True)
+
+    assert cached.from_cache is True
+    assert len(session.calls) == 2
+    assert len(list(http_cache.get_cache(stale_config).blobs_dir.iterdir())) == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = http_cache.HttpCache(str(tmp_path), page_ttl_sec=600, max_bytes=10)
+
+    cache.store("old", "https://example.com/old", b"123456", {})
+    time.sleep(0.01)
+    cache.store("new", "https://example.com/new", b"abcdef", {})
+
+    assert cache.lookup("old") is None
+    assert cache.lookup("new")["body"] == b"abcdef"
@@ -0,0 +1,77 @@
+import re
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import load
+import transform
+from watermark import FeedWatermark
+
+
+def _day_df(day):
+    return pd.DataFrame({"DATETIME": [pd.Timestamp(f"2025-08-{day:02d}")], "TICKER": ["SPX"],
+                         "START_LVL_PRICE": [6500.0], "END_LVL_PRICE": [None], "COMMENTS": [None],
+                         "BUY_SELL_IND": [None], "WEB_LINK": [f"https://tradingedge.club/posts/{day}"]})
+
+
+def test_watermark_tracks_newest_post():
+    posts = [{"post_id": 7, "date_posted": "2025-08-20T14:30:00Z"},
+             {"post_id": 9, "date_posted": "2025-08-21T09:15:00-04:00"},
+             {"post_id": 8, "date_posted": None}]
+
+    watermark = FeedWatermark()
+    assert list(watermark.track([posts[:1], posts[1:]])) == [posts[:1], posts[1:]]
+
+    assert watermark.post_id == "9"
+    assert watermark.created_at == datetime(2025, 8, 21, 13, 15, tzinfo=timezone.utc)
+    assert not watermark.is_newer(datetime(2025, 8, 21, 13, 15, tzinfo=timezone.utc), 9)
+    assert watermark.is_newer(datetime(2025, 8, 21, 13, 15, 1, tzinfo=timezone.utc), 10)
+
+
+def test_watermark_statement_binds_utc_and_only_advances_on_upsert(offline_config):
+    watermark = FeedWatermark(datetime(2025, 8, 21, 13, 15, tzinfo=timezone.utc), 9)
+
+    [(upsert_sql, params)] = load._watermark_statements(offline_config, watermark, "upsert")
+    [(overwrite_sql, _)] = load._watermark_statements(offline_config, watermark, "overwrite")
+
+    assert params == {"target_table": "QUANT_LVL_DATA_TE", "created_at": datetime(2025, 8, 21, 13, 15),
+                      "post_id": "9"}
+    assert "MERGE INTO QUANT_LOAD_WATERMARK" in upsert_sql
+    assert "LAST_POST_CREATED_AT <= :created_at" in upsert_sql
+    assert "LAST_POST_CREATED_AT <= :created_at" not in overwrite_sql
+    assert load._watermark_statements(offline_config, FeedWatermark(), "upsert") is None
+
+
+def test_run_stream_saves_watermark_with_last_chunk_only(offline_config, monkeypatch):
+    pushed = []
+    monkeypatch.setattr(load.oracle, "insert_into_table",
+                        lambda config, df, table_name, write_mode, primary_keys, table_spec=None,
+                        extra_statements=None: pushed.append((df["DATETIME"].dt.day.tolist(), extra_statements)))
+
+    watermark = FeedWatermark(datetime(2025, 8, 28, 12, tzinfo=timezone.utc), 28)
+    load.run_stream(offline_config, "upsert", iter([_day_df(28), _day_df(27), _day_df(26)]), watermark=watermark)
+
+    assert [days for days, _ in pushed] == [[28], [27], [26]]
+    assert [statements is not None for _, statements in pushed] == [False, False, True]
+    assert pushed[-1][1][0][1]["post_id"] == "28"
+
+
+def test_merged_values_fit_quant_table_spec(offline_config):
+    # 6450 is listed in the BUY and the SELL section, so its indicator merges to 'BUY | SELL'
+    long_comment = "gamma flip ü " * 400
+    posts = [{"date_posted": "2025-08-20T14:30:00Z", "title": "Levels", "link": "https://tradingedge.club/posts/1",
+              "quant_lvl_text": f"6500 pivot\n6500 {long_comment}\n---\n6450 support\n---\n6450 resistance"}]
+
+    clean_df = transform.run(offline_config, posts)
+    spec = load.quant_table_spec(offline_config)
+
+    assert "BUY | SELL" in set(clean_df["BUY_SELL_IND"])
+    # Merged comments have no upper bound, transform keeps them whole
+    assert f"{long_comment.strip()} | pivot" in set(clean_df["COMMENTS"])
+    for col, col_type in spec.columns.items():
+        width = re.fullmatch(r"VARCHAR2\((\d+) (CHAR|BYTE)\)", col_type)
+        if width is None:
+            continue
+        max_len, unit = int(width.group(1)), width.group(2)
+        lengths = clean_df[col].dropna().map(lambda value: len(value.encode("utf-8")) if unit == "BYTE" else len(value))
+        assert lengths.max() <= max_len, col
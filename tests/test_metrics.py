@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+import metrics
+import transform
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_spans_counters_and_histograms_are_summarized():
+    @metrics.timed
+    def work(n):
+        return n * 2
+
+    assert [work(n) for n in range(4)] == [0, 2, 4, 6]
+    with pytest.raises(ValueError):
+        with metrics.span("failing"):
+            raise ValueError("boom")
+
+    metrics.count("rows_parsed", 10)
+    metrics.count("rows_parsed", 5)
+    metrics.count("http_requests")
+    for value in range(1, 101):
+        metrics.observe("feed_page_items", value)
+
+    run_report = metrics.report()
+
+    assert run_report["spans"][f"{__name__}.work"]["count"] == 4
+    assert run_report["spans"]["failing"]["count"] == 1
+    assert run_report["counters"] == {"http_requests": 1, "rows_parsed": 15}
+    assert run_report["histograms"]["feed_page_items"] == {"count": 100, "sum": 5050, "max": 100,
+                                                           "p50": 50, "p95": 95, "p99": 99}
+
+
+def test_export_writes_json_report_and_prometheus_textfile(offline_config, tmp_path):
+    config = offline_config.model_copy(update={
+        "metrics_report_path": str(tmp_path / "last_run.json"),
+        "metrics_prometheus_path": str(tmp_path / "textfile" / "quant_pipeline.prom"),
+    })
+    with metrics.span("extract.run"):
+        metrics.count("posts_extracted", 3)
+    metrics.observe("http_request_seconds", 0.25)
+
+    run_report = metrics.export(config)
+
+    assert json.loads((tmp_path / "last_run.json").read_text()) == run_report
+    prom_lines = (tmp_path / "textfile" / "quant_pipeline.prom").read_text().splitlines()
+    assert "# TYPE quant_pipeline_span_seconds summary" in prom_lines
+    assert 'quant_pipeline_span_seconds_count{span="extract.run"} 1' in prom_lines
+    assert "quant_pipeline_posts_extracted_total 3" in prom_lines
+    assert 'quant_pipeline_http_request_seconds{quantile="0.99"} 0.25' in prom_lines
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_transform_records_stage_spans_and_row_counts(offline_config):
+    posts = [
+        {"date_posted": "2025-07-02T15:30:00Z", "title": "Levels", "link": "https://tradingedge.club/posts/2",
+         "quant_lvl_text": "6502 pivot\n6450\n6450: gamma flip\n---\n6400 buy\n---\n6480"},
+        {"date_posted": "2025-07-01T15:30:00Z", "title": "Levels", "link": "https://tradingedge.club/posts/1",
+         "quant_lvl_text": "6501\n---\n6400 buy\n---\n6480"},
+    ]
+
+    clean_df = transform.run(offline_config, posts)
+    run_report = metrics.report()
+
+    assert run_report["spans"]["transform.run"]["count"] == 1
+    assert "transform._clean_df" in run_report["spans"]
+    counters = run_report["counters"]
+    assert counters["rows_parsed"] - counters["rows_deduped"] == len(clean_df)
+    assert counters["rows_deduped"] >= 1
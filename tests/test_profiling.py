@@ -0,0 +1,58 @@
+import json
+import pstats
+
+import pytest
+
+import profiling
+
+
+def _busy_work(n=200_000):
+    return sorted(str(i) for i in range(n))[:3]
+
+
+def test_stage_is_a_noop_without_a_session(offline_config, tmp_path):
+    config = offline_config.model_copy(update={"profile_dir": str(tmp_path)})
+    with profiling.session(config):
+        with profiling.stage("extract"):
+            _busy_work(10)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_cprofile_stage_writes_pstats_and_allocation_diff(offline_config, tmp_path):
+    config = offline_config.model_copy(update={"profile_mode": "cprofile", "profile_dir": str(tmp_path)})
+    with profiling.session(config):
+        with profiling.stage("transform"):
+            _busy_work()
+
+    run_dir, = tmp_path.iterdir()
+    stats = pstats.Stats(str(run_dir / "transform.pstats"))
+    assert any(func_name == "_busy_work" for _, _, func_name in stats.stats)
+    assert "_busy_work" in (run_dir / "transform.txt").read_text()
+    assert (run_dir / "transform.tracemalloc.txt").read_text().startswith("Traced memory:")
+
+
+def test_sample_stage_writes_collapsed_and_speedscope(offline_config, tmp_path):
+    config = offline_config.model_copy(update={"profile_mode": "sample", "profile_dir": str(tmp_path),
+                                               "profile_sample_interval_ms": 1.0, "profile_tracemalloc": False})
+    with profiling.session(config):
+        with profiling.stage("load"):
+            for _ in range(5):
+                _busy_work()
+
+    run_dir, = tmp_path.iterdir()
+    collapsed = (run_dir / "load.collapsed").read_text().splitlines()
+    assert collapsed and all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed)
+    assert any("_busy_work" in line for line in collapsed)
+
+    speedscope = json.loads((run_dir / "load.speedscope.json").read_text())
+    profile, = speedscope["profiles"]
+    assert len(profile["samples"]) == len(profile["weights"]) == len(collapsed)
+    assert max(max(sample) for sample in profile["samples"]) < len(speedscope["shared"]["frames"])
+    assert not (run_dir / "load.tracemalloc.txt").exists()
+
+
+def test_unknown_profile_mode_is_rejected(offline_config):
+    with pytest.raises(ValueError):
+        with profiling.session(offline_config.model_copy(update={"profile_mode": "perf"})):
+            pass
@@ -0,0 +1,48 @@
+import datetime
+from pathlib import Path
+
+import pytest
+
+import extract
+import raw_archive
+
+
+@pytest.fixture
+def archive_config(offline_config, tmp_path, monkeypatch):
+    monkeypatch.setattr(raw_archive, "_run_id", None)
+    return offline_config.model_copy(update={"raw_archive_enabled": True, "raw_archive_dir": str(tmp_path / "raw"),
+                                             "raw_archive_compression": "gzip", "te_max_pages_in_flight": 1})
+
+
+def test_replay_rebuilds_posts_without_network(archive_config, fake_feed, monkeypatch):
+    fake_feed(num_pages=3, attachments=True)
+    posts = extract.run(archive_config)
+
+    archive_dir = Path(archive_config.raw_archive_dir)
+    partitions = sorted(path.parent.name for path in archive_dir.glob("feed/*/part-*.jsonl.gz"))
+    assert partitions == [f"date=2025-08-{day}" for day in range(20, 29)]
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("replay must not touch the network")
+
+    monkeypatch.setattr(extract.http, "get", no_network)
+    assert extract.replay(archive_config) == posts
+
+    replayed = extract.replay(archive_config, start_date=datetime.date(2025, 8, 24), end_date=datetime.date(2025, 8, 25))
+    assert [(post["post_id"], post["quant_lvl_text"]) for post in replayed] == [
+        (25, "6600 from 25.txt"), (24, "6524 pivot\n---\n6400 buy")]
+
+
+def test_later_runs_append_and_win_on_replay(archive_config, fake_feed, monkeypatch):
+    feed = fake_feed(num_pages=3, attachments=True)
+    extract.run(archive_config)
+
+    # A second run archives an edited post 28 in its own part file
+    monkeypatch.setattr(raw_archive, "_run_id", "99999999T999999999999-1")
+    edited = feed.page(1)["collection"][0]
+    edited["post"]["description"] = "<p>6590 edited</p>"
+    raw_archive.record_page(archive_config, [edited])
+
+    assert len(list(Path(archive_config.raw_archive_dir).glob("feed/date=2025-08-28/*"))) == 2
+    replayed = extract.replay(archive_config, start_date=datetime.date(2025, 8, 28))
+    assert [post["quant_lvl_text"] for post in replayed] == ["6590 edited"]
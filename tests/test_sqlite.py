@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+import load
+from connectors import sqlite, storage
+from watermark import FeedWatermark
+
+
+@pytest.fixture
+def sqlite_config(offline_config, tmp_path):
+    config = offline_config.model_copy(update={"storage_backend": "sqlite",
+                                               "sqlite_path": str(tmp_path / "quant_levels.sqlite")})
+    yield config
+    sqlite.dispose_engines()
+
+
+def _quant_df(prices, comment):
+    return pd.DataFrame({
+        "DATETIME": pd.to_datetime(["2025-08-01"] * len(prices)),
+        "TICKER": "SPX",
+        "START_LVL_PRICE": [float(price) for price in prices],
+        "END_LVL_PRICE": [None] * len(prices),
+        "COMMENTS": comment,
+        "BUY_SELL_IND": [None] * len(prices),
+        "WEB_LINK": "https://tradingedge.club/posts/1",
+    })
+
+
+def test_backend_is_selected_from_config(sqlite_config):
+    assert storage.get_backend(sqlite_config) is sqlite
+
+    with pytest.raises(ValueError):
+        storage.get_backend(sqlite_config.model_copy(update={"storage_backend": "duckdb"}))
+
+
+def test_load_modes_and_watermark(sqlite_config):
+    load.migrate(sqlite_config)
+    assert load.get_watermark(sqlite_config) is None
+
+    first = FeedWatermark(datetime(2025, 8, 1, 14, tzinfo=timezone.utc), 10)
+    load.run(sqlite_config, "overwrite", _quant_df([6500, 6400], "pivot"), watermark=first)
+    load.run(sqlite_config, "upsert", _quant_df([6400, 6300], "edited"))
+    load.run(sqlite_config, "ignore", _quant_df([6300, 6200], "ignored"))
+
+    df = sqlite.sql(sqlite_config, f"SELECT * FROM {sqlite_config.oracle_quant_table_name} ORDER BY START_LVL_PRICE")
+    assert df["START_LVL_PRICE"].tolist() == [6200.0, 6300.0, 6400.0, 6500.0]
+    assert df["COMMENTS"].tolist() == ["ignored", "edited", "edited", "pivot"]
+    assert df["END_LVL_PRICE"].isna().all()
+    assert load._get_latest_recorded_date(sqlite_config) == datetime(2025, 8, 1, tzinfo=timezone.utc)
+
+    # Upserts only move the watermark forward
+    load.run(sqlite_config, "upsert", _quant_df([6100], "old"),
+             watermark=FeedWatermark(datetime(2025, 7, 31, tzinfo=timezone.utc), 9))
+    watermark = load.get_watermark(sqlite_config)
+    assert (watermark.created_at, watermark.post_id) == (first.created_at, "10")
+
+
+def test_migrate_is_idempotent(sqlite_config):
+    spec = load.quant_table_spec(sqlite_config)
+
+    assert sqlite.migrate_table(sqlite_config, "MIGRATE_TEST", spec)
+    assert sqlite.migrate_table(sqlite_config, "MIGRATE_TEST", spec) == []
+
+    # Only the missing index is recreated
+    sqlite.execute(sqlite_config, f"DROP INDEX {spec.index_names('MIGRATE_TEST')[0]}")
+    assert sqlite.migrate_table(sqlite_config, "MIGRATE_TEST", spec) == \
+           sqlite._create_statements("MIGRATE_TEST", spec)[1:2]
+
+
+def test_streamed_overwrite_swaps_in_once_after_last_chunk(sqlite_config):
+    load.migrate(sqlite_config)
+    table_name = sqlite_config.oracle_quant_table_name
+    load.run(sqlite_config, "overwrite", _quant_df([6000], "old"))
+
+    def chunks():
+        for prices in ([6500], [6400], [6300]):
+            # Readers keep the old table while the backfill runs
+            live_df = sqlite.sql(sqlite_config, f"SELECT * FROM {table_name}")
+            assert live_df["COMMENTS"].tolist() == ["old"]
+            yield _quant_df(prices, "new")
+
+    watermark = FeedWatermark(datetime(2025, 8, 1, 14, tzinfo=timezone.utc), 10)
+    assert load.run_stream(sqlite_config, "overwrite", chunks(), watermark=watermark) == 3
+
+    df = sqlite.sql(sqlite_config, f"SELECT * FROM {table_name} ORDER BY START_LVL_PRICE")
+    assert df["START_LVL_PRICE"].tolist() == [6300.0, 6400.0, 6500.0]
+    assert load.get_watermark(sqlite_config).post_id == "10"
+    tables = sqlite.sql(sqlite_config, "SELECT name FROM sqlite_master WHERE type = 'table'")["NAME"].tolist()
+    assert sqlite.shadow_table_name(sqlite_config, table_name) not in tables
+    indexes = sqlite.sql(sqlite_config, "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'SHD_%'")
+    assert indexes.empty
@@ -1,7 +1,10 @@
 from datetime import datetime, timezone, date
 
+import numpy as np
 import pandas as pd
 
+import reference_transform
+import transform
 from transform import _define_quant_dataframe
 
 pd.set_option('display.max_rows', None)      # Show all rows
@@ -277,3 +280,100 @@ def except_distinct(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
     return result.drop_duplicates()
 
 
+
+
+#--------------------------------------SYNTHETIC CASES------------------------------------------------------#
+
+def _synthetic_posts(num_days=12):
+    """Posts in feed order (newest first). Some days have an earlier, superseded post and overlapping levels."""
+    posts = []
+    for day in range(num_days, 0, -1):
+        link = f"https://tradingedge.club/posts/{day}"
+        posts.append({
+            "date_posted": f"2025-07-{day:02d}T15:30:00Z",
+            "title": f"Levels {day}",
+            "link": link,
+            "quant_lvl_text": f"65{day:02d} - 65{day + 5:02d} pivot\n6450\n6450: gamma flip\n---\n"
+                              f"6400-6403 buy zone\n---\n6480 - 6500",
+        })
+        if day % 3 == 0:
+            posts.append({"date_posted": f"2025-07-{day:02d}T09:00:00Z", "title": "early", "link": link,
+                          "quant_lvl_text": "6300 superseded"})
+        if day % 4 == 0:
+            posts.append({"date_posted": f"2025-07-{day:02d}T08:00:00Z", "title": "chatter", "link": link,
+                          "quant_lvl_text": None})
+    return posts
+
+
+def test_stream_matches_run(offline_config):
+    posts = _synthetic_posts()
+    config = offline_config.model_copy(update={"stream_chunk_rows": 7})
+    pks = config.oracle_quant_pks
+
+    expected_df = transform.run(config, [dict(p) for p in posts]).sort_values(pks).reset_index(drop=True)
+
+    # feed the posts in "pages" of 5, like extract.stream would
+    pages = [posts[i:i + 5] for i in range(0, len(posts), 5)]
+    chunks = list(transform.stream(config, pages))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 7 for chunk in chunks[:-1])
+    assert not any(set(a['DATETIME']) & set(b['DATETIME']) for a, b in zip(chunks, chunks[1:]))
+
+    streamed_df = pd.concat(chunks, ignore_index=True).sort_values(pks).reset_index(drop=True)
+    pd.testing.assert_frame_equal(expected_df, streamed_df)
+
+
+def _random_quant_rows(num_rows, seed=0):
+    """Random rows with lots of PK collisions, nulls, blanks and padded strings."""
+    rng = np.random.default_rng(seed)
+    comments = np.array([None, "", "  ", "pivot", " pivot ", "gamma flip", "21d EMA", "first resistance"], dtype=object)
+    return pd.DataFrame({
+        "DATETIME": pd.Timestamp("2025-06-01") + pd.to_timedelta(rng.integers(0, 30, num_rows), unit="D"),
+        "TICKER": rng.choice(["SPX", "NDX"], num_rows),
+        "START_LVL_PRICE": np.where(rng.random(num_rows) < 0.01, np.nan, rng.integers(6400, 6440, num_rows) * 1.0),
+        "END_LVL_PRICE": np.where(rng.random(num_rows) < 0.6, np.nan, rng.integers(6440, 6500, num_rows) * 1.0),
+        "COMMENTS": rng.choice(comments, num_rows),
+        "BUY_SELL_IND": rng.choice(np.array([None, "BUY", "SELL"], dtype=object), num_rows),
+        "WEB_LINK": rng.choice([f"https://tradingedge.club/posts/{i}" for i in range(3)], num_rows),
+    })
+
+
+def test_vectorized_merge_matches_merge_logic():
+    pks = ["DATETIME", "TICKER", "START_LVL_PRICE"]
+    df = _random_quant_rows(5000)
+
+    expected_df = df.groupby(pks, as_index=False, dropna=False).agg(reference_transform.merge_logic)
+    vectorized_df = transform._vectorized_merge(df, pks)
+
+    pd.testing.assert_frame_equal(expected_df, vectorized_df)
+
+
+def _random_quant_posts(num_posts, seed=0):
+    """Random quant_lvl_text blobs built from the awkward lines real posts and attachments contain."""
+    rng = np.random.default_rng(seed)
+    line_choices = [
+        "6500", "6500 - 6510", "6500-6510: pivot", "6400 - high likelihood of support", "6400 -", "6480 -- x",
+        "6500.5 - 6510.25 gamma\xa0flip", "  6455  :  pivot  ", "650 too short", "abc", "", " ", "\r",
+        "---", "----  ", "--- 6520 main resistance", "------6530", " --- ", "6433 - 6449\r",
+    ]
+    posts = []
+    for i in range(num_posts):
+        num_lines = rng.integers(1, 15)
+        text = "\n".join(rng.choice(line_choices, num_lines))
+        if rng.random() < 0.1:
+            text = "\n" + text
+        posts.append({"date_posted": f"2025-07-{1 + i % 28:02d}T1{i % 10}:00:00Z", "title": f"post {i}",
+                      "link": f"https://tradingedge.club/posts/{i}", "quant_lvl_text": text})
+    posts.append({"date_posted": "2025-07-01T10:00:00Z", "title": "no levels", "link": None, "quant_lvl_text": None})
+    return posts
+
+
+def test_parse_quant_levels_to_frame_matches_row_parser():
+    posts = _random_quant_posts(400)
+
+    expected_df = _define_quant_dataframe(reference_transform.parse_quant_levels_to_rows(posts))
+    batch_df = _define_quant_dataframe(transform._parse_quant_levels_to_frame(posts))
+
+    assert len(batch_df) > 0 and set(batch_df["BUY_SELL_IND"].dropna()) == {"BUY", "SELL"}
+    pd.testing.assert_frame_equal(expected_df, batch_df)